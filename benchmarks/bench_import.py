@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+MODELS = 300
+
+
+def gen_module(path: str):
+    lines = ["from typing import Literal, Optional", "from exacting import Exact, field", ""]
+    for i in range(MODELS):
+        lines += [
+            f"class Model{i}(Exact):",
+            "    id: int",
+            "    name: str = field(regex='^[a-z]+$')",
+            "    scores: Optional[list[dict[str, float]]]",
+            "    kind: Literal['a', 'b']",
+            f"    parent: {f'Model{i - 1}' if i else 'int'}",
+            "",
+        ]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def run(directory: str, *, use: bool, cache: bool) -> float:
+    code = "\n".join(
+        [
+            "import time",
+            "start = time.perf_counter()",
+            "import exacting",
+            *(["exacting.enable_cache('cache')"] if cache else []),
+            "import models",
+            *(
+                [f"for i in range({MODELS}): getattr(models, f'Model{{i}}').__validator__"]
+                if use
+                else []
+            ),
+            "print(time.perf_counter() - start)",
+        ]
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=directory,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([directory, *sys.path])},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout) * 1000
+
+
+with tempfile.TemporaryDirectory() as directory:
+    gen_module(os.path.join(directory, "models.py"))
+
+    print(f"import {MODELS} models: {run(directory, use=False, cache=False)} ms")
+    print(f"...and use them: {run(directory, use=True, cache=False)} ms")
+
+    run(directory, use=True, cache=True)  # fill the cache
+    print(f"...and use them (cached): {run(directory, use=True, cache=True)} ms")
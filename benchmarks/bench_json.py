@@ -0,0 +1,46 @@
+import json
+import timeit
+
+from exacting.exacting import json_to_py, jsonc_to_py
+
+BACKENDS = ["serde", "simd", "jsonc", "json5"]
+
+
+def gen_doc(items: int) -> str:
+    return json.dumps(
+        [
+            {
+                "id": i,
+                "name": f"item-{i}",
+                "price": i * 1.25,
+                "tags": ["a", "b", "c"][: i % 4],
+                "active": i % 2 == 0,
+                "meta": {"owner": None, "rating": i % 5},
+            }
+            for i in range(items)
+        ],
+        indent=2,
+    )
+
+
+def with_comments(doc: str) -> str:
+    # a comment on every line, and a trailing comma after the last item
+    doc = doc[: doc.rindex("]")].rstrip() + ",\n]"
+    return "\n".join(f"{line} // line {i}" for i, line in enumerate(doc.splitlines()))
+
+
+def bench(fn, doc) -> float:
+    number = max(1, 200_000 // len(doc))
+    return min(timeit.repeat(lambda: fn(doc), number=number, repeat=5)) / number * 1e6
+
+
+for size, items in (("small", 5), ("medium", 500), ("large", 50_000)):
+    doc = gen_doc(items)
+    print(f"{size} ({len(doc) / 1024:.1f} KiB)")
+    print(f"  json (stdlib): {bench(json.loads, doc):.1f} µs")
+    for backend in BACKENDS:
+        print(f"  {backend}: {bench(lambda d: json_to_py(d, backend=backend), doc):.1f} µs")
+
+    doc = with_comments(doc)
+    print(f"  with comments, jsonc: {bench(lambda d: jsonc_to_py(d, backend='jsonc'), doc):.1f} µs")
+    print(f"  with comments, json5: {bench(lambda d: jsonc_to_py(d, backend='json5'), doc):.1f} µs")
@@ -1,3 +1,4 @@
+from .cache import enable_cache, disable_cache
 from .core import Exact, exact
 from .fields import field
 from .types import ValidationError
@@ -15,13 +16,14 @@ from .validators import (
     LooseDictV,
     LooseListV,
     NoneV,
+    OneOfV,
     StrV,
     UnionV,
     Validator,
     expect,
 )
 from .validator_map import union
-from .result import Result
+from .result import Issue, Result
 from .utils import unsafe
 
 __all__ = [
@@ -41,6 +43,7 @@ __all__ = [
     "LooseDictV",
     "LooseListV",
     "NoneV",
+    "OneOfV",
     "StrV",
     "UnionV",
     "Validator",
@@ -48,5 +51,8 @@ __all__ = [
     "field",
     "union",
     "Result",
+    "Issue",
     "expect",
+    "enable_cache",
+    "disable_cache",
 ]
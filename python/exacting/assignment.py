@@ -0,0 +1,227 @@
+"""Validating single fields: on assignment, and in `Exact.exact_replace()`.
+
+Also keeps the validated marker (see `VALID_MARKER`) honest on assignment.
+"""
+
+import dataclasses as std_dc
+
+from types import MemberDescriptorType
+from typing import Any, Optional
+from weakref import ref
+
+from .compiler import compile_field_check
+from .types import FAIL, VALID_MARKER, DataclassType
+from .utils import get_slot
+from .validators import DataclassV
+
+
+def check_field(v: DataclassV, name: str, value: Any) -> Any:
+    """Validate `value` for a single field of the model of `v`, and get the
+    validated value. Raises `ValidationError` if it's invalid.
+    """
+    check = v.field_checks.get(name)
+    if check is None:
+        check = v.field_checks[name] = compile_field_check(v, name)
+
+    checked = check(value)
+    if checked is FAIL:
+        dc = v.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        res = v.validate_field(dc.__dataclass_fields__[name], value)
+        res.raise_for_err()
+        return res.unwrap()
+
+    return checked
+
+
+def set_field(obj: Any, name: str, value: Any):
+    """Set an attribute of `obj` as is, skipping `__setattr__()` and any
+    validation on assignment.
+    """
+    slot = get_slot(type(obj), name)
+    if slot is not None:
+        slot.__set__(obj, value)
+    else:
+        obj.__dict__[name] = value
+
+
+class MarkedField:
+    """A field that clears the validated marker (see `VALID_MARKER`) of its
+    instance when assigned to or deleted, since it has to be validated again.
+
+    It has no `__get__()`, so reading the field still comes straight from the
+    instance's `__dict__`.
+    """
+
+    __slots__ = ("name",)
+
+    name: str
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __set__(self, obj: Any, value: Any):
+        attrs = obj.__dict__
+        attrs[self.name] = value
+        attrs.pop(VALID_MARKER, None)
+
+    def __delete__(self, obj: Any):
+        attrs = obj.__dict__
+        try:
+            del attrs[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        attrs.pop(VALID_MARKER, None)
+
+
+class MarkedSlot:
+    """A `MarkedField` kept in a slot."""
+
+    __slots__ = ("slot", "marker")
+
+    slot: MemberDescriptorType
+    marker: MemberDescriptorType
+
+    def __init__(self, slot: MemberDescriptorType, marker: MemberDescriptorType):
+        self.slot = slot
+        self.marker = marker
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return self.slot.__get__(obj, owner)
+
+    def __set__(self, obj: Any, value: Any):
+        self.slot.__set__(obj, value)
+        self.marker.__set__(obj, None)
+
+    def __delete__(self, obj: Any):
+        self.slot.__delete__(obj)
+        self.marker.__set__(obj, None)
+
+
+def clear_inherited_fields(cls: type):
+    """Keep the field descriptors of base models from being taken as the
+    defaults of fields that `cls` declares again.
+    """
+    for name in cls.__dict__.get("__annotations__", {}):
+        if name in cls.__dict__:
+            continue
+        if isinstance(getattr(cls, name, None), (MarkedField, MarkedSlot, ValidatedField)):
+            setattr(cls, name, std_dc.field())
+
+
+def add_marked_fields(dc: DataclassType):
+    """Make every field of `dc` clear the validated marker when assigned to."""
+    marker = get_slot(dc, VALID_MARKER)
+    for name in dc.__dataclass_fields__:
+        slot = dc.__dict__.get(name)
+        if isinstance(slot, MemberDescriptorType) and marker is not None:
+            setattr(dc, name, MarkedSlot(slot, marker))
+        else:
+            setattr(dc, name, MarkedField(name))
+
+
+class ValidatedField:
+    """A field that validates whatever gets assigned to it."""
+
+    __slots__ = ("name", "rf")
+
+    name: str
+    rf: "ref[DataclassType]"
+
+    def __init__(self, dc: DataclassType, name: str):
+        self.name = name
+        self.rf = ref(dc)
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj: Any, value: Any):
+        dc = self.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        obj.__dict__[self.name] = check_field(dc.__validator__, self.name, value)
+
+    def __delete__(self, obj: Any):
+        try:
+            del obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
+class ValidatedSlot(ValidatedField):
+    """A `ValidatedField` kept in a slot."""
+
+    __slots__ = ("slot",)
+
+    slot: MemberDescriptorType
+
+    def __init__(self, dc: DataclassType, name: str, slot: MemberDescriptorType):
+        super().__init__(dc, name)
+        self.slot = slot
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return self.slot.__get__(obj, owner)
+
+    def __set__(self, obj: Any, value: Any):
+        dc = self.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        self.slot.__set__(obj, check_field(dc.__validator__, self.name, value))
+
+    def __delete__(self, obj: Any):
+        self.slot.__delete__(obj)
+
+
+def add_validated_fields(dc: DataclassType):
+    """Make every field of `dc` validate what gets assigned to it.
+
+    Instances stay valid through assignments, so they keep their marker.
+    """
+    for name in dc.__dataclass_fields__:
+        slot = dc.__dict__.get(name)
+        if isinstance(slot, MemberDescriptorType):
+            setattr(dc, name, ValidatedSlot(dc, name, slot))
+        else:
+            setattr(dc, name, ValidatedField(dc, name))
+
+
+def replace(obj: Any, changes: dict) -> Any:
+    """Copy a model instance with some fields changed (see `Exact.exact_replace()`)."""
+    cls = type(obj)
+    v: DataclassV = cls.__validator__
+
+    unknown = changes.keys() - v.targets.keys()
+    if unknown:
+        raise TypeError(
+            f"{cls.__name__} has no field(s) {', '.join(map(repr, sorted(unknown)))}"
+        )
+
+    values = {name: getattr(obj, name) for name in v.targets}
+    for name, value in changes.items():
+        values[name] = check_field(v, name, value)
+
+    if getattr(obj, VALID_MARKER, None) is v:
+        # the rest was valid already
+        values[VALID_MARKER] = v
+
+    item = cls.__new__(cls)
+    if values and get_slot(cls, next(iter(values))) is None:
+        item.__dict__.update(values)
+    else:
+        for name, value in values.items():
+            set_field(item, name, value)
+
+    return item
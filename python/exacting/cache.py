@@ -0,0 +1,216 @@
+"""Opt-in on-disk cache of built validators.
+
+With the cache on, each model's resolved field validators (its "spec") and
+the bytecode compiled for it are kept on disk, in one file per module (and
+per hash of its source), and reused by later processes: they skip evaluating
+the model's annotations, building its validators and compiling them.
+
+A spec is only reused while the modules of the models it nests are unchanged,
+too. Bytecode is also checked against the source generated for it.
+"""
+
+import atexit
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import CodeType
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# bumped when what's cached changes shape
+_VERSION = "v3"
+
+_directory: Optional[Path] = None
+_lock = threading.Lock()
+
+# module name -> its cache, if it can have one
+_modules: Dict[str, Optional["_ModuleCache"]] = {}
+
+
+# module name -> hash of its source file, if it has one
+_digests: Dict[str, Optional[str]] = {}
+
+
+class _ModuleCache:
+    path: Path
+    # qualname -> (hash of the generated source, marshalled code)
+    entries: Dict[str, Tuple[str, bytes]]
+    # qualname -> (hashes of the other modules it depends on, pickled spec)
+    specs: Dict[str, Tuple[Dict[str, str], bytes]]
+    dirty: bool
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.dirty = False
+        try:
+            self.entries, self.specs = marshal.loads(path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            self.entries = {}
+            self.specs = {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps((self.entries, self.specs)))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.dirty = False
+
+
+def enable_cache(directory: Union[str, os.PathLike, None] = None):
+    """Cache compiled validators on disk, so later processes start faster.
+
+    Models are cached per module, keyed by the hash of the module's source, so
+    editing a module simply leaves its old cache unused (along with the cache
+    of models that nest its models).
+
+    Args:
+        directory (str | PathLike, optional): Where to keep the cache. Defaults
+            to the `EXACTING_CACHE_DIR` environment variable, or
+            `~/.cache/exacting`.
+    """
+    global _directory
+
+    if directory is None:
+        directory = os.environ.get("EXACTING_CACHE_DIR") or (
+            Path.home() / ".cache" / "exacting"
+        )
+
+    with _lock:
+        _directory = Path(directory)
+        _modules.clear()
+        _digests.clear()
+
+
+def disable_cache():
+    """Stop using the on-disk cache (see `enable_cache()`)."""
+    global _directory
+
+    flush()
+    with _lock:
+        _directory = None
+        _modules.clear()
+        _digests.clear()
+
+
+def flush():
+    """Write pending cache entries to disk. Also done at exit."""
+    with _lock:
+        for cache in _modules.values():
+            if cache is not None and cache.dirty:
+                try:
+                    cache.save()
+                except OSError:
+                    pass
+
+
+def _digest(module: str) -> Optional[str]:
+    if module in _digests:
+        return _digests[module]
+
+    digest = None
+    file = getattr(sys.modules.get(module), "__file__", None)
+    if file is not None:
+        try:
+            digest = hashlib.sha256(Path(file).read_bytes()).hexdigest()[:16]
+        except OSError:
+            pass
+
+    _digests[module] = digest
+    return digest
+
+
+def _module_cache(module: str) -> Optional[_ModuleCache]:
+    if module in _modules:
+        return _modules[module]
+
+    cache = None
+    digest = _digest(module)
+    if digest is not None and _directory is not None:
+        name = f"{module}.{digest}.{sys.implementation.cache_tag}.{_VERSION}.exacting"
+        cache = _ModuleCache(_directory / name)
+
+    _modules[module] = cache
+    return cache
+
+
+def is_enabled() -> bool:
+    """Whether the on-disk cache is on (see `enable_cache()`)."""
+    return _directory is not None
+
+
+def get_spec(module: str, qualname: str) -> Optional[bytes]:
+    """Get the spec cached for a model, if the modules it depends on are
+    unchanged (see `put_spec()`).
+    """
+    if _directory is None:
+        return None
+
+    with _lock:
+        cache = _module_cache(module)
+        entry = cache.specs.get(qualname) if cache is not None else None
+        if entry is None:
+            return None
+
+        deps, spec = entry
+        if any(_digest(dep) != digest for dep, digest in deps.items()):
+            return None
+        return spec
+
+
+def put_spec(module: str, qualname: str, spec: bytes, deps: Iterable[str]):
+    """Cache the spec of a model, which depends on the modules `deps` (besides
+    its own) staying the same.
+    """
+    if _directory is None:
+        return
+
+    with _lock:
+        cache = _module_cache(module)
+        if cache is None:
+            return
+
+        digests = {dep: _digest(dep) for dep in deps if dep != module}
+        if any(digest is None for digest in digests.values()):
+            # can't tell when it changes
+            return
+
+        cache.specs[qualname] = (digests, spec)  # type: ignore
+        cache.dirty = True
+
+
+def get_code(module: str, qualname: str, source: str) -> CodeType:
+    """Get the compiled `source` of a model's validator, from the cache if possible."""
+    if _directory is None:
+        return compile(source, "<exacting>", "exec")
+
+    key = hashlib.sha256(source.encode()).hexdigest()
+    with _lock:
+        cache = _module_cache(module)
+        if cache is None:
+            return compile(source, "<exacting>", "exec")
+
+        entry = cache.entries.get(qualname)
+        if entry is not None and entry[0] == key:
+            try:
+                return marshal.loads(entry[1])
+            except (ValueError, EOFError, TypeError):
+                pass
+
+        code = compile(source, "<exacting>", "exec")
+        cache.entries[qualname] = (key, marshal.dumps(code))
+        cache.dirty = True
+        return code
+
+
+if os.environ.get("EXACTING_CACHE_DIR"):
+    enable_cache()
+
+atexit.register(flush)
@@ -0,0 +1,725 @@
+import builtins
+import re
+from dataclasses import MISSING, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import get_code
+from .types import FAIL, VALID_MARKER
+from .utils import get_slot, unsafe_mode
+from .exacting import find_invalid_entry, find_invalid_item
+from .validators import (
+    AnyV,
+    BoolV,
+    BytesV,
+    DataclassV,
+    DictV,
+    FloatV,
+    IntV,
+    ListV,
+    LiteralV,
+    LooseDictV,
+    LooseListV,
+    NoneV,
+    OneOfV,
+    RegexV,
+    StrV,
+    UnionV,
+    Validator,
+    get_regex_set,
+)
+
+CompiledValidator = Callable[[Any, bool], Any]
+
+# validators that boil down to a single isinstance() check
+_TYPE_CHECKS = {
+    IntV: int,
+    FloatV: float,
+    BoolV: bool,
+    StrV: str,
+    BytesV: bytes,
+    LooseListV: list,
+    LooseDictV: dict,
+}
+
+# flat unions with more variants than this dispatch on the value's type
+# instead of trying each variant inline
+_MAX_INLINE_VARIANTS = 3
+
+# nested loops beyond this depth get their own function, so we never hit
+# python's limit on statically nested blocks
+_MAX_INLINE_DEPTH = 8
+
+
+def flatten_union(v: Validator) -> List[Validator]:
+    """Flatten a right-nested `UnionV` chain (or a `OneOfV`) into its variants, in order."""
+    if type(v) is OneOfV:
+        return [item for variant in v.variants for item in flatten_union(variant)]  # type: ignore
+
+    variants = []
+    while type(v) is UnionV:
+        variants.extend(flatten_union(v.a))
+        v = v.b
+    variants.append(v)
+    return variants
+
+
+def is_pure(v: Validator) -> bool:
+    """Whether `v` is made of built-in validators only, up until any dataclass
+    boundaries (which are compiled on their own).
+    """
+    t = type(v)
+    if t in _TYPE_CHECKS or t is AnyV or t is NoneV or t is LiteralV:
+        return True
+    if t is DataclassV or t is RegexV:
+        return True
+    if t is ListV:
+        return v.typecode is None and (v.regexes is not None or is_pure(v.target))  # type: ignore
+    if t is DictV:
+        return is_pure(v.key) and is_pure(v.value)  # type: ignore
+    if t is UnionV or t is OneOfV:
+        return all(is_pure(item) for item in flatten_union(v))
+
+    return False
+
+
+def has_dataclass(v: Validator) -> bool:
+    """Whether `v` could convert dicts into dataclasses (when `from_dict`)."""
+    t = type(v)
+    if t is DataclassV:
+        return True
+    if t is ListV:
+        return has_dataclass(v.target)  # type: ignore
+    if t is DictV:
+        return has_dataclass(v.key) or has_dataclass(v.value)  # type: ignore
+    if t is UnionV or t is OneOfV:
+        return any(has_dataclass(item) for item in flatten_union(v))
+
+    return False
+
+
+class _Compiler:
+    namespace: Dict[str, Any]
+    blocks: List[str]
+    functions: Dict[int, str]
+    counter: int
+    from_dict: Optional[bool]  # known at compile time inside dataclass bodies
+
+    def __init__(self):
+        self.namespace = {"FAIL": FAIL, "MISSING": MISSING, "is_dataclass": is_dataclass}
+        self.blocks = []
+        self.functions = {}
+        self.counter = 0
+        self.from_dict = None
+
+    def uid(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def const(self, obj: Any) -> str:
+        name = self.uid("_c")
+        self.namespace[name] = obj
+        return name
+
+    def function(self, v: Validator) -> str:
+        """Get (or generate) a function `(value, from_dict) -> value | FAIL` for `v`."""
+        key = id(v)
+        if key in self.functions:
+            return self.functions[key]
+
+        name = self.uid("_v")
+        self.functions[key] = name
+
+        from_dict = self.from_dict
+        self.from_dict = None
+
+        lines = [f"def {name}(value, from_dict):"]
+        if type(v) is DataclassV:
+            self.emit_dataclass(v, lines)  # type: ignore
+        else:
+            self.emit(v, "value", lines, 1)
+            lines.append("    return value")
+
+        self.from_dict = from_dict
+
+        self.blocks.append("\n".join(lines))
+        return name
+
+    def condition(self, v: Validator, var: str) -> Optional[str]:
+        """Get an expression that is truthy when `var` passes `v`, if `v` can
+        be checked without any statements at all.
+        """
+        t = type(v)
+        if t in _TYPE_CHECKS:
+            return f"isinstance({var}, {_TYPE_CHECKS[t].__name__})"
+        if t is AnyV:
+            return "True"
+        if t is NoneV:
+            return f"{var} is None"
+        if t is LiteralV:
+            return f"{var} in {self.const(tuple(v.values))}"  # type: ignore
+        if t is UnionV or t is OneOfV:
+            variants = flatten_union(v)
+            conditions = [self.condition(item, var) for item in variants]
+            if any(c is None for c in conditions):
+                return None
+            return self.merge_conditions(variants, conditions, var)  # type: ignore
+
+        return None
+
+    def merge_conditions(
+        self, variants: List[Validator], conditions: List[str], var: str
+    ) -> str:
+        """Join union variant conditions, folding plain type checks together."""
+        if "True" in conditions:
+            return "True"
+
+        types = [_TYPE_CHECKS[type(item)] for item in variants if type(item) in _TYPE_CHECKS]
+        rest = [
+            cond for item, cond in zip(variants, conditions) if type(item) not in _TYPE_CHECKS
+        ]
+        if len(types) > 1:
+            names = ", ".join(t.__name__ for t in types)
+            rest.insert(0, f"isinstance({var}, ({names}))")
+        elif types:
+            rest.insert(0, f"isinstance({var}, {types[0].__name__})")
+
+        return "(" + " or ".join(rest) + ")"
+
+    def emit(self, v: Validator, var: str, lines: List[str], depth: int) -> bool:
+        """Emit statements that validate `var` against `v`, rebinding `var` to
+        the validated value and returning `FAIL` on failure.
+
+        Returns whether `var` may have been rebound to a different object.
+        """
+        ind = "    " * depth
+        cond = self.condition(v, var)
+        if cond is not None:
+            if cond != "True":
+                lines.append(f"{ind}if not {cond}: return FAIL")
+            return False
+
+        t = type(v)
+        if not is_pure(v):
+            return self.emit_opaque(v, var, lines, depth, with_options=True)
+
+        if t is DataclassV:
+            lines.append(f"{ind}{var} = {self.function(v)}({var}, from_dict)")
+            lines.append(f"{ind}if {var} is FAIL: return FAIL")
+            return True
+
+        if t is RegexV:
+            regex = self.const(v.regex)  # type: ignore
+            lines.append(
+                f"{ind}if not isinstance({var}, str) or not {regex}.validate({var}): return FAIL"
+            )
+            return False
+
+        if t is ListV:
+            return self.emit_list(v, var, lines, depth)  # type: ignore
+
+        if t is DictV:
+            return self.emit_dict(v, var, lines, depth)  # type: ignore
+
+        if t is UnionV:
+            self.emit_union(flatten_union(v), var, lines, depth)
+            return True
+
+        if t is OneOfV:
+            if v.tags is None and len(v.variants) <= _MAX_INLINE_VARIANTS:  # type: ignore
+                self.emit_union(flatten_union(v), var, lines, depth)
+                return True
+            return self.emit_opaque(v, var, lines, depth, with_options=True)
+
+        return self.emit_opaque(v, var, lines, depth, with_options=True)
+
+    def emit_nested(self, v: Validator, var: str, lines: List[str], depth: int) -> bool:
+        """Like `emit()`, but moves deeply nested containers into their own function."""
+        if depth > _MAX_INLINE_DEPTH and type(v) in (ListV, DictV):
+            ind = "    " * depth
+            lines.append(f"{ind}{var} = {self.function(v)}({var}, from_dict)")
+            lines.append(f"{ind}if {var} is FAIL: return FAIL")
+            return True
+
+        return self.emit(v, var, lines, depth)
+
+    def emit_opaque(
+        self, v: Validator, var: str, lines: List[str], depth: int, *, with_options: bool
+    ) -> bool:
+        """Fall back to calling the validator itself (e.g., custom validators)."""
+        ind = "    " * depth
+        va = self.const(v)
+        options = ", from_dict" if with_options else ""
+        lines.append(f"{ind}{var} = {va}.check({var}{options})")
+        lines.append(f"{ind}if {var} is FAIL: return FAIL")
+        return True
+
+    def emit_list(self, v: ListV, var: str, lines: List[str], depth: int) -> bool:
+        ind = "    " * depth
+        item = self.uid("_i")
+        if v.native is not None:
+            # one native call for the whole list
+            find = self.const(find_invalid_item)
+            lines.append(
+                f"{ind}if not isinstance({var}, list) or {find}({var}, {v.native!r}) is not None: return FAIL"
+            )
+            return False
+
+        if v.regexes is not None:
+            regexes = self.const(v.regexes)
+            lines.append(
+                f"{ind}if not isinstance({var}, list) or {regexes}.validate_many({var}): return FAIL"
+            )
+            return False
+
+        lines.append(f"{ind}if not isinstance({var}, list): return FAIL")
+
+        cond = self.condition(v.target, item)
+        if cond == "True":
+            return False
+
+        if not has_dataclass(v.target):
+            lines.append(f"{ind}for {item} in {var}:")
+            self.emit_nested(v.target, item, lines, depth + 1)
+            return False
+
+        # only dataclasses loaded from dicts are converted; build a new list then
+        if self.from_dict is False:
+            lines.append(f"{ind}for {item} in {var}:")
+            self.emit_nested(v.target, item, lines, depth + 1)
+            return False
+
+        if self.from_dict is None:
+            lines.append(f"{ind}if from_dict:")
+            depth += 1
+            ind += "    "
+
+        out = self.uid("_l")
+        lines.append(f"{ind}{out} = []")
+        lines.append(f"{ind}for {item} in {var}:")
+        self.emit_nested(v.target, item, lines, depth + 1)
+        lines.append(f"{ind}    {out}.append({item})")
+        lines.append(f"{ind}{var} = {out}")
+
+        if self.from_dict is None:
+            lines.append(f"{ind[:-4]}else:")
+            lines.append(f"{ind}for {item} in {var}:")
+            self.emit_nested(v.target, item, lines, depth + 1)
+        return True
+
+    def emit_dict(self, v: DictV, var: str, lines: List[str], depth: int) -> bool:
+        ind = "    " * depth
+        key = self.uid("_k")
+        item = self.uid("_i")
+        if v.native is not None:
+            find = self.const(find_invalid_entry)
+            kinds = ", ".join(map(repr, v.native))
+            lines.append(
+                f"{ind}if not isinstance({var}, dict) or {find}({var}, {kinds}) is not None: return FAIL"
+            )
+            return False
+
+        lines.append(f"{ind}if not isinstance({var}, dict): return FAIL")
+
+        if self.condition(v.key, key) == "True" and self.condition(v.value, item) == "True":
+            return False
+
+        if not has_dataclass(v.key) and not has_dataclass(v.value):
+            lines.append(f"{ind}for {key}, {item} in {var}.items():")
+            self.emit_nested(v.key, key, lines, depth + 1)
+            self.emit_nested(v.value, item, lines, depth + 1)
+            return False
+
+        if self.from_dict is False:
+            lines.append(f"{ind}for {key}, {item} in {var}.items():")
+            self.emit_nested(v.key, key, lines, depth + 1)
+            self.emit_nested(v.value, item, lines, depth + 1)
+            return False
+
+        if self.from_dict is None:
+            lines.append(f"{ind}if from_dict:")
+            depth += 1
+            ind += "    "
+
+        out = self.uid("_d")
+        lines.append(f"{ind}{out} = {{}}")
+        lines.append(f"{ind}for {key}, {item} in {var}.items():")
+        self.emit_nested(v.key, key, lines, depth + 1)
+        self.emit_nested(v.value, item, lines, depth + 1)
+        lines.append(f"{ind}    {out}[{key}] = {item}")
+        lines.append(f"{ind}{var} = {out}")
+
+        if self.from_dict is None:
+            lines.append(f"{ind[:-4]}else:")
+            lines.append(f"{ind}for {key}, {item} in {var}.items():")
+            self.emit_nested(v.key, key, lines, depth + 1)
+            self.emit_nested(v.value, item, lines, depth + 1)
+        return True
+
+    def emit_union(self, variants: List[Validator], var: str, lines: List[str], depth: int):
+        """Try each variant in order, just like the nested `UnionV` chain would."""
+        ind = "    " * depth
+
+        # fold leading variants that are simple conditions
+        leading = []
+        for item in variants:
+            cond = self.condition(item, var)
+            if cond is None:
+                break
+            leading.append((item, cond))
+
+        if leading:
+            cond = self.merge_conditions(
+                [item for item, _ in leading], [c for _, c in leading], var
+            )
+            rest = variants[len(leading) :]
+            if not rest:
+                if cond != "True":
+                    lines.append(f"{ind}if not {cond}: return FAIL")
+                return
+
+            if cond == "True":
+                return
+
+            lines.append(f"{ind}if not {cond}:")
+            self.emit_union(rest, var, lines, depth + 1)
+            return
+
+        first, rest = variants[0], variants[1:]
+        res = self.uid("_u")
+        lines.append(f"{ind}{res} = {self.function(first)}({var}, from_dict)")
+        if not rest:
+            lines.append(f"{ind}if {res} is FAIL: return FAIL")
+            lines.append(f"{ind}{var} = {res}")
+            return
+
+        lines.append(f"{ind}if {res} is not FAIL:")
+        lines.append(f"{ind}    {var} = {res}")
+        lines.append(f"{ind}else:")
+        self.emit_union(rest, var, lines, depth + 1)
+
+    def emit_dataclass(self, v: DataclassV, lines: List[str]):
+        dc = v.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        # instances we've validated are marked, until they're changed
+        marked = hasattr(dc, VALID_MARKER)
+        marker = self.const(v)
+
+        rf = self.const(v.rf)
+        lines.append(f"    cls = {rf}()")
+        lines.append("    if cls is None: return FAIL")
+
+        lines.append("    if from_dict:")
+        lines.append("        if not isinstance(value, dict): return FAIL")
+        lines.append("        get = value.get")
+        names = self.emit_fields(v, dc, lines, from_dict=True)
+        lines.append("        item = cls.__new__(cls)")
+        if marked:
+            if dc.__dictoffset__:
+                lines.append("        attrs = item.__dict__")
+            for name, var in [*names, (VALID_MARKER, marker)]:
+                lines.append(f"        {self.set_attr(dc, 'item', 'attrs', name, var)}")
+        else:
+            for name, var in names:
+                lines.append(f"        item.{name} = {var}")
+        lines.append("        return item")
+
+        if marked:
+            lines.append(f"    if getattr(value, {VALID_MARKER!r}, None) is {marker}: return value")
+        lines.append("    if not is_dataclass(value): return FAIL")
+        self.emit_fields(v, dc, lines, from_dict=False)
+        if marked:
+            mark = self.set_attr(dc, "value", "value.__dict__", VALID_MARKER, marker)
+            lines.append(f"    if type(value) is cls: {mark}")
+        lines.append("    return value")
+
+    def set_attr(self, dc: Any, obj: str, attrs: str, name: str, var: str) -> str:
+        """Set an attribute of an instance of `dc` without `__setattr__()`,
+        through its slot if it has one, or `attrs` (its `__dict__`) otherwise.
+        """
+        slot = get_slot(dc, name)
+        if slot is not None:
+            return f"{self.const(slot.__set__)}({obj}, {var})"
+        return f"{attrs}[{name!r}] = {var}"
+
+    def assign(self, dc: Any, name: str, var: str) -> str:
+        """Assign a field of `value`, an instance of `dc`."""
+        if dc.__dataclass_params__.frozen:
+            # frozen models refuse `__setattr__()`
+            return self.set_attr(dc, "value", "value.__dict__", name, var)
+        return f"value.{name} = {var}"
+
+    def emit_fields(self, v: DataclassV, dc: Any, lines: List[str], *, from_dict: bool):
+        ind = "        " if from_dict else "    "
+        names = []
+        self.from_dict = from_dict
+
+        for field in dc.__dataclass_fields__.values():
+            name = field.name
+            var = self.uid("_f")
+            names.append((name, var))
+
+            if from_dict:
+                lines.append(f"{ind}{var} = get({name!r}, MISSING)")
+            else:
+                lines.append(f"{ind}{var} = getattr(value, {name!r}, MISSING)")
+
+            lines.append(f"{ind}if {var} is MISSING:")
+            if field.default is not MISSING:
+                lines.append(f"{ind}    {var} = {self.const(field.default)}")
+            elif field.default_factory is not MISSING:
+                lines.append(f"{ind}    {var} = {self.const(field.default_factory)}()")
+            else:
+                # let the interpreter raise the KeyError
+                lines.append(f"{ind}    return FAIL")
+
+            if not from_dict and (
+                field.default is not MISSING or field.default_factory is not MISSING
+            ):
+                lines.append(f"{ind}    {self.assign(dc, name, var)}")
+
+            original = self.uid("_o")
+            at = len(lines)
+
+            rebound = self.emit_field(v, field, var, lines, len(ind) // 4)
+            if not from_dict and rebound:
+                lines.insert(at, f"{ind}{original} = {var}")
+                lines.append(f"{ind}if {var} is not {original}: {self.assign(dc, name, var)}")
+
+        self.from_dict = None
+        return names
+
+    def emit_field(self, v: DataclassV, field: Any, var: str, lines: List[str], depth: int) -> bool:
+        """Emit the checks of a single field (its type, then any extra
+        validators) on `var`. Returns whether `var` may have been rebound.
+        """
+        rebound = self.emit(v.targets[field.name], var, lines, depth)
+
+        ef = field.metadata.get("exact")
+        regex_set = get_regex_set(ef.validators) if ef and len(ef.validators) > 1 else None
+        if regex_set is not None:
+            # several patterns, matched in one pass
+            regex = self.const(regex_set)
+            lines.append(
+                f"{'    ' * depth}if not isinstance({var}, str) or not {regex}.validate({var}): return FAIL"
+            )
+        elif ef:
+            for item in ef.validators:
+                if type(item) is RegexV:
+                    rebound = self.emit(item, var, lines, depth) or rebound
+                else:
+                    self.emit_opaque(item, var, lines, depth, with_options=False)
+                    rebound = True
+
+        return rebound
+
+    def signature(
+        self, dc: Any, lines: List[str], first: str, name: str, prologue: Tuple[str, ...] = ()
+    ) -> List[str]:
+        """Start a constructor `name(first, *, <fields>)` taking the fields as
+        keyword-only arguments, with their defaults filled in (after `prologue`).
+
+        Like the `__init__()` it replaces, a missing field raises `KeyError`,
+        and other keyword arguments are ignored.
+
+        Returns the name each field's argument is bound to in the body.
+        """
+        fields = list(dc.__dataclass_fields__.values())
+        params = []
+        for field in fields:
+            if field.default is not MISSING:
+                params.append(f"{field.name}={self.const(field.default)}")
+            else:
+                params.append(f"{field.name}=MISSING")
+        params.append("**__exact_extra__")
+
+        args = [field.name for field in fields]
+        if any(_shadows(arg) for arg in args):
+            # the body would see the arguments instead of the names it uses,
+            # so it gets a function of its own
+            body = self.uid("_b")
+            inner = [self.uid("_a") for _ in args]
+            lines.append(f"def {name}({first}, *, {', '.join(params)}):")
+            lines.append(f"    return {body}({first}, {', '.join(args)})")
+            self.blocks.append("\n".join(lines))
+            lines.clear()
+
+            lines.append(f"def {body}({', '.join([first, *inner])}):")
+            args = inner
+        else:
+            lines.append(f"def {name}({', '.join([first, '*', *params])}):")
+
+        lines.extend(prologue)
+        for field, arg in zip(fields, args):
+            if field.default is not MISSING:
+                continue
+            if field.default_factory is not MISSING:
+                lines.append(f"    if {arg} is MISSING: {arg} = {self.const(field.default_factory)}()")
+            else:
+                lines.append(f"    if {arg} is MISSING: raise KeyError({field.name!r})")
+
+        return args
+
+    def fill(self, dc: Any, obj: str, names: List[Any], lines: List[str]):
+        """Set the fields of `obj` without `__setattr__()`."""
+        if dc.__dictoffset__:
+            lines.append(f"    attrs = {obj}.__dict__")
+        for name, var in names:
+            lines.append(f"    {self.set_attr(dc, obj, 'attrs', name, var)}")
+
+    def build_init(self, v: DataclassV, invalid: Callable[[Any, tuple], None]) -> Callable:
+        dc = v.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        lines: List[str] = []
+        args = self.signature(dc, lines, "__exact_self__", "__init__")
+        values = ", ".join(args) + ","
+        lines.append("    from_dict = False")
+
+        at = len(lines)
+        self.from_dict = False
+        names = []
+        for field, arg in zip(dc.__dataclass_fields__.values(), args):
+            var = self.uid("_f")
+            names.append((field.name, var))
+            lines.append(f"    {var} = {arg}")
+            self.emit_field(v, field, var, lines, 1)
+        self.from_dict = None
+
+        # on failure, `invalid` raises the errors
+        fail = f"return {self.const(invalid)}(__exact_self__, ({values}))"
+        lines[at:] = [line.replace("return FAIL", fail) for line in lines[at:]]
+
+        self.fill(dc, "__exact_self__", names, lines)
+        if hasattr(dc, VALID_MARKER):
+            mark = self.set_attr(dc, "__exact_self__", "attrs", VALID_MARKER, self.const(v))
+            lines.append(f"    if type(__exact_self__) is {self.const(dc)}: {mark}")
+
+        self.blocks.append("\n".join(lines))
+        return self.build_constructor(dc, "__init__")
+
+    def build_unsafe_init(self, dc: Any) -> Callable:
+        self.namespace["unsafe_mode"] = unsafe_mode
+
+        lines: List[str] = []
+        check = (
+            "    if not unsafe_mode.get(): "
+            "raise RuntimeError('Scope is not in unsafe(), canceled operation')"
+        )
+        args = self.signature(dc, lines, "cls", "__unsafe_init__", (check,))
+        lines.append("    item = cls.__new__(cls)")
+        self.fill(dc, "item", list(zip(dc.__dataclass_fields__, args)), lines)
+        lines.append("    return item")
+
+        self.blocks.append("\n".join(lines))
+        return self.build_constructor(dc, "__unsafe_init__")
+
+    def build_field_check(self, v: DataclassV, field: Any) -> Callable[[Any], Any]:
+        dc = v.rf()
+        name = self.uid("_v")
+        lines = [f"def {name}(value):", "    from_dict = False"]
+
+        self.from_dict = False
+        self.emit_field(v, field, "value", lines, 1)
+        self.from_dict = None
+        lines.append("    return value")
+
+        self.blocks.append("\n".join(lines))
+        source = "\n\n".join(self.blocks)
+        code = get_code(dc.__module__, f"{dc.__qualname__}.{field.name}", source)
+        exec(code, self.namespace)
+
+        fn = self.namespace[name]
+        fn.__exact_source__ = source
+        return fn
+
+    def build_constructor(self, dc: Any, name: str) -> Callable:
+        source = "\n\n".join(self.blocks)
+        code = get_code(dc.__module__, f"{dc.__qualname__}.{name}", source)
+        exec(code, self.namespace)
+
+        fn = self.namespace[name]
+        fn.__qualname__ = f"{dc.__qualname__}.{name}"
+        fn.__exact_source__ = source
+        return fn
+
+    def build(self, v: Validator) -> CompiledValidator:
+        entry = self.function(v)
+        source = "\n\n".join(self.blocks)
+
+        dc = v.rf() if type(v) is DataclassV else None  # type: ignore
+        if dc is not None:
+            code = get_code(dc.__module__, dc.__qualname__, source)
+        else:
+            code = compile(source, "<exacting>", "exec")
+        exec(code, self.namespace)
+
+        fn = self.namespace[entry]
+        fn.__exact_source__ = source
+        return fn
+
+
+# names the generated code may refer to, besides builtins
+_RESERVED = {
+    "FAIL",
+    "MISSING",
+    "is_dataclass",
+    "unsafe_mode",
+    "from_dict",
+    "attrs",
+    "item",
+    "cls",
+    "__exact_self__",
+}
+
+
+def _shadows(arg: str) -> bool:
+    """Whether an argument named `arg` would hide a name generated code uses."""
+    return (
+        arg in _RESERVED
+        or hasattr(builtins, arg)
+        or re.fullmatch(r"_[a-z]\d+", arg) is not None
+    )
+
+
+def compile_validator(v: Validator) -> CompiledValidator:
+    """Compile a validator tree into a single specialized function.
+
+    The returned function takes `(value, from_dict)` and returns the validated
+    value, or `FAIL` if validation failed. It never builds errors; re-run the
+    validator itself to get them.
+
+    Custom validators are called as-is.
+    """
+    return _Compiler().build(v)
+
+
+def compile_init(v: DataclassV, invalid: Callable[[Any, tuple], None]) -> Callable:
+    """Compile an `__init__()` for the model of `v`.
+
+    It takes the fields as keyword-only arguments, checks each one before it's
+    set, and sets them directly. If anything fails, `invalid(self, values)` is
+    called with every field's value, in order, and is expected to raise.
+    """
+    return _Compiler().build_init(v, invalid)
+
+
+def compile_unsafe_init(dc: Any) -> Callable:
+    """Compile an `__unsafe_init__()` for `dc`, which fills an instance
+    without checking anything (only in `unsafe()` mode).
+    """
+    return _Compiler().build_unsafe_init(dc)
+
+
+def compile_field_check(v: DataclassV, name: str) -> Callable[[Any], Any]:
+    """Compile the checks of a single field of the model of `v`.
+
+    The returned function takes a value and returns the validated value, or
+    `FAIL`.
+    """
+    dc = v.rf()
+    if dc is None:
+        raise RuntimeError("Weakref is gone")
+    return _Compiler().build_field_check(v, dc.__dataclass_fields__[name])
@@ -1,65 +1,270 @@
-import json
-from dataclasses import MISSING, asdict, dataclass
-
-from typing import TYPE_CHECKING, Any, Dict, Type
+import inspect
+import os
+from dataclasses import FrozenInstanceError, dataclass, fields
+
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    overload,
+)
 from typing_extensions import Self, dataclass_transform
 
+from .assignment import (
+    ValidatedField,
+    add_marked_fields,
+    add_validated_fields,
+    check_field,
+    clear_inherited_fields,
+    replace,
+    set_field,
+)
+from .compiler import compile_init, compile_unsafe_init
+from .dicts import ModelView, as_dict
 from .validators import DataclassV, Validator
-from .validator_map import get_dc_validator
-from .types import DataclassType
+from .validator_map import LazyValidator
+from .types import HASH_CACHE, VALID_MARKER, DataclassType
 from .result import Result
-from .utils import get_field_value, unsafe_mode
 
-from .exacting import bytes_to_py, json_to_py, jsonc_to_py, py_to_bytes
+from .exacting import ArchiveFile, json_to_py, jsonc_to_py, py_to_bytes, write_archive
+
+
+def as_result(loaded: Tuple[Any, Optional[List[str]]]) -> Result:
+    """Get what `Schema` loaded as a `Result`."""
+    data, errors = loaded
+    if errors is not None:
+        return Result.Err(*errors)
+    return Result.Ok(data)
+
+
+def validate_json(
+    v: DataclassV, raw: Any, strict: bool, backend: Optional[str], collect_all: bool
+) -> Result:
+    """Decode JSON straight into Python objects (keys shared), then validate it.
+
+    Only for reporting every error (`collect_all`) once the schema, which
+    stops at the first one, has rejected the input.
+    """
+    data = json_to_py(raw, backend=backend) if strict else jsonc_to_py(raw, backend=backend)
+    return v.validate(data, from_dict=True, collect_all=collect_all)
 
 
 def get_exact_init(dc: DataclassType):
-    setattr(dc, "__validator__", get_dc_validator(dc))
+    # built on first use, so defining models stays cheap
+    setattr(dc, "__validator__", LazyValidator(dc))
 
-    def init(self, **kwargs):
-        for field in self.__dataclass_fields__.values():
-            value = get_field_value(kwargs.get(field.name, MISSING), field)
-            setattr(self, field.name, value)
+    def invalid(self, values: tuple):
+        # set everything as given, so the validator can tell what's wrong
+        for name, value in zip(dc.__dataclass_fields__, values):
+            set_field(self, name, value)
 
-        validator: Validator = self.__validator__
+        validator: Validator = dc.__validator__
         res: Result = validator.validate(self)
         res.raise_for_err()
 
-        return None
+    def init(self, **kwargs):
+        # generated on first use, too, then takes over
+        real = compile_init(dc.__validator__, invalid)
+        if dc.__dict__.get("__init__") is init:
+            setattr(dc, "__init__", real)
+        setattr(dc, "__exact_init__", real)
+
+        return real(self, **kwargs)
 
     return init
 
 
-def get_unsafe_init():
+def get_unsafe_init(dc: DataclassType):
     @classmethod
     def __unsafe_init__(cls, **kwargs):
-        if not unsafe_mode.get():
-            raise RuntimeError("Scope is not in unsafe(), canceled operation")
-
-        item = cls.__new__(cls)
-        for field in cls.__dataclass_fields__.values():
-            setattr(
-                item,
-                field.name,
-                get_field_value(kwargs.get(field.name, MISSING), field),
-            )
-        return item
+        # generated on first use, then takes over
+        real = compile_unsafe_init(dc)
+        setattr(dc, "__unsafe_init__", classmethod(real))
+
+        return real(cls, **kwargs)
 
     return __unsafe_init__
 
 
+def get_cached_hash(dc: DataclassType):
+    names = tuple(
+        field.name
+        for field in fields(dc)
+        if (field.compare if field.hash is None else field.hash)
+    )
+
+    def __hash__(self) -> int:
+        # frozen, so it never changes
+        h = getattr(self, HASH_CACHE, None)
+        if h is None:
+            h = hash(tuple(getattr(self, name) for name in names))
+            object.__setattr__(self, HASH_CACHE, h)
+        return h
+
+    return __hash__
+
+
+def add_slots(dc: DataclassType, extra: Tuple[str, ...] = ()) -> DataclassType:
+    """Rebuild a dataclass with `__slots__` for its fields (the validated
+    marker, and `extra`), so its instances have no `__dict__`.
+    """
+    inherited = set()
+    for base in dc.__mro__[1:]:
+        inherited.update(base.__dict__.get("__slots__", ()))
+
+    names = [field.name for field in fields(dc)]
+    ns = dict(dc.__dict__)
+    ns["__slots__"] = tuple(
+        name for name in (*names, VALID_MARKER, *extra) if name not in inherited
+    )
+    for name in names:
+        # defaults are kept on the fields; class attributes would clash
+        ns.pop(name, None)
+    ns.pop("__dict__", None)
+    ns.pop("__weakref__", None)
+
+    slotted = type(dc)(dc.__name__, dc.__bases__, ns)
+    slotted.__qualname__ = dc.__qualname__
+
+    # zero-argument `super()` (and `__class__`) would still see the old class
+    for member in ns.values():
+        if isinstance(member, (classmethod, staticmethod)):
+            member = member.__func__
+        member = inspect.unwrap(member)
+        if isinstance(member, property):
+            funcs = (member.fget, member.fset, member.fdel)
+        else:
+            funcs = (member,)
+        for func in funcs:
+            update_class_cell(func, dc, slotted)
+
+    return slotted
+
+
+def update_class_cell(func: Any, old: type, new: type):
+    """Point the `__class__` cell of `func` at `new`, if it's `old`."""
+    code = getattr(func, "__code__", None)
+    if code is None or "__class__" not in code.co_freevars:
+        return
+
+    cell = func.__closure__[code.co_freevars.index("__class__")]
+    if cell.cell_contents is old:
+        cell.cell_contents = new
+
+
+@overload
+def exact(
+    cls: Type,
+    /,
+    *,
+    slots: bool = False,
+    frozen: bool = False,
+    validate_assignment: bool = False,
+) -> DataclassType: ...
+@overload
+def exact(
+    cls: None = None,
+    /,
+    *,
+    slots: bool = False,
+    frozen: bool = False,
+    validate_assignment: bool = False,
+) -> Callable[[Type], DataclassType]: ...
+
+
 @dataclass_transform(kw_only_default=True)
-def exact(cls: Type) -> DataclassType:
-    dc = dataclass(kw_only=True, init=False)(cls)
-    unsafe_init = get_unsafe_init()
+def exact(
+    cls: Optional[Type] = None,
+    /,
+    *,
+    slots: bool = False,
+    frozen: bool = False,
+    validate_assignment: bool = False,
+) -> Any:
+    """Make a class a dataclass with runtime type checks.
+
+    Also gives `Exact` subclasses (which are models already) `__slots__`,
+    with `@exact(slots=True)`; their other options are class keywords.
+
+    Args:
+        slots (bool): Whether to give instances `__slots__` instead of a `__dict__`.
+        frozen (bool): Whether to make instances immutable (and hashable, with
+            the hash computed once).
+        validate_assignment (bool): Whether to validate values assigned to
+            fields (just that field, each time).
+    """
+    if frozen and validate_assignment:
+        raise TypeError("Frozen models can't be assigned to, so can't validate assignments")
+
+    def wrap(cls: Type) -> DataclassType:
+        if "__exact_init__" in cls.__dict__:
+            # an `Exact` subclass, made a model when it was defined
+            if frozen or validate_assignment:
+                raise TypeError(
+                    "Pass frozen= and validate_assignment= to Exact subclasses as class "
+                    f"keywords, like class {cls.__name__}(Exact, frozen=True)"
+                )
+            return add_model_slots(cls) if slots else cls
+
+        clear_inherited_fields(cls)
+        dc = dataclass(kw_only=True, init=False, frozen=frozen)(cls)
+        if frozen:
+            setattr(dc, "__hash__", get_cached_hash(dc))
+        if slots:
+            dc = add_slots(dc, (HASH_CACHE,) if frozen else ())
+        return finish_model(dc, validate_assignment)
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
+
+
+def finish_model(dc: DataclassType, validate_assignment: bool) -> DataclassType:
+    """Give a dataclass (the final class, slotted or not) what makes it a model."""
+    if validate_assignment:
+        add_validated_fields(dc)
+    elif not dc.__dataclass_params__.frozen and hasattr(dc, VALID_MARKER):
+        add_marked_fields(dc)
+
+    unsafe_init = get_unsafe_init(dc)
     setattr(dc, "__unsafe_init__", unsafe_init)
 
     exact_init = get_exact_init(dc)
     setattr(dc, "__exact_init__", exact_init)
+    if "__init__" not in dc.__dict__:
+        setattr(dc, "__init__", exact_init)
 
     return dc
 
 
+def add_model_slots(model: DataclassType) -> DataclassType:
+    """Rebuild a finished model with `__slots__` (see `add_slots()`), with the
+    same options.
+    """
+    frozen = model.__dataclass_params__.frozen
+    validate_assignment = any(
+        isinstance(model.__dict__.get(field.name), ValidatedField) for field in fields(model)
+    )
+    # the generated one, which belongs to `model`
+    own_init = model.__dict__.get("__init__") is not model.__dict__.get("__exact_init__")
+
+    dc = add_slots(model, (HASH_CACHE,) if frozen else ())
+    if not own_init:
+        delattr(dc, "__init__")
+    return finish_model(dc, validate_assignment)
+
+
 if TYPE_CHECKING:
 
     class _Internals:
@@ -85,73 +290,349 @@ if TYPE_CHECKING:
 
 else:
 
-    class _Dc: ...
+    class _Dc:
+        __slots__ = ()
 
     class _Internals:
+        __slots__ = ()
+
         def __init__(self, **kwargs):
             self.__exact_init__(**kwargs)
 
 
 class Exact(_Dc, _Internals):
-    """Represents a dataclass with runtime type checks."""
+    """Represents a dataclass with runtime type checks.
+
+    Pass `frozen=True` (`class M(Exact, frozen=True)`) to make instances
+    immutable, or `validate_assignment=True` to validate fields when they're
+    assigned to. To use `__slots__` instead of a `__dict__` per instance,
+    decorate the model with `@exact(slots=True)`.
+    """
+
+    __slots__ = ()
+
+    # the validator that validated this instance; assigning to a field
+    # clears it (see `add_marked_fields()`)
+    __exact_valid__ = None
+
+    def __init_subclass__(
+        cls,
+        *,
+        slots: bool = False,
+        frozen: bool = False,
+        validate_assignment: bool = False,
+        **kwargs,
+    ):
+        super().__init_subclass__(**kwargs)
+        if "__dataclass_fields__" in cls.__dict__:
+            # rebuilt by `add_slots()`
+            return
+        if slots:
+            # the class statement would still bind the class without them
+            raise TypeError(
+                f"Exact subclasses can't get __slots__ from a class keyword; "
+                f"decorate {cls.__name__} with @exact(slots=True) instead"
+            )
 
-    def __init_subclass__(cls):
-        exact(cls)
+        exact(cls, frozen=frozen, validate_assignment=validate_assignment)
+
+    def __getstate__(self) -> Any:
+        state = getattr(self, "__dict__", None)
+        if state is None:
+            # slotted, in the format pickle expects
+            return None, {
+                name: getattr(self, name)
+                for name in self.__dataclass_fields__
+                if hasattr(self, name)
+            }
+
+        state = state.copy()
+        state.pop(VALID_MARKER, None)
+        state.pop(HASH_CACHE, None)
+        return state
+
+    def __setstate__(self, state: Any):
+        # frozen models refuse `setattr()`, and this shouldn't count as an
+        # assignment anyway
+        if isinstance(state, tuple):
+            state, slots = state
+            state = {**(state or {}), **(slots or {})}
+        for name, value in state.items():
+            set_field(self, name, value)
 
     def __getitem__(self, k: str) -> Any:
         return getattr(self, k)
 
     def __setitem__(self, k: str, item: Any):
-        res = self.__validator__.targets[k].validate(item)
-        res.raise_for_err()
-        setattr(self, k, item)
+        if self.__dataclass_params__.frozen:
+            raise FrozenInstanceError(f"cannot assign to field {k!r}")
 
-    def exact_as_dict(self) -> Dict[str, Any]:
-        """Get this model instance as a dictionary."""
-        return asdict(self)
+        # validated here, so the instance stays valid
+        set_field(self, k, check_field(self.__validator__, k, item))
 
-    def exact_as_json(self) -> str:
-        """Get this model instance as JSON."""
-        return json.dumps(self.exact_as_dict())
+    def exact_replace(self, **changes: Any) -> Self:
+        """Get a copy of this model instance with some fields changed.
+
+        Only the changed fields are validated; the rest are shared with this
+        instance (not copied).
+        """
+        return replace(self, changes)
+
+    def exact_as_dict(
+        self, *, mode: Literal["deep", "models", "shallow"] = "deep"
+    ) -> Dict[str, Any]:
+        """Get this model instance as a dictionary.
+
+        Args:
+            mode (str): How much to copy.
+
+                - `"deep"` copies everything, like `dataclasses.asdict()`.
+                - `"models"` turns nested models into dicts, but shares lists,
+                  dicts and other values that can't hold models.
+                - `"shallow"` only gets the fields, as they are.
+        """
+        return as_dict(self, self.__validator__, mode)
+
+    def exact_as_mapping(self) -> Mapping[str, Any]:
+        """Get a read-only mapping view of this model instance's fields.
+
+        Nothing is copied; values are read from the instance on access.
+        """
+        return ModelView(self, self.__validator__.targets)
+
+    @overload
+    def exact_as_json(self, *, as_bytes: Literal[False] = False) -> str: ...
+    @overload
+    def exact_as_json(self, *, as_bytes: Literal[True]) -> bytes: ...
+
+    def exact_as_json(self, *, as_bytes: bool = False) -> Union[str, bytes]:
+        """Get this model instance as compact JSON.
+
+        Args:
+            as_bytes (bool): Whether to get UTF-8 encoded bytes instead of a string.
+        """
+        return self.__validator__.schema.dump_json(self, as_bytes)
 
     def exact_as_bytes(self) -> bytes:
-        """Get this model instance as bytes with `rkyv`.
+        """Get this model instance as bytes with `rkyv`."""
+        return py_to_bytes(self)
 
-        This may **not** be super efficient.
+    @classmethod
+    def exact_dump_json_many(
+        cls,
+        items: Iterable[Self],
+        target: Union[str, os.PathLike, IO, Any],
+        /,
+        *,
+        chunk_size: int = 65536,
+        format: Literal["json", "bytes"] = "json",
+    ) -> int:
+        """(exacting) Write many model instances, one after another.
+
+        With `format="json"`, each instance is a line of compact JSON
+        (newline-delimited JSON). With `format="bytes"`, each is the output of
+        `exact_as_bytes()`, prefixed with its length as a little-endian u64.
+
+        Output is collected in a reused buffer and written every `chunk_size`
+        bytes. Files are written to directly, with the GIL released.
+
+        Args:
+            items (Iterable): The instances.
+            target (str | PathLike | IO | socket): A file path, a file opened for
+                writing, a socket, or anything with `write(b)`.
+            chunk_size (int): How many bytes to collect before each write.
+            format (str): `"json"` or `"bytes"`.
+
+        Returns:
+            int: How many instances were written.
         """
-        return py_to_bytes(self.exact_as_dict())
+        return cls.__validator__.schema.dump_many(items, target, chunk_size, format)
 
     @classmethod
-    def exact_from_dict(cls, d: Dict[str, Any]) -> Self:
-        """(exacting) Get this model from a raw dictionary."""
-        res = cls.__validator__.validate(d, from_dict=True)
+    def exact_from_dict(cls, d: Dict[str, Any], /, *, collect_all: bool = False) -> Self:
+        """(exacting) Get this model from a raw dictionary.
+
+        Args:
+            d (dict): The raw dictionary.
+            collect_all (bool): Whether to report every error, instead of
+                stopping at the first one.
+        """
+        res = cls.__validator__.validate(d, from_dict=True, collect_all=collect_all)
         res.raise_for_err()
         return res.unwrap()
 
     @classmethod
-    def exact_from_json(cls, raw: str, /, *, strict: bool = True) -> Self:
+    def exact_from_json(
+        cls,
+        raw: Union[str, bytes, bytearray, memoryview],
+        /,
+        *,
+        strict: bool = True,
+        collect_all: bool = False,
+        backend: Optional[str] = None,
+    ) -> Self:
         """(exacting) Get this model from raw JSON.
 
         When strict mode is set to `False`, you could use JSON with comments
         and more modern features.
 
         Args:
-            raw (str): The raw JSON data.
+            raw (str | bytes | bytearray | memoryview): The raw JSON data.
+                Bytes and other buffers are read in place, without copying.
             strict (bool): Whether to turn strict mode on.
+            collect_all (bool): Whether to report every error, instead of
+                stopping at the first one.
+            backend (str, optional): The parser to use: `"serde"`, `"simd"`,
+                `"jsonc"` or `"json5"`. Overrides `strict`.
         """
-        if strict:
-            d = json_to_py(raw)
-        else:
-            d = jsonc_to_py(raw)
+        res = as_result(cls.__validator__.schema.load_json(raw, strict, backend))
+        if not res.is_ok() and collect_all:
+            # the schema stops at the first error
+            res = validate_json(cls.__validator__, raw, strict, backend, True)
+
+        res.raise_for_err()
+        return res.unwrap()
+
+    @classmethod
+    def exact_from_json_file(
+        cls,
+        path: Union[str, os.PathLike],
+        /,
+        *,
+        strict: bool = True,
+        collect_all: bool = False,
+        backend: Optional[str] = None,
+    ) -> Self:
+        """(exacting) Get this model from a JSON file.
+
+        The file is memory-mapped and parsed in place, so it must not be
+        changed meanwhile.
+
+        Args:
+            path (str | PathLike): The file path.
+            strict (bool): Whether to turn strict mode on.
+            collect_all (bool): Whether to report every error, instead of
+                stopping at the first one.
+            backend (str, optional): See `exact_from_json()`.
+        """
+        res = as_result(cls.__validator__.schema.load_json_file(path, strict, backend))
+        if not res.is_ok() and collect_all:
+            with open(path, "rb") as f:
+                # the schema stops at the first error
+                res = validate_json(cls.__validator__, f.read(), strict, backend, True)
 
-        res = cls.__validator__.validate(d, from_dict=True)
         res.raise_for_err()
         return res.unwrap()
 
     @classmethod
     def exact_from_bytes(cls, raw: bytes) -> Self:
         """(exacting) Get this model from raw bytes."""
-        d = bytes_to_py(raw)
-        res = cls.__validator__.validate(d, from_dict=True)
+        res = as_result(cls.__validator__.schema.load_bytes(raw))
         res.raise_for_err()
         return res.unwrap()
+
+    @classmethod
+    def exact_iter_json(
+        cls,
+        source: Union[str, os.PathLike, IO],
+        /,
+        *,
+        chunk_size: int = 65536,
+        format: Optional[Literal["ndjson", "array"]] = None,
+    ) -> Iterator[Self]:
+        """(exacting) Lazily get this model from newline-delimited JSON, or
+        from the items of a top-level JSON array.
+
+        The file is read in chunks, and only one item is held in memory at a time.
+
+        Args:
+            source (str | PathLike | IO): A file path, or a file opened for reading.
+            chunk_size (int): How many bytes to read at a time.
+            format (str, optional): `"ndjson"` or `"array"`. By default, a
+                stream starting with `[` is taken as a top-level array.
+        """
+        for loaded in cls.__validator__.schema.iter_json(source, chunk_size, format):
+            res = as_result(loaded)
+            res.raise_for_err()
+            yield res.unwrap()
+
+    @classmethod
+    def exact_from_json_many(
+        cls,
+        raws: Iterable[Union[str, bytes]],
+        /,
+        *,
+        strict: bool = True,
+        workers: Optional[int] = None,
+        backend: Optional[str] = None,
+    ) -> List["Result[Self]"]:
+        """(exacting) Get many of this model from raw JSON, in parallel.
+
+        Parsing and checking happen on a thread pool without the GIL. One
+        `Result` is returned per item, in order, so a bad item doesn't abort
+        the whole batch.
+
+        Args:
+            raws (Iterable[str | bytes]): The raw JSON data.
+            strict (bool): Whether to turn strict mode on.
+            workers (int, optional): Number of threads. Defaults to one per core.
+            backend (str, optional): See `exact_from_json()`.
+        """
+        loaded = cls.__validator__.schema.load_json_many(list(raws), strict, workers, backend)
+        return [as_result(item) for item in loaded]
+
+    @classmethod
+    def exact_from_bytes_many(
+        cls, raws: Iterable[bytes], /, *, workers: Optional[int] = None
+    ) -> List["Result[Self]"]:
+        """(exacting) Get many of this model from raw bytes, in parallel.
+
+        See `exact_from_json_many()`.
+
+        Args:
+            raws (Iterable[bytes]): The raw bytes.
+            workers (int, optional): Number of threads. Defaults to one per core.
+        """
+        loaded = cls.__validator__.schema.load_bytes_many(list(raws), workers)
+        return [as_result(item) for item in loaded]
+
+    @classmethod
+    def exact_write_archive(
+        cls, path: Union[str, os.PathLike], items: Iterable[Self], /
+    ) -> int:
+        """(exacting) Write many of this model to an archive file, to be opened
+        with `exact_open_archive()`.
+
+        Returns the number of records written.
+
+        Args:
+            path (str | PathLike): The file path.
+            items (Iterable[Self]): The model instances.
+        """
+        return write_archive(path, items)
+
+    @classmethod
+    def exact_open_archive(
+        cls, path: Union[str, os.PathLike], /, *, trusted: bool = False
+    ) -> ArchiveFile:
+        """(exacting) Memory-map an archive file of this model.
+
+        Records are read-only views that read fields straight from the file,
+        so nothing is copied until it's accessed. Every record is validated
+        once here; for trusted files, pass `trusted=True` to skip that.
+
+        Args:
+            path (str | PathLike): The file path.
+            trusted (bool): Whether to skip validation.
+        """
+        archive = ArchiveFile(path, cls.__validator__.schema, trusted)
+        if not trusted:
+            failed = archive.validate()
+            if failed is not None:
+                idx, errors = failed
+                res = Result.Err(*errors).trace(
+                    f"During validation of archive record {idx}, got:"
+                )
+                res.raise_for_err()
+
+        return archive
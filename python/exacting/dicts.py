@@ -0,0 +1,180 @@
+"""Converting models to dicts, copying no more than needed.
+
+What each field needs is decided once per model from its validators (see
+`get_plan()`), not by looking at every value.
+"""
+
+from collections.abc import Mapping
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .compiler import flatten_union
+from .validators import (
+    BoolV,
+    BytesV,
+    DataclassV,
+    DictV,
+    FloatV,
+    IntV,
+    ListV,
+    LiteralV,
+    NoneV,
+    OneOfV,
+    RegexV,
+    StrV,
+    UnionV,
+    Validator,
+)
+
+# converts a field's value; `None` means it's shared as is
+Converter = Optional[Callable[[Any], Any]]
+Plan = List[Tuple[str, Converter]]
+
+# validators that only ever let immutable values through
+_PLAIN = (IntV, FloatV, BoolV, StrV, BytesV, NoneV, LiteralV, RegexV)
+
+
+def is_plain(v: Validator) -> bool:
+    """Whether `v` only lets through data that never holds a model."""
+    t = type(v)
+    if t in _PLAIN:
+        return True
+    if t is ListV:
+        return is_plain(v.target)  # type: ignore
+    if t is DictV:
+        return is_plain(v.key) and is_plain(v.value)  # type: ignore
+    if t is UnionV or t is OneOfV:
+        return all(is_plain(item) for item in flatten_union(v))
+
+    return False
+
+
+def get_converter(v: Validator) -> Converter:
+    if is_plain(v):
+        return None
+
+    t = type(v)
+    if t is DataclassV:
+        return _model_converter(v)  # type: ignore
+
+    if t is ListV:
+        item = get_converter(v.target)  # type: ignore
+        if item is not None:
+            return lambda value: [item(x) for x in value]
+
+    if t is DictV and is_plain(v.key):  # type: ignore
+        item = get_converter(v.value)  # type: ignore
+        if item is not None:
+            return lambda value: {k: item(x) for k, x in value.items()}
+
+    # unions, Any, custom validators...: look at the value after all
+    return convert
+
+
+def get_plan(v: DataclassV) -> Plan:
+    """Get how to convert each field of the model, building it on first use."""
+    if v.dict_plan is None:
+        # set before converters are made, for recursive models
+        v.dict_plan = plan = []
+        plan.extend((name, get_converter(target)) for name, target in v.targets.items())
+    return v.dict_plan
+
+
+def _model_converter(v: DataclassV) -> Callable[[Any], Any]:
+    def converter(value: Any) -> Any:
+        if type(value) is v.rf():
+            return from_plan(value, get_plan(v))
+        return convert(value)
+
+    return converter
+
+
+def from_plan(value: Any, plan: Plan) -> Dict[str, Any]:
+    data = {}
+    for name, converter in plan:
+        item = getattr(value, name)
+        data[name] = item if converter is None else converter(item)
+    return data
+
+
+def convert(value: Any) -> Any:
+    """Convert models found in `value`, sharing everything else.
+
+    Containers are only rebuilt if something in them had to be converted.
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        v = getattr(type(value), "__validator__", None)
+        if isinstance(v, DataclassV):
+            return from_plan(value, get_plan(v))
+        return {
+            name: convert(getattr(value, name)) for name in value.__dataclass_fields__
+        }
+
+    t = type(value)
+    if t is list or t is tuple:
+        items = [convert(item) for item in value]
+        if all(a is b for a, b in zip(items, value)):
+            return value
+        return items if t is list else tuple(items)
+
+    if t is dict:
+        data = {k: convert(item) for k, item in value.items()}
+        if all(data[k] is item for k, item in value.items()):
+            return value
+        return data
+
+    return value
+
+
+def as_dict(value: Any, v: DataclassV, mode: str) -> Dict[str, Any]:
+    """Get a model instance as a dict.
+
+    Args:
+        value (Any): The model instance.
+        v (DataclassV): Its validator.
+        mode (str): `"deep"` copies everything (like `dataclasses.asdict()`),
+            `"models"` converts nested models but shares everything else, and
+            `"shallow"` only gets the fields, as they are.
+    """
+    if mode == "deep":
+        return asdict(value)
+    if mode == "models":
+        return from_plan(value, get_plan(v))
+    if mode == "shallow":
+        return {name: getattr(value, name) for name in v.targets}
+
+    raise ValueError(f"Unknown mode {mode!r}, expected 'deep', 'models' or 'shallow'")
+
+
+class ModelView(Mapping):
+    """A read-only mapping over the fields of a model instance.
+
+    Nothing is copied: values are read from the instance on access, so the
+    view sees later changes to it.
+    """
+
+    __slots__ = ("_model", "_fields")
+
+    _model: Any
+    _fields: Dict[str, Any]
+
+    def __init__(self, model: Any, fields: Dict[str, Any]):
+        self._model = model
+        self._fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self._model, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __repr__(self) -> str:
+        return f"ModelView({self._model!r})"
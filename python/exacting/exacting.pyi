@@ -1,24 +1,57 @@
-from typing import Any
+import os
+from typing import IO, Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
 
-def json_to_py(json: str) -> Any:
+Backend = Literal["serde", "simd", "jsonc", "json5"]
+
+def json_to_py(
+    json: Union[str, bytes, bytearray, memoryview],
+    cache_values: bool = False,
+    backend: Optional[Backend] = None,
+) -> Any:
     """Convert raw JSON to Python data types.
 
+    Repeated dict keys share a single (interned) string.
+
     Args:
-        json (str): The JSON data.
+        json (str | bytes | bytearray | memoryview): The JSON data. Read in
+            place, without copying.
+        cache_values (bool): Whether repeated short string values should
+            share a single string, too.
+        backend (str, optional): The parser: `"serde"` (the default),
+            `"simd"` (`simd-json`), `"jsonc"`
+            (comments and trailing commas) or `"json5"`.
     """
 
-def jsonc_to_py(json: str) -> Any:
+def jsonc_to_py(
+    json: Union[str, bytes, bytearray, memoryview],
+    cache_values: bool = False,
+    backend: Optional[Backend] = None,
+) -> Any:
     """Convert raw JSON to Python data bytes while allowing comments,
     trailing commas, object keys without quotes, single quoted strings and more.
 
-    Uses JSON5:
+    Comments and trailing commas are stripped in a single pass before a strict
+    parse; anything else falls back to JSON5:
     > JSON5 is a superset of JSON with an expanded syntax including some productions from ECMAScript 5.1.
 
     Args:
-        json (str): The JSONC data.
+        json (str | bytes | bytearray | memoryview): The JSONC data.
+        cache_values (bool): See `json_to_py()`.
+        backend (str, optional): See `json_to_py()`.
     """
 
 class Regex:
+    """A compiled regex.
+
+    Patterns are compiled once per process, and shared by every `Regex`
+    made from them.
+    """
+
+    engine: Literal["linear", "fancy"]
+    """`"linear"` (the `regex` crate, in linear time) unless the pattern needs
+    lookaround or backreferences, then `"fancy"` (`fancy_regex`, which
+    backtracks)."""
+
     def __init__(self, m: str): ...
     def validate(self, input: str) -> bool:
         """Checks if `input` matches the regex.
@@ -30,8 +63,236 @@ class Regex:
             RuntimeError: Rust-side error.
         """
 
+    def validate_many(self, inputs: List[Any], all: bool = False) -> List[int]:
+        """Find the items of `inputs` that don't match (items that aren't `str`
+        never do).
+
+        Long lists are matched with the GIL released, and in parallel.
+
+        Args:
+            inputs (list): The inputs.
+            all (bool): Whether to find every such item, not just the first.
+
+        Returns:
+            Their indices; empty if every item matches.
+
+        Raises:
+            RuntimeError: Rust-side error.
+        """
+
+class RegexSet:
+    """Several regexes that must all match, checked in a single pass where
+    the patterns allow it.
+    """
+
+    def __init__(self, patterns: List[str]): ...
+    def validate(self, input: str) -> bool:
+        """Checks if `input` matches every regex.
+
+        Raises:
+            RuntimeError: Rust-side error.
+        """
+
+    def validate_many(self, inputs: List[Any], all: bool = False) -> List[int]:
+        """Like `Regex.validate_many()`, for every regex."""
+
+    def find_mismatch(self, input: str) -> Optional[int]:
+        """Find the first regex that `input` doesn't match.
+
+        Returns:
+            Its index, or `None` if `input` matches them all.
+
+        Raises:
+            RuntimeError: Rust-side error.
+        """
+
 def py_to_bytes(data: Any) -> bytes:
-    """Convert Python data to bytes."""
+    """Convert Python data to bytes.
+
+    Dataclass instances are converted to dicts of their fields along the way.
+    The output starts with a header holding the format version.
+    """
 
 def bytes_to_py(data: bytes) -> Any:
-    """Convert bytes to Python data."""
+    """Convert bytes to Python data.
+
+    Raises:
+        ValueError: The bytes are not in the current format version.
+    """
+
+def find_invalid_item(list: List[Any], kinds: str) -> Optional[int]:
+    """Find the first item of `list` that isn't of the given primitive types.
+
+    Args:
+        list (list): The list.
+        kinds (str): Types separated by `|`, out of `"int"`, `"float"`,
+            `"bool"`, `"str"`, `"bytes"` and `"none"`.
+
+    Returns:
+        The index of that item, or `None` if every item is valid.
+    """
+
+def find_invalid_entry(
+    dict: Dict[Any, Any], key_kinds: str, value_kinds: str
+) -> Optional[int]:
+    """Find the first entry of `dict` whose key or value isn't of the given
+    primitive types (see `find_invalid_item()`).
+
+    Returns:
+        The index of that entry, or `None` if every entry is valid.
+    """
+
+class Schema:
+    """A validator tree mirrored on the Rust side.
+
+    Documents are checked against the schema before any Python object is
+    created; only validated data gets materialized.
+    """
+
+    def __init__(self, spec: tuple): ...
+    def dump_json(self, value: Any, as_bytes: bool = False) -> Union[str, bytes]:
+        """Write `value` as compact JSON, walking it along the schema.
+
+        Args:
+            value (Any): The data, usually a model instance.
+            as_bytes (bool): Whether to get UTF-8 encoded bytes instead of a string.
+        """
+
+    def dump_many(
+        self,
+        items: Iterable[Any],
+        target: Union[str, os.PathLike, IO, Any],
+        chunk_size: int = 65536,
+        format: str = "json",
+    ) -> int:
+        """Write every item as a line of JSON, or as length-prefixed bytes
+        (see `py_to_bytes`), flushing to `target` in chunks.
+
+        Returns how many items were written.
+
+        Args:
+            items (Iterable): The data.
+            target (str | PathLike | IO | socket): A file path, a file opened
+                for writing, a socket, or anything with `write(b)`.
+            chunk_size (int): How many bytes to collect before each write.
+            format (str): `"json"` or `"bytes"`.
+        """
+
+    def load_json(
+        self,
+        json: Union[str, bytes, bytearray, memoryview],
+        strict: bool,
+        backend: Optional[Backend] = None,
+    ) -> Tuple[Any, Optional[List[str]]]:
+        """Parse, check and build from JSON.
+
+        Returns `(data, None)` when OK, or `(None, errors)` otherwise.
+
+        Args:
+            json (str | bytes | bytearray | memoryview): The JSON data. Read
+                in place, without copying.
+            strict (bool): Whether to turn strict mode on.
+            backend (str, optional): The parser (see `json_to_py()`). Overrides
+                `strict`.
+        """
+
+    def load_json_file(
+        self,
+        path: Union[str, os.PathLike],
+        strict: bool = True,
+        backend: Optional[Backend] = None,
+    ) -> Tuple[Any, Optional[List[str]]]:
+        """Like `load_json()`, but memory-maps the file and parses it in place."""
+
+    def load_bytes(self, data: bytes) -> Tuple[Any, Optional[List[str]]]:
+        """Parse, check and build from bytes (see `py_to_bytes`).
+
+        Returns `(data, None)` when OK, or `(None, errors)` otherwise.
+        """
+
+    def iter_json(
+        self,
+        source: Union[str, os.PathLike, IO],
+        chunk_size: int = 65536,
+        format: Optional[str] = None,
+    ) -> "JsonStream":
+        """Lazily load values from NDJSON or a top-level JSON array.
+
+        Args:
+            source (str | PathLike | IO): A file path, or anything with `read(n)`.
+            chunk_size (int): How much to read at a time.
+            format (str, optional): `"ndjson"` or `"array"`; by default, a
+                stream starting with `[` is a top-level array.
+        """
+
+    def load_json_many(
+        self,
+        items: List[Union[str, bytes]],
+        strict: bool,
+        workers: Optional[int] = None,
+        backend: Optional[Backend] = None,
+    ) -> List[Tuple[Any, Optional[List[str]]]]:
+        """Parse and check many JSON documents on a thread pool with the GIL
+        released, then build them in order.
+
+        Exceptions are collected per item as errors.
+
+        Args:
+            items (list[str | bytes]): The JSON data.
+            strict (bool): Whether to turn strict mode on.
+            workers (int, optional): Number of threads. Defaults to the global pool.
+            backend (str, optional): See `load_json()`.
+        """
+
+    def load_bytes_many(
+        self, items: List[bytes], workers: Optional[int] = None
+    ) -> List[Tuple[Any, Optional[List[str]]]]:
+        """Like `load_json_many()`, but for bytes (see `py_to_bytes`)."""
+
+class JsonStream(Iterator[Tuple[Any, Optional[List[str]]]]):
+    """Loads values one at a time from a stream, with a bounded buffer."""
+
+    def __next__(self) -> Tuple[Any, Optional[List[str]]]: ...
+
+def write_archive(path: Union[str, os.PathLike], items: Iterable[Any]) -> int:
+    """Write items to an archive file, one record each (see `ArchiveFile`).
+
+    Returns the number of records written.
+    """
+
+class ArchiveFile:
+    """A memory-mapped archive file. Records are read in place, as views.
+
+    The file must not be modified while it's open.
+    """
+
+    def __init__(
+        self, path: Union[str, os.PathLike], schema: Schema, trusted: bool = False
+    ):
+        """Open and map an archive file.
+
+        Unless `trusted`, the structure of every record is checked right away.
+        """
+
+    def __len__(self) -> int: ...
+    def __getitem__(self, idx: int) -> "ArchiveView": ...
+    def __iter__(self) -> Iterator["ArchiveView"]: ...
+    def validate(self) -> Optional[Tuple[int, List[str]]]:
+        """Check every record against the schema, without building anything.
+
+        Returns the index and errors of the first bad record, if any.
+        """
+
+class ArchiveView:
+    """A read-only view into an archived model, dict, or list.
+
+    Nested models, dicts and lists are views, too. Nothing is copied out of
+    the file until it's accessed.
+    """
+
+    def __getattr__(self, name: str) -> Any: ...
+    def __getitem__(self, key: Union[str, int]) -> Any: ...
+    def __len__(self) -> int: ...
+    def keys(self) -> List[str]: ...
+    def to_py(self) -> Any:
+        """Copy everything out into plain Python data."""
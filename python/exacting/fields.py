@@ -12,10 +12,20 @@ T = TypeVar("T")
 class ExactField:
     validators: List[Validator]
     alias: Optional[str]
+    discriminator: Optional[str]
+    as_array: bool
 
-    def __init__(self, validators: List[Validator], alias: Optional[str] = None):
+    def __init__(
+        self,
+        validators: List[Validator],
+        alias: Optional[str] = None,
+        discriminator: Optional[str] = None,
+        as_array: bool = False,
+    ):
         self.validators = validators
         self.alias = alias
+        self.discriminator = discriminator
+        self.as_array = as_array
 
 
 def field(
@@ -28,6 +38,8 @@ def field(
     minv: _Optional[Union[int, float]] = MISSING,
     maxv: _Optional[Union[int, float]] = MISSING,
     validators: _Optional[List[Validator]] = MISSING,
+    discriminator: _Optional[str] = MISSING,
+    as_array: bool = False,
     # alias: _Optional[str] = MISSING,
 ) -> Any:
     validators = [] if validators is MISSING else validators
@@ -43,6 +55,8 @@ def field(
             metadata={
                 "exact": ExactField(
                     validators,  # alias=None if alias is MISSING else alias
+                    discriminator=None if discriminator is MISSING else discriminator,
+                    as_array=as_array,
                 )
             },
             hash=None if hash is MISSING else hash,
@@ -53,6 +67,8 @@ def field(
             metadata={
                 "exact": ExactField(
                     validators,  # alias=None if alias is MISSING else alias
+                    discriminator=None if discriminator is MISSING else discriminator,
+                    as_array=as_array,
                 )
             },
             hash=None if hash is MISSING else hash,
@@ -62,6 +78,8 @@ def field(
             metadata={
                 "exact": ExactField(
                     validators,  # alias=None if alias is MISSING else alias
+                    discriminator=None if discriminator is MISSING else discriminator,
+                    as_array=as_array,
                 )
             },
             hash=None if hash is MISSING else hash,
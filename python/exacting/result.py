@@ -1,18 +1,118 @@
 from collections import deque
-from typing import Generic, Optional, TypeVar
+from dataclasses import MISSING
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar, Union
 
 from .types import ValidationError
 
 T = TypeVar("T")
 
 
-def build_error(errors: "deque[str]") -> str:
+# renders the message of each `Issue.code`
+_MESSAGES: Dict[str, Callable[["Issue"], str]] = {
+    "type": lambda i: f"Expected type {i.expected!r}, got {type(i.value)}",
+    "none": lambda i: "Expected None",
+    "literal": lambda i: f"Failed to validate on {i.expected!r}: no eq match",
+    "dataclass": lambda i: f"Expected a dataclass ({i.expected!r}), got {type(i.value)}",
+    "regex": lambda i: f"Regex validation {i.expected!r} on str failed",
+    "min_length": lambda i: f"Expected min length of {i.expected}, got {len(i.value)}",
+    "max_length": lambda i: f"Expected max length of {i.expected}, got {len(i.value)}",
+    "min_value": lambda i: f"Expected min value of {i.expected}, got {i.value!r}",
+    "max_value": lambda i: f"Expected max value of {i.expected}, got {i.value!r}",
+    "not_comparable": lambda i: f"Neither len(), >, or < can be tested for type {type(i.value)}",
+    "array": lambda i: (
+        f"During validation of {i.expected!r}, got an item that doesn't fit in "
+        f"array({i.expected.typecode!r})"
+    ),
+    "tag": lambda i: (
+        f"Failed to validate {i.expected!r}: expected field {i.expected.discriminator!r} "
+        f"to be one of {', '.join(repr(k) for k in i.expected.tags if k is not MISSING)}"
+    ),
+    "no_variant": lambda i: f"Failed to validate {i.expected!r}: no variant accepts {type(i.value)}",
+    "internal": lambda i: f"(internal) {i.expected}",
+    "message": lambda i: str(i.expected),
+}
+
+
+class Issue:
+    """A single validation error, kept as data; its message is only rendered
+    when read.
+
+    Attributes:
+        code (str): What went wrong, like `"type"`, `"regex"` or `"literal"`.
+            Plain text errors (e.g., from custom validators) are `"message"`,
+            with the text as `expected`.
+        expected (Any): What was expected: a type, a validator, a pattern...
+        value (Any): The offending value.
+        path (tuple): Where the value is, from the top: field names, list
+            indices and dict keys. Only set on issues from `Result.issues()`.
+    """
+
+    __slots__ = ("code", "expected", "value", "path")
+
+    code: str
+    expected: Any
+    value: Any
+    path: Tuple[Any, ...]
+
+    def __init__(self, code: str, expected: Any = None, value: Any = None, path: Tuple[Any, ...] = ()):
+        self.code = code
+        self.expected = expected
+        self.value = value
+        self.path = path
+
+    def message(self) -> str:
+        return _MESSAGES[self.code](self)
+
+    def __str__(self) -> str:
+        return self.message()
+
+    def __repr__(self) -> str:
+        return f"Issue({self.code!r}, path={self.path!r}, expected={self.expected!r}, value={self.value!r})"
+
+
+class Trace:
+    """A header over nested errors (see `Result.trace()`), rendered when read.
+
+    Args:
+        template (str): The message, filled in by `str.format(*args)`.
+        *args: Values for the template.
+        key (Any, optional): The field name, list index or dict key that the
+            nested errors are at, if any.
+    """
+
+    __slots__ = ("template", "args", "key")
+
+    template: str
+    args: Tuple[Any, ...]
+    key: Any
+
+    def __init__(self, template: str, *args: Any, key: Any = MISSING):
+        self.template = template
+        self.args = args
+        self.key = key
+
+    def __str__(self) -> str:
+        return self.template.format(*self.args)
+
+    def __repr__(self) -> str:
+        return f"Trace({str(self)!r})"
+
+
+class Tried(tuple):
+    """Validators tried, shown as a comma separated list in a `Trace`."""
+
+    def __str__(self) -> str:
+        return ", ".join(repr(item) for item in self)
+
+
+Error = Union[str, Issue, Trace]
+
+
+def build_error(errors: "Iterable[Error]") -> str:
     text = "\n"
     indent_level = 0
 
-    # drain contents
-    while errors:
-        error = errors.popleft()
+    for error in errors:
         if error == "indent":
             indent_level += 1
             continue
@@ -28,13 +128,44 @@ def build_error(errors: "deque[str]") -> str:
     return text.rstrip()
 
 
+def get_issues(errors: "Iterable[Error]") -> List[Issue]:
+    """Get the issues in `errors`, with their paths (see `Result.issues()`)."""
+    errors = list(errors)
+    issues = []
+    path: List[Any] = []
+    keys: List[Any] = []  # what each indent pushed onto the path (or MISSING)
+
+    for idx, error in enumerate(errors):
+        if error == "indent":
+            continue
+        if error == "unindent":
+            if keys.pop() is not MISSING:
+                path.pop()
+            continue
+
+        if idx + 1 < len(errors) and errors[idx + 1] == "indent":
+            # a header
+            key = error.key if isinstance(error, Trace) else MISSING
+            keys.append(key)
+            if key is not MISSING:
+                path.append(key)
+            continue
+
+        if isinstance(error, Issue):
+            issues.append(Issue(error.code, error.expected, error.value, tuple(path)))
+        else:
+            issues.append(Issue("message", str(error), path=tuple(path)))
+
+    return issues
+
+
 class Result(Generic[T]):
     """Represents a result."""
 
     ok_data: Optional[T]
-    errors: Optional["deque[str]"]  # deque is O(1)
+    errors: Optional["deque[Error]"]  # deque is O(1)
 
-    def __init__(self, okd: Optional[T], errors: Optional["deque[str]"]):
+    def __init__(self, okd: Optional[T], errors: Optional["deque[Error]"]):
         self.ok_data = okd
         self.errors = errors
 
@@ -43,24 +174,36 @@ class Result(Generic[T]):
         return cls(data, None)
 
     @classmethod
-    def Err(cls, *errors: str) -> "Result[T]":
+    def Err(cls, *errors: Error) -> "Result[T]":
         return cls(None, deque(errors))
 
+    @classmethod
+    def merge(cls, results: "Iterable[Result]") -> "Result[T]":
+        """Join the errors of failed results into one."""
+        errors = deque()
+        for res in results:
+            errors.extend(res.unwrap_err())
+        return cls(None, errors)
+
     def unwrap(self) -> T:
         """Unwrap the OK data."""
         # cheap operation lmfao
         return self.ok_data  # type: ignore
 
-    def unwrap_err(self) -> "deque[str]":
+    def unwrap_err(self) -> "deque[Error]":
         """Unwrap the Err data."""
         # AGAIN. lmfao! you gotta be responsible.
         return self.errors  # type: ignore
 
+    def issues(self) -> List[Issue]:
+        """Get the errors as data, each with the path to the value at fault."""
+        return get_issues(self.errors or ())
+
     def is_ok(self) -> bool:
         """CALL."""
         return not self.errors
 
-    def trace(self, upper: str) -> "Result[T]":
+    def trace(self, upper: Union[str, Trace]) -> "Result[T]":
         if self.errors is not None:
             self.errors.appendleft("indent")
             self.errors.appendleft(upper)
@@ -69,7 +212,7 @@ class Result(Generic[T]):
         return self
 
     @classmethod
-    def trace_below(cls, upper: str, *items: str) -> "Result[T]":
+    def trace_below(cls, upper: Union[str, Trace], *items: Error) -> "Result[T]":
         errors = deque(items)
         errors.appendleft("indent")
         errors.appendleft(upper)
@@ -81,8 +224,8 @@ class Result(Generic[T]):
         if self.is_ok():
             return
 
-        error = build_error(self.unwrap_err())
-        raise ValidationError(error)
+        errors = self.unwrap_err()
+        raise ValidationError(build_error(errors), issues=lambda: get_issues(errors))
 
     def __repr__(self) -> str:
         if self.is_ok():
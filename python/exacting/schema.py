@@ -0,0 +1,162 @@
+from dataclasses import MISSING
+from typing import Any, List, Tuple
+
+from .validators import (
+    AnyV,
+    BoolV,
+    BytesV,
+    DataclassV,
+    DictV,
+    FloatV,
+    IntV,
+    ListV,
+    LiteralV,
+    LooseDictV,
+    LooseListV,
+    NoneV,
+    OneOfV,
+    StrV,
+    UnionV,
+    Validator,
+    get_regex_set,
+)
+from .types import VALID_MARKER
+from .exacting import Schema
+
+_PRIMITIVES = {
+    IntV: ("int",),
+    FloatV: ("float",),
+    BoolV: ("bool",),
+    StrV: ("str",),
+    BytesV: ("bytes",),
+    LooseListV: ("loose_list",),
+    LooseDictV: ("loose_dict",),
+    AnyV: ("any",),
+    NoneV: ("none",),
+}
+
+_I64_MIN = -(2**63)
+_I64_MAX = 2**63 - 1
+
+
+def _is_native_literal(value: Any) -> bool:
+    if value is None or isinstance(value, (bool, float, str)):
+        return True
+    if type(value) is int:
+        return _I64_MIN <= value <= _I64_MAX
+    return False
+
+
+def get_schema_spec(v: Validator, parents: Tuple[DataclassV, ...] = ()) -> Tuple:
+    """Mirror a validator tree into nested tuples, understood by `Schema`.
+
+    Anything unknown (e.g., custom validators) is left to Python, and so are
+    models nested in themselves (`parents` are the models around `v`).
+    """
+    t = type(v)
+    if t in _PRIMITIVES:
+        return _PRIMITIVES[t]
+
+    if t is ListV and v.typecode is None and v.regexes is None:  # type: ignore
+        return ("list", repr(v), get_schema_spec(v.target, parents))  # type: ignore
+
+    if t is DictV:
+        return (
+            "dict",
+            repr(v),
+            get_schema_spec(v.key, parents),  # type: ignore
+            get_schema_spec(v.value, parents),  # type: ignore
+        )
+
+    if t is UnionV:
+        return (
+            "union",
+            repr(v),
+            get_schema_spec(v.a, parents),  # type: ignore
+            get_schema_spec(v.b, parents),  # type: ignore
+        )
+
+    if t is OneOfV:
+        return get_one_of_spec(v, parents)  # type: ignore
+
+    if t is LiteralV and all(_is_native_literal(item) for item in v.values):  # type: ignore
+        return ("literal", repr(v), list(v.values))  # type: ignore
+
+    if t is DataclassV:
+        if any(v is parent for parent in parents):
+            return ("opaque", v)
+        return get_dataclass_spec(v, parents)  # type: ignore
+
+    return ("opaque", v)
+
+
+def get_one_of_spec(v: OneOfV, parents: Tuple[DataclassV, ...] = ()) -> Tuple:
+    variants = [(repr(item), get_schema_spec(item, parents)) for item in v.variants]
+    if v.tags is None:
+        return ("one_of", repr(v), variants, None)
+
+    def indices(candidates: Tuple[Validator, ...]) -> List[int]:
+        return [
+            idx
+            for idx, item in enumerate(v.variants)
+            if any(item is candidate for candidate in candidates)
+        ]
+
+    choices = ", ".join(repr(k) for k in v.tags if k is not MISSING)
+    tags = (
+        v.discriminator,
+        [(k, indices(candidates)) for k, candidates in v.tags.items() if k is not MISSING],
+        indices(v.untagged),
+        indices(v.tags[MISSING]) if MISSING in v.tags else None,
+        f"Failed to validate {v!r}: expected field {v.discriminator!r} to be one of {choices}",
+    )
+    return ("one_of", repr(v), variants, tags)
+
+
+def get_dataclass_spec(v: DataclassV, parents: Tuple[DataclassV, ...] = ()) -> Tuple:
+    dc = v.rf()
+    if dc is None:
+        raise RuntimeError("Weakref is gone")
+
+    fields = []
+    for field in dc.__dataclass_fields__.values():
+        name = field.name
+        validator = v.targets[name]
+
+        if field.default is not MISSING:
+            default = ("value", field.default)
+        elif field.default_factory is not MISSING:
+            default = ("factory", field.default_factory)
+        else:
+            default = ("required", None)
+
+        ef = field.metadata.get("exact")
+        extras = list(ef.validators) if ef else []
+        regex_set = get_regex_set(extras)
+        if regex_set is not None:
+            regexes = (
+                regex_set,
+                [f"Regex validation {item.pattern!r} on str failed" for item in extras],
+            )
+        else:
+            regexes = None
+
+        fields.append(
+            (
+                name,
+                f"During validation of dataclass {v!r} at field {name!r}, got:",
+                get_schema_spec(validator, (*parents, v)),
+                validator,
+                *default,
+                regexes,
+                extras,
+            )
+        )
+
+    marker = v if hasattr(dc, VALID_MARKER) else None
+    return ("dataclass", repr(v), v.rf, fields, marker)
+
+
+def get_schema(v: Validator) -> Schema:
+    """Get the Rust-side schema for a validator tree."""
+    return Schema(get_schema_spec(v))
@@ -1,6 +1,6 @@
 import dataclasses as std_dc
 
-from typing import Any, Dict, Protocol, Type, TypeVar, Union
+from typing import Any, Callable, Dict, Optional, Protocol, Type, TypeVar, Union
 
 
 class Dataclass(Protocol):
@@ -49,7 +49,8 @@ class _DefinitelyDataclass(_Indexable):
         return getattr(self.dc, k)
 
     def __setitem__(self, k: str, data: Any):
-        setattr(self.dc, k, data)
+        # frozen dataclasses refuse `setattr()`
+        object.__setattr__(self.dc, k, data)
 
     def as_dict(self):
         raise TypeError("This indexable is not a dict but a dataclass")
@@ -66,8 +67,48 @@ def indexable(item: Any) -> "_Indexable":
 
 
 class ValidationError(RuntimeError):
-    """Validation error for `exacting`."""
+    """Validation error for `exacting`.
+
+    `issues` holds the errors as data (see `Issue`), each with the path to
+    the value at fault. They can be passed as a function that gets them, so
+    they're only worked out when read.
+    """
+
+    _issues: Union[list, Callable[[], list]]
+
+    def __init__(
+        self, *args: Any, issues: Optional[Union[list, Callable[[], list]]] = None
+    ):
+        super().__init__(*args)
+        self._issues = [] if issues is None else issues
+
+    @property
+    def issues(self) -> list:
+        if callable(self._issues):
+            self._issues = self._issues()
+        return self._issues
+
+    @issues.setter
+    def issues(self, issues: list):
+        self._issues = issues
+
+
+class _FailType:
+    """Sentinel returned by compiled validators when validation fails."""
+
+    def __repr__(self) -> str:
+        return "FAIL"
+
+
+FAIL = _FailType()
 
 
 T = TypeVar("T")
 _Optional = Union[T, std_dc._MISSING_TYPE]
+
+
+# set on `Exact` instances once validated, to the validator that did it
+VALID_MARKER = "__exact_valid__"
+
+# where frozen `Exact` instances keep their hash, once computed
+HASH_CACHE = "__exact_hash__"
@@ -1,7 +1,8 @@
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import MISSING, Field, _MISSING_TYPE
-from typing import TypeVar, Union
+from types import MemberDescriptorType
+from typing import Any, Optional, TypeVar, Union
 
 unsafe_mode = ContextVar("unsafe_mode", default=False)
 
@@ -37,3 +38,13 @@ def get_field_value(item: Union[T, _MISSING_TYPE], field: Field) -> T:
             raise KeyError(field.name)
     else:
         return item
+
+
+def get_slot(cls: Any, name: str) -> Optional[MemberDescriptorType]:
+    """Get the slot instances of `cls` keep `name` in, if any."""
+    attr = getattr(cls, name, None)
+    # fields validated on assignment wrap their slot
+    attr = getattr(attr, "slot", attr)
+    if isinstance(attr, MemberDescriptorType):
+        return attr
+    return None
@@ -1,9 +1,21 @@
 import dataclasses
+import io
+import pickle
+import threading
 from dataclasses import is_dataclass
 from weakref import ref
 
 from types import NoneType, UnionType
-from typing import Annotated, Any, Dict, Literal, Union, get_origin, get_type_hints
+from typing import (
+    Annotated,
+    Any,
+    Dict,
+    Literal,
+    Optional,
+    Union,
+    get_origin,
+    get_type_hints,
+)
 
 from .validators import (
     AnnotatedV,
@@ -19,11 +31,14 @@ from .validators import (
     LooseDictV,
     LooseListV,
     NoneV,
+    OneOfV,
     StrV,
-    UnionV,
     Validator,
 )
 from .types import DataclassType
+from .cache import get_spec, is_enabled, put_spec
+from .compiler import compile_validator
+from .schema import get_schema
 
 NONEV = NoneV()
 STRV = StrV()
@@ -36,7 +51,12 @@ LOOSE_DICTV = LooseDictV()
 ANYV = AnyV()
 
 
-def get_validator(typ: Any) -> Validator:
+def get_validator(typ: Any, discriminator: Optional[str] = None) -> Validator:
+    if discriminator is not None:
+        if get_origin(typ) not in (Union, UnionType):
+            raise TypeError(f"Discriminator {discriminator!r} given for non-union type {typ!r}")
+        return union(*typ.__args__, discriminator=discriminator)
+
     if typ is None or isinstance(typ, NoneType) or typ is NoneType:
         return NONEV
     if typ is str:
@@ -57,6 +77,9 @@ def get_validator(typ: Any) -> Validator:
         return ANYV
 
     if is_dataclass(typ):
+        # share the model's own validator, so its validated instances are trusted
+        if "__validator__" in typ.__dict__:
+            return typ.__validator__
         return get_dc_validator(typ)
 
     origin = get_origin(typ)
@@ -69,23 +92,34 @@ def get_validator(typ: Any) -> Validator:
     if origin is Literal:
         return LiteralV(typ.__args__)
     if origin is Annotated:
-        return AnnotatedV(typ.__args__[0], typ.__metadata__)
+        target = get_validator(typ.__args__[0])
+        if not any(isinstance(item, Validator) for item in typ.__metadata__):
+            # nothing to validate in the metadata
+            return target
+        return AnnotatedV(target, typ.__metadata__)
 
     raise TypeError(
         f"Unknown type: {typ!r} (no type validator available at this moment)"
     )
 
 
-def union(*items) -> Validator:
-    if len(items) == 1:
+def union(*items, discriminator: Optional[str] = None) -> Validator:
+    """Get a (flat) union validator for the given types.
+
+    Args:
+        *items: The types.
+        discriminator (str, optional): Name of the `Literal` field that tells
+            the dataclass variants apart. Inferred if there's one.
+    """
+    if len(items) == 1 and discriminator is None:
         return get_validator(items[0])
-    return UnionV(get_validator(items[0]), union(*items[1:]))
+    return OneOfV([get_validator(item) for item in items], discriminator)
 
 
 def get_map_for_dc(dc: DataclassType) -> Dict[str, Validator]:
     vmap = {}
     _FIELD = getattr(dataclasses, "_FIELD")
-    type_hints = get_type_hints(dc)
+    type_hints = get_type_hints(dc, include_extras=True)
 
     for field in dc.__dataclass_fields__.values():
         if getattr(field, "_field_type") is not _FIELD:
@@ -93,10 +127,188 @@ def get_map_for_dc(dc: DataclassType) -> Dict[str, Validator]:
                 "Currently, exacting only supports regular fields :(\n"
                 f"...at field {field.name!r}, dataclass {dc!r}"
             )
-        vmap[field.name] = get_validator(type_hints[field.name])
+        ef = field.metadata.get("exact")
+        v = get_validator(type_hints[field.name], ef.discriminator if ef else None)
+        if ef and ef.as_array:
+            if type(v) is not ListV:
+                raise TypeError(
+                    f"as_array=True given for non-list field {field.name!r} of {dc!r}"
+                )
+            v = ListV(v.target, as_array=True)  # type: ignore
+
+        vmap[field.name] = v
 
     return vmap
 
 
-def get_dc_validator(dc: DataclassType) -> DataclassV:
-    return DataclassV(ref(dc), get_map_for_dc(dc))
+# stands in for `dataclasses.MISSING` (a key of `OneOfV.tags`), which
+# doesn't survive pickling as itself
+_MISSING_ID = "dataclasses.MISSING"
+
+
+class _SpecPickler(pickle.Pickler):
+    """Pickles field validators, with models as references to their class."""
+
+    def __init__(self, file: io.BytesIO):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.modules = set()
+
+    def persistent_id(self, obj: Any) -> Any:
+        if obj is dataclasses.MISSING:
+            return _MISSING_ID
+        if type(obj) is not DataclassV:
+            return None
+
+        dc = obj.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+        self.modules.add(dc.__module__)
+        return dc
+
+
+class _SpecUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO):
+        super().__init__(file)
+        self.validators = {}
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == _MISSING_ID:
+            return dataclasses.MISSING
+
+        # the same validator every time, so variants of unions match up
+        validator = self.validators.get(pid)
+        if validator is None:
+            validator = self.validators[pid] = get_validator(pid)
+        return validator
+
+
+def load_map_for_dc(dc: DataclassType) -> Optional[Dict[str, Validator]]:
+    """Get the validators of the fields of `dc` from the on-disk cache, if
+    they're there (see `cache.py`).
+    """
+    spec = get_spec(dc.__module__, dc.__qualname__)
+    if spec is None:
+        return None
+
+    try:
+        return _SpecUnpickler(io.BytesIO(spec)).load()
+    except Exception:
+        # stale, e.g. a class that's gone; built again
+        return None
+
+
+def save_map_for_dc(dc: DataclassType, vmap: Dict[str, Validator]):
+    """Put the validators of the fields of `dc` in the on-disk cache, if they
+    can be pickled.
+    """
+    buf = io.BytesIO()
+    pickler = _SpecPickler(buf)
+    try:
+        pickler.dump(vmap)
+    except Exception:
+        # e.g. models defined in functions, or custom validators
+        return
+
+    put_spec(dc.__module__, dc.__qualname__, buf.getvalue(), pickler.modules)
+
+
+# one for every model, so that models referring to each other can't be built
+# by two threads in opposite order
+_BUILD_LOCK = threading.RLock()
+
+# validators built while building another model on this thread, which are
+# finished along with it
+_local = threading.local()
+
+
+def get_dc_validator(dc: DataclassType, validator: Optional[DataclassV] = None) -> DataclassV:
+    """Build the validator of `dc`, or finish `validator` (which fields of
+    `dc` may already refer to).
+
+    Models built along the way (because a field refers to them) are only
+    compiled once every one of them has its fields, since they may refer back
+    to ones still being built.
+    """
+    if validator is None:
+        validator = DataclassV(ref(dc), {})
+
+    pending = getattr(_local, "pending", None)
+    outermost = pending is None
+    if outermost:
+        pending = _local.pending = []
+
+    try:
+        vmap = load_map_for_dc(dc) if is_enabled() else None
+        if vmap is None:
+            vmap = get_map_for_dc(dc)
+            if is_enabled():
+                save_map_for_dc(dc, vmap)
+
+        validator.targets.update(vmap)
+        pending.append(validator)
+        if outermost:
+            for item in pending:
+                item.compiled = compile_validator(item)
+                item.schema = get_schema(item)
+            for item in pending:
+                install(item)
+    except BaseException:
+        if outermost:
+            for item in pending:
+                lazy = _lazy_of(item)
+                if lazy is not None:
+                    lazy.building = None
+        raise
+    finally:
+        if outermost:
+            _local.pending = None
+
+    return validator
+
+
+def _lazy_of(v: DataclassV) -> Optional["LazyValidator"]:
+    dc = v.rf()
+    lazy = dc.__dict__.get("__validator__") if dc is not None else None
+    return lazy if isinstance(lazy, LazyValidator) else None
+
+
+def install(v: DataclassV):
+    """Put a finished validator in place of the model's `LazyValidator`."""
+    lazy = _lazy_of(v)
+    if lazy is not None and lazy.building is v:
+        setattr(v.rf(), "__validator__", v)
+        lazy.building = None
+
+
+class LazyValidator:
+    """Stands in for a model's `__validator__` until it's first used, then
+    builds it and replaces itself.
+
+    A model nested in itself (or in a model it's nested in) gets the
+    validator being built, which is finished by the time it's used.
+    """
+
+    building: Optional[DataclassV]
+
+    def __init__(self, dc: DataclassType):
+        self.rf = ref(dc)
+        self.building = None
+
+    def __get__(self, obj: Any, owner: Any = None) -> DataclassV:
+        dc = self.rf()
+        if dc is None:
+            raise RuntimeError("Weakref is gone")
+
+        with _BUILD_LOCK:
+            current = dc.__dict__.get("__validator__")
+            if current is not self:
+                # another thread got here first
+                return current
+
+            if self.building is not None:
+                return self.building
+
+            self.building = DataclassV(ref(dc), {})
+            # installed once it's finished, which may be after returning here
+            # if another model is being built
+            return get_dc_validator(dc, self.building)
@@ -1,12 +1,14 @@
 from abc import ABC
-from dataclasses import MISSING, is_dataclass
-from typing import Any, Dict, List, Type, TypeVar, Union
+from array import array
+from dataclasses import MISSING, Field, is_dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
 from weakref import ReferenceType
 
-from .types import DataclassType, indexable, _Optional
-from .result import Result
-from .utils import get_field_value, unsafe
-from .exacting import Regex
+from .types import FAIL, DataclassType, indexable, _Optional
+from .result import Issue, Result, Trace, Tried
+from .utils import get_field_value
+from .exacting import Regex, RegexSet, Schema, find_invalid_entry, find_invalid_item
 
 T = TypeVar("T")
 
@@ -14,7 +16,7 @@ T = TypeVar("T")
 def expect(typ: Type[T], on: Any) -> Result[T]:
     """Expect a type instance on a value."""
     if not isinstance(on, typ):
-        return Result.Err(f"Expected type {typ!r}, got {type(on)}")
+        return Result.Err(Issue("type", typ, on))
 
     return Result.Ok(on)
 
@@ -22,11 +24,23 @@ def expect(typ: Type[T], on: Any) -> Result[T]:
 class Validator(ABC):
     def validate(self, value: Any, **options) -> Result: ...
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        """Validate without building a `Result`. Returns the validated value,
+        or `FAIL` (call `validate()` to find out why).
+        """
+        res = self.validate(value, from_dict=True) if from_dict else self.validate(value)
+        if not res.is_ok():
+            return FAIL
+        return res.unwrap()
+
 
 class IntV(Validator):
     def validate(self, value: Any, **options) -> "Result[int]":
         return expect(int, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, int) else FAIL
+
     def __repr__(self) -> str:
         return "int"
 
@@ -35,6 +49,9 @@ class FloatV(Validator):
     def validate(self, value: Any, **options) -> "Result[float]":
         return expect(float, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, float) else FAIL
+
     def __repr__(self) -> str:
         return "float"
 
@@ -43,6 +60,9 @@ class BoolV(Validator):
     def validate(self, value: Any, **options) -> "Result[bool]":
         return expect(bool, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, bool) else FAIL
+
     def __repr__(self) -> str:
         return "bool"
 
@@ -51,6 +71,9 @@ class StrV(Validator):
     def validate(self, value: Any, **options) -> "Result[str]":
         return expect(str, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, str) else FAIL
+
     def __repr__(self) -> str:
         return "str"
 
@@ -59,32 +82,150 @@ class BytesV(Validator):
     def validate(self, value: Any, **options) -> "Result[bytes]":
         return expect(bytes, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, bytes) else FAIL
+
     def __repr__(self) -> str:
         return "bytes"
 
 
+# validators that are checked natively, by their type check alone
+_NATIVE_KINDS = {IntV: "int", FloatV: "float", BoolV: "bool", StrV: "str", BytesV: "bytes"}
+
+
+def native_kinds(v: Validator) -> Optional[str]:
+    """Get the primitive types (like `"int|none"`) that `v` accepts as they are,
+    if it's checked by their type alone; containers of these are checked in
+    a single native call.
+    """
+    t = type(v)
+    if t in _NATIVE_KINDS:
+        return _NATIVE_KINDS[t]
+    if t is NoneV:
+        return "none"
+
+    if t is UnionV:
+        variants = [v.a, v.b]  # type: ignore
+    elif t is OneOfV:
+        variants = v.variants  # type: ignore
+    else:
+        return None
+
+    kinds = [native_kinds(item) for item in variants]
+    if any(kind is None for kind in kinds):
+        return None
+    return "|".join(kinds)  # type: ignore
+
+# item validators of lists that can be kept as an `array.array`
+_TYPECODES = {IntV: "q", FloatV: "d"}
+
+
 class ListV(Validator):
     target: Validator
-
-    def __init__(self, target: Validator):
+    native: Optional[str]
+    regexes: Optional[Union[Regex, RegexSet]]
+    typecode: Optional[str]
+
+    def __init__(self, target: Validator, as_array: bool = False):
+        """
+        Args:
+            target (Validator): Validator of the items.
+            as_array (bool): Give an `array.array` instead of the list. Only
+                for `int` (64-bit) and `float` items.
+        """
         self.target = target
+        self.native = native_kinds(target)
+        self.regexes = get_regexes(target)
+
+        self.typecode = None
+        if as_array:
+            self.typecode = _TYPECODES.get(type(target))  # type: ignore
+            if self.typecode is None:
+                raise TypeError(f"Only list[int] and list[float] can be arrays, not {self!r}")
 
     def validate(self, value: Any, **options) -> "Result":
+        from_dict = bool(options.get("from_dict"))
+        data = self.check(value, from_dict)
+        if data is not FAIL:
+            return Result.Ok(data)
+
         res = expect(list, value)
         if not res.is_ok():
             return res
 
-        array = res.unwrap()
-        for idx, item in enumerate(array):
-            item_res = self.target.validate(item, **options)
-            if not item_res.is_ok():
-                return item_res.trace(
-                    f"During validation of {self!r} at item {idx}, a validation error occurred:"
-                )
-
-            array[idx] = item_res.unwrap()
+        if self.native is not None:
+            idx = find_invalid_item(value, self.native)
+            if idx is None:
+                return Result.Err(Issue("array", self, value))
+            if not options.get("collect_all"):
+                return self.item_error(idx, value[idx], options)
+
+        if self.regexes is not None:
+            indices = self.regexes.validate_many(value, bool(options.get("collect_all")))
+            if indices:
+                return Result.merge(self.item_error(idx, value[idx], options) for idx in indices)
+
+        failed = []
+        for idx, item in enumerate(value):
+            if self.target.check(item, from_dict) is FAIL:
+                failed.append(self.item_error(idx, item, options))
+                if not options.get("collect_all"):
+                    break
+
+        if failed:
+            return Result.merge(failed)
+
+        return Result.Err(Issue("internal", f"{self!r} failed without an error"))
+
+    def item_error(self, idx: int, item: Any, options: Dict[str, Any]) -> Result:
+        return self.target.validate(item, **options).trace(
+            Trace("During validation of {!r} at item {}, a validation error occurred:", self, idx, key=idx)
+        )
 
-        return Result.Ok(array)
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        if not isinstance(value, list):
+            if (
+                self.typecode is not None
+                and type(value) is array
+                and value.typecode == self.typecode
+            ):
+                return value
+            return FAIL
+
+        if self.native is not None:
+            if find_invalid_item(value, self.native) is not None:
+                return FAIL
+            if self.typecode is None:
+                return value
+
+            try:
+                return array(self.typecode, value)
+            except OverflowError:
+                return FAIL
+
+        if self.regexes is not None:
+            # one native call, without the GIL for long lists
+            return FAIL if self.regexes.validate_many(value) else value
+
+        # only copied once an item changes (e.g., a dict becoming a dataclass)
+        target = self.target
+        items = None
+        for idx, item in enumerate(value):
+            data = target.check(item, from_dict)
+            if data is FAIL:
+                return FAIL
+
+            if items is None:
+                if data is item:
+                    continue
+                items = value[:idx]
+            items.append(data)
+
+        return value if items is None else items
+
+    def __reduce__(self):
+        # the regexes are native, so they're made again
+        return ListV, (self.target, self.typecode is not None)
 
     def __repr__(self) -> str:
         return f"list[{self.target!r}]"
@@ -94,6 +235,9 @@ class LooseListV(Validator):
     def validate(self, value: Any, **options) -> "Result":
         return expect(list, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, list) else FAIL
+
     def __repr__(self) -> str:
         return "list[...]"
 
@@ -101,38 +245,94 @@ class LooseListV(Validator):
 class DictV(Validator):
     key: Validator
     value: Validator
+    native: Optional[Tuple[str, str]]
 
     def __init__(self, key: Validator, value: Validator):
         self.key = key
         self.value = value
 
+        key_kinds, value_kinds = native_kinds(key), native_kinds(value)
+        self.native = None
+        if key_kinds is not None and value_kinds is not None:
+            self.native = (key_kinds, value_kinds)
+
     def validate(self, value: Any, **options) -> "Result":
+        from_dict = bool(options.get("from_dict"))
+        data = self.check(value, from_dict)
+        if data is not FAIL:
+            return Result.Ok(data)
+
         res = expect(dict, value)
         if not res.is_ok():
             return res
 
-        hashmap = res.unwrap()
-        for k, v in list(hashmap.items()):
-            k_res = self.key.validate(k, **options)
-            if not k_res.is_ok():
-                return k_res.trace(
-                    f"During validation of {self!r}, the literal key value {k!r} failed to validate:"
+        collect_all = options.get("collect_all")
+        items = value.items()
+        if self.native is not None and not collect_all:
+            idx = find_invalid_entry(value, *self.native)
+            if idx is not None:
+                items = islice(items, idx, idx + 1)
+
+        failed = []
+        for k, v in items:
+            if self.key.check(k, from_dict) is FAIL:
+                failed.append(
+                    self.key.validate(k, **options).trace(
+                        Trace(
+                            "During validation of {!r}, the literal key value {!r} failed to validate:",
+                            self,
+                            k,
+                        )
+                    )
                 )
+            elif self.value.check(v, from_dict) is FAIL:
+                failed.append(
+                    self.value.validate(v, **options).trace(
+                        Trace(
+                            "During validation of {!r}, the *value* paired to key {!r} failed to validate:",
+                            self,
+                            k,
+                            key=k,
+                        )
+                    )
+                )
+            else:
+                continue
 
-            kk = k_res.unwrap()
+            if not collect_all:
+                break
 
-            v_res = self.value.validate(v, **options)
-            if not v_res.is_ok():
-                return v_res.trace(
-                    f"During validation of {self!r}, the *value* paired to key {k!r} failed to validate:"
-                )
+        if failed:
+            return Result.merge(failed)
+
+        return Result.Err(Issue("internal", f"{self!r} failed without an error"))
 
-            vv = v_res.unwrap()
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        if not isinstance(value, dict):
+            return FAIL
 
-            del hashmap[k]
+        if self.native is not None:
+            return value if find_invalid_entry(value, *self.native) is None else FAIL
+
+        # only copied once an entry changes, keeping the order
+        key, val = self.key, self.value
+        hashmap = None
+        for idx, (k, v) in enumerate(value.items()):
+            kk = key.check(k, from_dict)
+            if kk is FAIL:
+                return FAIL
+
+            vv = val.check(v, from_dict)
+            if vv is FAIL:
+                return FAIL
+
+            if hashmap is None:
+                if kk is k and vv is v:
+                    continue
+                hashmap = dict(islice(value.items(), idx))
             hashmap[kk] = vv
 
-        return Result.Ok(hashmap)
+        return value if hashmap is None else hashmap
 
     def __repr__(self) -> str:
         return f"dict[{self.key!r}, {self.value!r}]"
@@ -142,6 +342,9 @@ class LooseDictV(Validator):
     def validate(self, value: Any, **options) -> "Result":
         return expect(dict, value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if isinstance(value, dict) else FAIL
+
     def __repr__(self) -> str:
         return "dict[...]"
 
@@ -155,16 +358,15 @@ class UnionV(Validator):
         self.b = b
 
     def validate(self, value: Any, **options) -> "Result":
-        a_res = self.a.validate(value, **options)
-        if a_res.is_ok():
-            return a_res
+        data = self.check(value, bool(options.get("from_dict")))
+        if data is not FAIL:
+            return Result.Ok(data)
 
+        a_res = self.a.validate(value, **options)
         b_res = self.b.validate(value, **options)
-        if b_res.is_ok():
-            return b_res
 
         return Result.trace_below(
-            f"Failed to validate {self!r}, tried variant A and B, got errors:",
+            Trace("Failed to validate {!r}, tried variant A and B, got errors:", self),
             *a_res.unwrap_err(),
             *b_res.unwrap_err(),
         )
@@ -172,11 +374,20 @@ class UnionV(Validator):
     def __repr__(self) -> str:
         return f"{self.a!r} | {self.b!r}"
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        data = self.a.check(value, from_dict)
+        if data is not FAIL:
+            return data
+        return self.b.check(value, from_dict)
+
 
 class AnyV(Validator):
     def validate(self, value: Any, **options) -> Result:
         return Result.Ok(value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value
+
     def __repr__(self) -> str:
         return "Any"
 
@@ -184,10 +395,16 @@ class AnyV(Validator):
 class NoneV(Validator):
     def validate(self, value: Any, **options) -> Result:
         if value is not None:
-            return Result.Err("Expected None")
+            return Result.Err(Issue("none", None, value))
         else:
             return Result.Ok(value)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        return value if value is None else FAIL
+
+    def __repr__(self) -> str:
+        return "None"
+
 
 class LiteralV(Validator):
     values: List[Any]
@@ -200,7 +417,14 @@ class LiteralV(Validator):
             if value == item:
                 return Result.Ok(value)
 
-        return Result.Err(f"Failed to validate on {self!r}: no eq match")
+        return Result.Err(Issue("literal", self, value))
+
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        for item in self.values:
+            if value == item:
+                return value
+
+        return FAIL
 
     def __repr__(self) -> str:
         return f"Literal[{', '.join(repr(v) for v in self.values)}]"
@@ -209,13 +433,34 @@ class LiteralV(Validator):
 class AnnotatedV(Validator):
     target: Validator
     metadata: List[Any]
+    validators: List[Validator]
 
     def __init__(self, target: Validator, metadata: List[Any]):
+        """
+        Args:
+            target (Validator): Validator of the type.
+            metadata (list): The metadata. Any validators in it (like
+                `RegexV`) are run after `target`, in order.
+        """
         self.target = target
         self.metadata = metadata
+        self.validators = [item for item in metadata if isinstance(item, Validator)]
 
     def validate(self, value: Any, **options) -> Result:
-        return self.target.validate(value, **options)
+        res = self.target.validate(value, **options)
+        for item in self.validators:
+            if not res.is_ok():
+                break
+            res = item.validate(res.unwrap(), **options)
+        return res
+
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        value = self.target.check(value, from_dict)
+        for item in self.validators:
+            if value is FAIL:
+                break
+            value = item.check(value, from_dict)
+        return value
 
     def __repr__(self) -> str:
         return f"Annotated[{self.target}, ...metadata]"
@@ -224,65 +469,98 @@ class AnnotatedV(Validator):
 class DataclassV(Validator):
     targets: Dict[str, Validator]
     rf: ReferenceType["DataclassType"]
+    compiled: Optional[Callable[[Any, bool], Any]]
+    schema: Optional[Schema]
+    dict_plan: Optional[List[Tuple[str, Optional[Callable[[Any], Any]]]]]
+    # field name -> compiled check of just that field; see `assignment.py`
+    field_checks: Dict[str, Callable[[Any], Any]]
 
     def __init__(self, dc_rf: ReferenceType, targets: Dict[str, Validator]):
         self.rf = dc_rf
         self.targets = targets
+        self.compiled = None
+        self.schema = None
+        self.dict_plan = None
+        self.field_checks = {}
 
     def validate(self, value: Any, **options) -> Result:
+        if self.compiled is not None:
+            # fast path; on failure, we interpret again to build the errors
+            data = self.compiled(value, bool(options.get("from_dict")))
+            if data is not FAIL:
+                return Result.Ok(data)
+
         dc = self.rf()
         if dc is None:
-            return Result.Err("(internal) Weakref missing for dataclass")
+            return Result.Err(Issue("internal", "Weakref missing for dataclass"))
 
         if options.get("from_dict"):
             res = expect(dict, value)
             if not res.is_ok():
-                return res.trace(f"Expected a dict on dataclass ({self!r}) from_dict:")
+                return res.trace(Trace("Expected a dict on dataclass ({!r}) from_dict:", self))
             value = res.unwrap()
             data = indexable(value)
         else:
             if not is_dataclass(value):
-                return Result.Err(f"Expected a dataclass ({self!r}), got {type(value)}")
+                return Result.Err(Issue("dataclass", self, value))
 
             data = indexable(value)
 
+        collect_all = options.get("collect_all")
+        values = {}
+        failed = []
         for field in dc.__dataclass_fields__.values():
             name = field.name
             field_value = get_field_value(data.get(name), field)
 
-            validator = self.targets[name]
-            if isinstance(validator, DataclassV):
-                continue
-            field_res = validator.validate(field_value, **options)
+            field_res = self.validate_field(field, field_value, **options)
             if not field_res.is_ok():
-                return field_res.trace(
-                    f"During validation of dataclass {self!r} at field {name!r}, got:"
-                )
+                if not collect_all:
+                    return field_res
+                failed.append(field_res)
+                continue
 
-            field_value = field_res.unwrap()
-
-            ef = field.metadata.get("exact")
-            if ef:
-                # validator_items: List[Validator]
-                validator_items = ef.validators
-                for item in validator_items:
-                    fv_res = item.validate(field_value)
-                    if not fv_res.is_ok():
-                        return fv_res.trace(
-                            f"During validation of dataclass {self!r} at field {name!r}, got:"
-                        )
-                    field_value = fv_res.unwrap()
+            values[name] = field_res.unwrap()
 
-            data[name] = field_value
+        if failed:
+            return Result.merge(failed)
 
         if options.get("from_dict"):
-            with unsafe():
-                result = getattr(dc, "__unsafe_init__")(**data.as_dict())
+            # built anew; the input dict is left alone
+            result = dc.__new__(dc)
+            for name, item in values.items():
+                object.__setattr__(result, name, item)
         else:
+            for name, item in values.items():
+                if item is not data.get(name):
+                    data[name] = item
             result = data.as_dc()
 
         return Result.Ok(result)
 
+    def validate_field(self, field: Field, value: Any, **options) -> Result:
+        """Validate the value of a single field: its type, then any extra validators."""
+        res = self.targets[field.name].validate(value, **options)
+
+        ef = field.metadata.get("exact")
+        if ef and res.is_ok():
+            # validator_items: List[Validator]
+            for item in ef.validators:
+                res = item.validate(res.unwrap())
+                if not res.is_ok():
+                    break
+
+        if not res.is_ok():
+            return res.trace(
+                Trace("During validation of dataclass {!r} at field {!r}, got:", self, field.name, key=field.name)
+            )
+        return res
+
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        if self.compiled is not None:
+            return self.compiled(value, from_dict)
+        return super().check(value, from_dict)
+
     def __repr__(self):
         dc = self.rf()
         if dc is None:
@@ -305,10 +583,43 @@ class RegexV(Validator):
 
         data = res.unwrap()
         if not self.regex.validate(data):
-            return Result.Err(f"Regex validation {self.pattern!r} on str failed")
+            return Result.Err(Issue("regex", self.pattern, data))
 
         return Result.Ok(data)
 
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        if not isinstance(value, str) or not self.regex.validate(value):
+            return FAIL
+        return value
+
+    def __reduce__(self):
+        return RegexV, (self.pattern,)
+
+
+def get_regex_set(validators: List[Validator]) -> Optional[RegexSet]:
+    """Get the patterns of `validators` as a `RegexSet`, checked in one go,
+    if they're all `RegexV` (and there's any).
+    """
+    if not validators or not all(type(item) is RegexV for item in validators):
+        return None
+    return RegexSet([item.pattern for item in validators])  # type: ignore
+
+
+def get_regexes(v: Validator) -> Optional[Union[Regex, RegexSet]]:
+    """Get the regex(es) that `v` boils down to, if all it checks is that a
+    `str` matches them; lists of these are matched in one native call.
+    """
+    t = type(v)
+    if t is RegexV:
+        return v.regex  # type: ignore
+    if t is not AnnotatedV or type(v.target) not in (StrV, RegexV):  # type: ignore
+        return None
+
+    items = [v.target, *v.validators] if type(v.target) is RegexV else v.validators  # type: ignore
+    if len(items) == 1 and type(items[0]) is RegexV:
+        return items[0].regex  # type: ignore
+    return get_regex_set(items)
+
 
 class MinMaxV(Validator):
     minv: _Optional[Union[int, float]]
@@ -327,27 +638,245 @@ class MinMaxV(Validator):
             ln = len(value)
             if self.minv is not MISSING:
                 if ln < self.minv:
-                    return Result.Err(f"Expected min length of {self.minv}, got {ln}")
+                    return Result.Err(Issue("min_length", self.minv, value))
             if self.maxv is not MISSING:
                 if ln > self.maxv:
-                    return Result.Err(f"Expected max length of {self.minv}, got {ln}")
+                    return Result.Err(Issue("max_length", self.maxv, value))
 
         elif hasattr(value, "__lt__") and hasattr(value, "__gt__"):
             if self.minv is not MISSING:
                 if value < self.minv:
-                    return Result.Err(
-                        f"Expected min value of {self.minv}, got {value!r}"
-                    )
+                    return Result.Err(Issue("min_value", self.minv, value))
 
             if self.maxv is not MISSING:
                 if value > self.maxv:
-                    return Result.Err(
-                        f"Expected max value of {self.minv}, got {value!r}"
-                    )
+                    return Result.Err(Issue("max_value", self.maxv, value))
 
         else:
-            return Result.Err(
-                f"Neither len(), >, or < can be tested for type {type(value)}"
-            )
+            return Result.Err(Issue("not_comparable", None, value))
 
         return Result.Ok(value)
+
+
+_TYPES = {
+    IntV: int,
+    FloatV: float,
+    BoolV: bool,
+    StrV: str,
+    BytesV: bytes,
+    ListV: list,
+    LooseListV: list,
+    DictV: dict,
+    LooseDictV: dict,
+}
+
+
+def may_accept(v: Validator, typ: type, from_dict: bool) -> bool:
+    """Whether `v` could possibly accept a value of type `typ`.
+
+    Anything else (e.g., custom validators) may accept anything. Keep this in
+    line with `Node::may_accept()` on the Rust side.
+    """
+    t = type(v)
+    if t in _TYPES:
+        return issubclass(typ, _TYPES[t])
+    if t is NoneV:
+        return typ is type(None)
+    if t is LiteralV:
+        return any(_literal_may_equal(item, typ) for item in v.values)  # type: ignore
+    if t is DataclassV:
+        return issubclass(typ, dict) if from_dict else is_dataclass(typ)
+    if t is UnionV:
+        return may_accept(v.a, typ, from_dict) or may_accept(v.b, typ, from_dict)  # type: ignore
+    if t is OneOfV:
+        return any(may_accept(item, typ, from_dict) for item in v.variants)  # type: ignore
+
+    return True
+
+
+def _literal_may_equal(item: Any, typ: type) -> bool:
+    if item is None:
+        return typ is type(None)
+    if isinstance(item, str):
+        return issubclass(typ, str)
+    if type(item) in (bool, int, float):
+        return issubclass(typ, (int, float))
+    return True
+
+
+def _is_tag(item: Any) -> bool:
+    return item is None or type(item) in (bool, int, str)
+
+
+class OneOfV(Validator):
+    """A flat union, which only tries the variants that could accept the
+    value's type, in order.
+
+    With a `discriminator`, dicts (when `from_dict`) go straight to the
+    dataclass variant whose `Literal` field of that name matches.
+    """
+
+    variants: List[Validator]
+    discriminator: Optional[str]
+    tags: Optional[Dict[Any, Tuple[Validator, ...]]]
+    untagged: Tuple[Validator, ...]
+    tables: Tuple[Dict[type, Tuple[Validator, ...]], Dict[type, Tuple[Validator, ...]]]
+
+    def __init__(self, variants: List[Validator], discriminator: Optional[str] = None):
+        self.variants = variants
+        self.tables = ({}, {})  # indexed by from_dict
+        self.tags = None
+        self.untagged = ()
+
+        dataclasses = [item for item in variants if type(item) is DataclassV]
+        if discriminator is None:
+            discriminator = _infer_discriminator(dataclasses)
+        elif not dataclasses:
+            raise TypeError(
+                f"Discriminator {discriminator!r} given for {self!r}, which has no dataclasses"
+            )
+
+        self.discriminator = discriminator
+        if discriminator is not None:
+            self.setup_tags(dataclasses, discriminator)
+
+    def setup_tags(self, dataclasses: List[DataclassV], discriminator: str):
+        owners = {}  # tag value -> dataclass validator
+        defaulted = []  # dataclasses with a default tag
+        for item in dataclasses:
+            target = item.targets.get(discriminator)
+            if type(target) is not LiteralV or not all(
+                _is_tag(value) for value in target.values  # type: ignore
+            ):
+                raise TypeError(
+                    f"Expected field {discriminator!r} of dataclass {item!r} to be a "
+                    "Literal of str, int, bool or None (for discriminated union)"
+                )
+
+            for value in target.values:  # type: ignore
+                if value in owners:
+                    raise TypeError(
+                        f"Tag {value!r} at field {discriminator!r} is used by both "
+                        f"{owners[value]!r} and {item!r}"
+                    )
+                owners[value] = item
+
+            dc = item.rf()
+            if dc is not None:
+                field = dc.__dataclass_fields__[discriminator]
+                if field.default is not MISSING or field.default_factory is not MISSING:
+                    defaulted.append(item)
+
+        candidates = [item for item in self.variants if may_accept(item, dict, True)]
+        self.untagged = tuple(item for item in candidates if type(item) is not DataclassV)
+        self.tags = {
+            value: tuple(
+                item for item in candidates if type(item) is not DataclassV or item is owner
+            )
+            for value, owner in owners.items()
+        }
+        if defaulted:
+            self.tags[MISSING] = tuple(
+                item for item in candidates if type(item) is not DataclassV or item in defaulted
+            )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the tables are filled in as values come
+        return {**self.__dict__, "tables": ({}, {})}
+
+    def candidates(self, value: Any, from_dict: bool) -> Tuple[Validator, ...]:
+        """Get the variants worth trying for `value`, in order."""
+        typ = type(value)
+        if from_dict and self.tags is not None and typ is dict:
+            try:
+                return self.tags.get(value.get(self.discriminator, MISSING), self.untagged)
+            except TypeError:  # unhashable
+                return self.untagged
+
+        table = self.tables[from_dict]
+        found = table.get(typ)
+        if found is None:
+            # instances of one of the dataclasses aren't duck-typed as the others
+            exact = not from_dict and any(
+                type(item) is DataclassV and item.rf() is typ  # type: ignore
+                for item in self.variants
+            )
+            found = tuple(
+                item
+                for item in self.variants
+                if (
+                    item.rf() is typ  # type: ignore
+                    if exact and type(item) is DataclassV
+                    else may_accept(item, typ, from_dict)
+                )
+            )
+            table[typ] = found
+
+        return found
+
+    def validate(self, value: Any, **options) -> Result:
+        from_dict = bool(options.get("from_dict"))
+        data = self.check(value, from_dict)
+        if data is not FAIL:
+            return Result.Ok(data)
+
+        candidates = self.candidates(value, from_dict)
+        errors = []
+        if from_dict and self.tags is not None and type(value) is dict:
+            try:
+                known = value.get(self.discriminator, MISSING) in self.tags
+            except TypeError:  # unhashable
+                known = False
+        else:
+            known = True
+
+        if not known:
+            errors.append(Issue("tag", self, value))
+
+        if not candidates:
+            if errors:
+                return Result.Err(*errors)
+            return Result.Err(Issue("no_variant", self, value))
+
+        for item in candidates:
+            errors.extend(item.validate(value, **options).unwrap_err())
+
+        return Result.trace_below(
+            Trace("Failed to validate {!r}, tried {}, got errors:", self, Tried(candidates)),
+            *errors,
+        )
+
+    def check(self, value: Any, from_dict: bool = False) -> Any:
+        for item in self.candidates(value, from_dict):
+            data = item.check(value, from_dict)
+            if data is not FAIL:
+                return data
+
+        return FAIL
+
+    def __repr__(self) -> str:
+        return " | ".join(repr(item) for item in self.variants)
+
+
+def _infer_discriminator(dataclasses: List[DataclassV]) -> Optional[str]:
+    """Find a `Literal` field shared by all dataclasses, with distinct tags."""
+    if len(dataclasses) < 2:
+        return None
+
+    for name, target in dataclasses[0].targets.items():
+        seen = set()
+        for item in dataclasses:
+            target = item.targets.get(name)
+            if type(target) is not LiteralV:
+                break
+
+            values = target.values  # type: ignore
+            if not all(_is_tag(value) for value in values) or any(
+                value in seen for value in values
+            ):
+                break
+            seen.update(values)
+        else:
+            return name
+
+    return None
@@ -0,0 +1,790 @@
+import io
+from array import array
+from typing import Literal, Optional
+
+import pytest
+from exacting import Exact, ListV, StrV, ValidationError, exact, field
+
+
+def test_compiled_validator():
+    class Tag(Exact):
+        name: str = field(regex="^#")
+
+    class Post(Exact):
+        title: str
+        kind: Literal["text", "link"] = "text"
+        tags: list[Tag]
+        votes: dict[str, Optional[int]] = field(default_factory=dict)
+
+    post = Post.exact_from_dict(
+        {"title": "hi", "tags": [{"name": "#a"}], "votes": {"x": 1, "y": None}}
+    )
+    assert post.kind == "text"
+    assert post.tags == [Tag(name="#a")]
+
+    tags = [Tag(name="#b")]
+    assert Post(title="hi", tags=tags).tags is tags
+
+    with pytest.raises(ValidationError, match="at item 0"):
+        Post.exact_from_dict({"title": "hi", "tags": [{"name": "a"}]})
+
+
+def test_from_json_many():
+    class Point(Exact):
+        x: int
+        y: int
+
+    results = Point.exact_from_json_many(
+        ['{"x": 1, "y": 2}', b'{"x": 1, "y": "2"}', '{"x": 3, "y": 4}'], workers=2
+    )
+    assert [res.is_ok() for res in results] == [True, False, True]
+    assert results[2].unwrap() == Point(x=3, y=4)
+
+
+def test_iter_json():
+    import io
+
+    class Point(Exact):
+        x: int
+        y: int
+
+    ndjson = io.BytesIO(b'{"x": 1, "y": 2}\n{"x": 3, "y": 4}\n')
+    array = io.StringIO('[{"x": 1, "y": 2}, {"x": 3, "y": 4}]')
+    for source in (ndjson, array):
+        assert list(Point.exact_iter_json(source, chunk_size=4)) == [
+            Point(x=1, y=2),
+            Point(x=3, y=4),
+        ]
+
+    ndjson = io.BytesIO(b'{"x": 1, "y": 2}\n')
+    assert list(Point.exact_iter_json(ndjson, format="ndjson")) == [Point(x=1, y=2)]
+    with pytest.raises(RuntimeError):
+        list(Point.exact_iter_json(io.BytesIO(b'{"x": 1, "y": 2}\n'), format="array"))
+
+    # newline-delimited arrays aren't one top-level array
+    lines = b'[{"x": 1, "y": 2}]\n[{"x": 3, "y": 4}]\n'
+    with pytest.raises(RuntimeError):
+        list(Point.exact_iter_json(io.BytesIO(lines)))
+    with pytest.raises(ValueError):
+        list(Point.exact_iter_json(io.BytesIO(lines), format="csv"))
+
+
+def test_archive(tmp_path):
+    class Tag(Exact):
+        name: str
+
+    class Post(Exact):
+        title: str
+        tags: list[Tag]
+
+    path = tmp_path / "posts.exact"
+    posts = [Post(title="a", tags=[Tag(name="x")]), Post(title="b", tags=[])]
+    assert Post.exact_write_archive(path, posts) == 2
+
+    archive = Post.exact_open_archive(path)
+    assert len(archive) == 2
+    assert archive[0].title == "a"
+    assert archive[0].tags[0].name == "x"
+    assert archive[-1]["title"] == "b"
+    assert [view.to_py() for view in archive][1] == {"title": "b", "tags": []}
+
+    class Other(Exact):
+        title: int
+
+    with pytest.raises(ValidationError, match="archive record 0"):
+        Other.exact_open_archive(path)
+
+
+def test_discriminated_union():
+    from typing import Union
+
+    from exacting import OneOfV
+
+    class Click(Exact):
+        kind: Literal["click"]
+        x: int
+
+    class Key(Exact):
+        kind: Literal["key"]
+        code: str
+
+    class Event(Exact):
+        event: Union[Click, Key, int, None]
+
+    assert isinstance(Event.__validator__.targets["event"], OneOfV)
+    assert Event.__validator__.targets["event"].discriminator == "kind"
+
+    event = Event.exact_from_dict({"event": {"kind": "key", "code": "a"}}).event
+    assert event == Key(kind="key", code="a")
+    assert Event(event=5).event == 5
+
+    with pytest.raises(ValidationError, match="tried Key, got errors"):
+        Event.exact_from_dict({"event": {"kind": "key", "code": 1}})
+
+    with pytest.raises(ValidationError, match="'kind' to be one of 'click', 'key'"):
+        Event.exact_from_dict({"event": {"kind": "scroll"}})
+
+    with pytest.raises(ValidationError, match="no variant accepts"):
+        Event(event="nope")  # type: ignore
+
+
+def test_validated_marker():
+    class Actor(Exact):
+        name: str
+
+    class Scene(Exact):
+        actors: list[Actor]
+
+    actor = Actor(name="a")
+    assert actor.__exact_valid__ is Actor.__validator__
+    assert Scene(actors=[actor]).actors[0] is actor
+
+    actor.name = 1  # type: ignore
+    assert actor.__exact_valid__ is None
+    with pytest.raises(ValidationError, match="at item 0"):
+        Scene(actors=[actor])
+
+    actor["name"] = "b"
+    assert Scene(actors=[actor]).actors[0].__exact_valid__ is Actor.__validator__
+
+    loaded = Scene.exact_from_dict({"actors": [{"name": "c"}]}).actors[0]
+    assert loaded.__exact_valid__ is Actor.__validator__
+
+    class Extra(Actor):
+        name: str  # declared again, still required
+        extra: int = 0
+
+    with pytest.raises(KeyError):
+        Extra()  # type: ignore
+    extra = Extra(name="d")
+    del extra.extra
+    assert extra.__exact_valid__ is None
+
+
+def test_nested_models():
+    class Owner(Exact):
+        name: str
+
+    class Pet(Exact):
+        owner: Owner
+
+    pet = Pet.exact_from_dict({"owner": {"name": "a"}})
+    assert isinstance(pet.owner, Owner) and pet.owner.name == "a"
+
+    with pytest.raises(ValidationError, match="'owner'"):
+        Pet.exact_from_dict({"owner": {"name": 1}})
+    with pytest.raises(ValidationError, match="'owner'"):
+        Pet(owner={"name": "a"})  # type: ignore
+
+    owner = Owner(name="b")
+    assert Pet(owner=owner).owner is owner
+    owner.name = 2  # type: ignore
+    with pytest.raises(ValidationError, match="'owner'"):
+        Pet(owner=owner)
+
+
+class TreeNode(Exact):
+    name: str
+    children: list["TreeNode"] = field(default_factory=list)
+    parent: Optional["TreeNode"] = None
+
+
+def test_recursive_model():
+    tree = TreeNode.exact_from_dict(
+        {"name": "a", "children": [{"name": "b", "children": [{"name": "c"}]}]}
+    )
+    assert tree.children[0].children[0] == TreeNode(name="c")
+    assert TreeNode(name="d", parent=tree).parent is tree
+    assert TreeNode.exact_from_json('{"name": "e", "parent": {"name": "f"}}').parent.name == "f"
+
+    with pytest.raises(ValidationError) as info:
+        TreeNode.exact_from_dict({"name": "a", "children": [{"name": 1}]})
+    assert info.value.issues[0].path == ("children", 0, "name")
+
+
+class Author(Exact):
+    name: str
+    latest: Optional["Book"] = None
+
+
+class Book(Exact):
+    title: str
+    author: Optional[Author] = None
+
+
+def test_mutually_recursive_models():
+    book = Book.exact_from_dict({"title": "A", "author": {"name": "B", "latest": {"title": "A"}}})
+    assert book.author.latest == Book(title="A")
+    assert Author(name="C", latest=book).latest is book
+    assert Author.exact_from_json('{"name": "D", "latest": {"title": "E"}}').latest.title == "E"
+
+    with pytest.raises(ValidationError) as info:
+        Author.exact_from_dict({"name": "F", "latest": {"title": "G", "author": {"name": 1}}})
+    assert info.value.issues[0].path == ("latest", "author", "name")
+
+
+def test_lazy_validator(tmp_path):
+    from exacting import disable_cache, enable_cache
+    from exacting.cache import flush
+
+    class Broken(Exact):
+        x: "Nope"  # type: ignore # noqa: F821
+
+    with pytest.raises(NameError):
+        Broken(x=1)
+
+    class Member(Exact):
+        name: str
+
+    enable_cache(tmp_path / "cache")
+    try:
+        assert Member(name="a").name == "a"
+        flush()
+    finally:
+        disable_cache()
+
+    assert any((tmp_path / "cache").iterdir())
+
+
+def test_cached_spec(tmp_path, monkeypatch):
+    import importlib
+    import sys
+
+    from exacting import disable_cache, enable_cache, validator_map
+    from exacting.cache import flush
+
+    (tmp_path / "cached_models.py").write_text(
+        "from typing import Literal, Optional, Union\n"
+        "from exacting import Exact, field\n\n"
+        "class Tag(Exact):\n"
+        "    name: str = field(regex='^#')\n\n"
+        "class Post(Exact):\n"
+        "    kind: Literal['post']\n"
+        "    tags: list[Tag]\n"
+        "    parent: Optional['Post'] = None\n\n"
+        "class Click(Exact):\n"
+        "    x: int\n"
+        "    kind: Literal['click'] = 'click'\n\n"
+        "class Key(Exact):\n"
+        "    kind: Literal['key']\n"
+        "    code: str\n\n"
+        "class Event(Exact):\n"
+        "    event: Union[Click, Key]\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    enable_cache(tmp_path / "cache")
+    try:
+        module = importlib.import_module("cached_models")
+        module.Post.exact_from_dict({"kind": "post", "tags": [{"name": "#a"}]})
+        module.Event(event=module.Click(x=1))
+        flush()
+
+        # a later process: the annotations aren't looked at again
+        del sys.modules["cached_models"]
+        module = importlib.import_module("cached_models")
+
+        def fail(dc):
+            raise AssertionError(f"{dc!r} was built again")
+
+        monkeypatch.setattr(validator_map, "get_map_for_dc", fail)
+        post = module.Post.exact_from_dict(
+            {"kind": "post", "tags": [{"name": "#b"}], "parent": {"kind": "post", "tags": []}}
+        )
+        assert isinstance(post.tags[0], module.Tag) and isinstance(post.parent, module.Post)
+        with pytest.raises(ValidationError):
+            module.Post.exact_from_dict({"kind": "post", "tags": [{"name": "b"}]})
+
+        # variants with a defaulted tag are keyed on `MISSING`
+        assert module.Event(event=module.Click(x=1)).event == module.Click(x=1)
+        assert module.Event.exact_from_dict({"event": {"x": 2}}).event == module.Click(x=2)
+        assert module.Event.exact_from_dict(
+            {"event": {"kind": "key", "code": "a"}}
+        ).event == module.Key(kind="key", code="a")
+    finally:
+        disable_cache()
+        sys.modules.pop("cached_models", None)
+
+
+def test_as_json():
+    class Point(Exact):
+        x: float
+        y: float
+
+    class Shape(Exact):
+        name: str
+        points: list[Point]
+        meta: dict[str, Optional[int]]
+
+    shape = Shape(name="tri \"é\"", points=[Point(x=0.5, y=1.0)], meta={"a": None})
+    raw = shape.exact_as_json()
+    assert raw == '{"name":"tri \\"é\\"","points":[{"x":0.5,"y":1.0}],"meta":{"a":null}}'
+    assert shape.exact_as_json(as_bytes=True) == raw.encode()
+    assert Shape.exact_from_json(raw) == shape
+
+    # plain dataclasses inside `Any` are dumped field by field, without
+    # `ClassVar` pseudo-fields
+    from dataclasses import dataclass
+    from typing import Any, ClassVar
+
+    @dataclass
+    class Tag:
+        kind: ClassVar[str] = "tag"
+        name: str
+
+    class Labelled(Exact):
+        label: Any
+
+    assert Labelled(label=Tag(name="a")).exact_as_json() == '{"label":{"name":"a"}}'
+
+
+def test_json_big_ints(tmp_path):
+    from typing import Any
+
+    class Counter(Exact):
+        value: int
+        extra: Any = None
+
+    raw = '{"value": 18446744073709551615, "extra": [18446744073709551615]}'
+    counter = Counter.exact_from_json(raw)
+    assert counter.value == counter.extra[0] == 2**64 - 1
+
+    path = tmp_path / "counter.json"
+    path.write_text(raw)
+    assert Counter.exact_from_json_file(path) == counter
+
+
+def test_dump_json_many(tmp_path):
+    class Row(Exact):
+        id: int
+        name: str
+
+    rows = [Row(id=i, name=f"row {i}") for i in range(100)]
+    path = tmp_path / "rows.ndjson"
+    with open(path, "wb") as f:
+        assert Row.exact_dump_json_many(rows, f, chunk_size=64) == 100
+
+    assert list(Row.exact_iter_json(path)) == rows
+
+    buf = io.StringIO()
+    Row.exact_dump_json_many(rows[:2], buf)
+    assert buf.getvalue() == '{"id":0,"name":"row 0"}\n{"id":1,"name":"row 1"}\n'
+
+
+def test_as_dict_modes():
+    class Customer(Exact):
+        name: str
+
+    class Order(Exact):
+        id: int
+        tags: list[str]
+        customer: Customer
+        history: list[Customer] = field(default_factory=list)
+
+    order = Order(id=1, tags=["a"], customer=Customer(name="x"))
+    deep = order.exact_as_dict()
+    assert deep == {"id": 1, "tags": ["a"], "customer": {"name": "x"}, "history": []}
+    assert deep["tags"] is not order.tags
+
+    models = order.exact_as_dict(mode="models")
+    assert models == deep
+    assert models["tags"] is order.tags
+
+    shallow = order.exact_as_dict(mode="shallow")
+    assert shallow["customer"] is order.customer
+
+    view = order.exact_as_mapping()
+    assert dict(view) == shallow and len(view) == 4
+    with pytest.raises(KeyError):
+        view["nope"]
+    with pytest.raises(TypeError):
+        view["id"] = 2  # type: ignore
+
+
+def test_slots():
+    import copy
+
+    @exact(slots=True)
+    class Item(Exact):
+        id: int
+        tags: list[str] = field(default_factory=list)
+        note: Optional[str] = None
+
+    @exact(slots=True)
+    class Box(Exact):
+        items: list[Item]
+
+    item = Item(id=1)
+    assert not hasattr(item, "__dict__")
+    assert item.tags == [] and item.note is None
+    assert item["id"] == 1
+
+    box = Box.exact_from_dict({"items": [{"id": 2, "tags": ["a"]}]})
+    assert box.items[0].tags == ["a"]
+    assert Box(items=[item, box.items[0]]).exact_as_dict(mode="models")["items"][0] == {
+        "id": 1,
+        "tags": [],
+        "note": None,
+    }
+
+    item["id"] = 3
+    assert item.id == 3
+    with pytest.raises(ValidationError):
+        item["id"] = "nope"
+    item.id = "nope"  # type: ignore
+    with pytest.raises(ValidationError):
+        Box(items=[item])
+
+    assert copy.deepcopy(box) == box
+
+    class Base(Exact):
+        id: int
+
+        def describe(self) -> str:
+            return f"#{self.id}"
+
+    @exact(slots=True)
+    class Child(Base):
+        name: str
+
+        def describe(self) -> str:
+            assert __class__ is Child
+            return f"{super().describe()} {self.name}"
+
+    assert Child(id=1, name="a").describe() == "#1 a"
+
+    with pytest.raises(TypeError, match="@exact"):
+
+        class Keyword(Exact, slots=True):  # type: ignore
+            id: int
+
+
+def test_metaclass_mixins():
+    from abc import ABC, abstractmethod
+
+    class Shape(Exact, ABC):
+        name: str
+
+        @abstractmethod
+        def area(self) -> float: ...
+
+    class Square(Shape, validate_assignment=True):
+        side: float
+
+        def area(self) -> float:
+            return self.side**2
+
+    with pytest.raises(TypeError):
+        Shape(name="?")  # type: ignore
+    square = Square(name="a", side=2.0)
+    assert square.area() == 4.0
+    with pytest.raises(ValidationError):
+        square.side = "2"  # type: ignore
+
+
+def test_generated_init():
+    from exacting import unsafe
+
+    class Node(Exact):
+        type: str  # shadows a builtin the generated code uses
+        id: int = 0
+        children: list[int] = field(default_factory=list)
+
+    node = Node(type="a")
+    assert (node.type, node.id, node.children) == ("a", 0, [])
+    assert Node(type="b").children is not node.children
+
+    with pytest.raises(ValidationError):
+        Node(type="a", id="1")  # type: ignore
+    with pytest.raises(KeyError):
+        Node(id=1)  # type: ignore
+    assert Node(type="c", extra=1).type == "c"  # type: ignore
+
+    with pytest.raises(RuntimeError):
+        Node.__unsafe_init__(type=1)
+    with unsafe():
+        assert Node.__unsafe_init__(type=1).type == 1
+        with pytest.raises(KeyError):
+            Node.__unsafe_init__(id=1)
+
+
+@exact(slots=True)
+class PickledKey(Exact, frozen=True):
+    kind: str
+    id: int
+
+
+@exact(slots=True)
+class PickledItem(Exact):
+    id: int
+
+
+def test_pickle():
+    import pickle
+
+    key = PickledKey(kind="a", id=1)
+    loaded = pickle.loads(pickle.dumps(key))
+    assert loaded == key and hash(loaded) == hash(key)
+
+    item = pickle.loads(pickle.dumps(PickledItem(id=1)))
+    assert item.id == 1 and getattr(item, "__exact_valid__", None) is None
+    item.id = 2
+    assert item.id == 2
+
+
+def test_frozen():
+    import copy
+    from dataclasses import FrozenInstanceError
+
+    class Key(Exact, frozen=True):
+        kind: str
+        id: int
+
+    @exact(slots=True)
+    class SlottedKey(Exact, frozen=True):
+        kind: str
+
+    class Index(Exact):
+        keys: dict[str, Key]
+
+    key = Key(kind="a", id=1)
+    with pytest.raises(FrozenInstanceError):
+        key.id = 2  # type: ignore
+    with pytest.raises(FrozenInstanceError):
+        key["id"] = 2
+
+    assert hash(key) == hash(Key(kind="a", id=1)) == hash(key)
+    assert {key, Key(kind="a", id=1)} == {key}
+    assert copy.deepcopy(key) == key
+
+    assert hash(SlottedKey(kind="x")) == hash(SlottedKey(kind="x"))
+
+    index = Index.exact_from_dict({"keys": {"x": {"kind": "b", "id": 2}}})
+    assert index.keys["x"] == Key(kind="b", id=2)
+    assert Index(keys={"y": key}).keys["y"] is key
+
+    with pytest.raises(ValidationError):
+        Key(kind="a", id="1")  # type: ignore
+
+
+def test_validate_assignment():
+    class Doc(Exact, validate_assignment=True):
+        title: str = field(regex="^[A-Z]")
+        tags: list[str] = field(default_factory=list)
+
+    @exact(slots=True)
+    class SlottedDoc(Exact, validate_assignment=True):
+        title: str
+
+    class Shelf(Exact):
+        docs: list[Doc]
+
+    doc = Doc(title="Hi")
+    doc.title = "Hey"
+    assert doc.title == "Hey"
+    with pytest.raises(ValidationError):
+        doc.title = "nope"
+    with pytest.raises(ValidationError):
+        doc.tags = [1]  # type: ignore
+    assert doc.title == "Hey"
+    assert doc.__exact_valid__ is Doc.__validator__
+    Shelf(docs=[doc])
+
+    other = Doc(title="A")
+    other["title"] = "Ho"
+    assert other.title == "Ho" and other.__exact_valid__ is Doc.__validator__
+    with pytest.raises(ValidationError):
+        other["title"] = "no"
+    del other.tags
+    with pytest.raises(AttributeError):
+        other.tags
+
+    slotted = SlottedDoc(title="a")
+    slotted.title = "b"
+    assert slotted.title == "b"
+    with pytest.raises(ValidationError):
+        slotted.title = 1  # type: ignore
+
+    copy = doc.exact_replace(title="Yo")
+    assert (copy.title, doc.title) == ("Yo", "Hey")
+    assert copy.tags is doc.tags
+    with pytest.raises(ValidationError):
+        doc.exact_replace(title="no")
+    with pytest.raises(TypeError):
+        doc.exact_replace(nope=1)
+
+
+def test_native_lists():
+    class Series(Exact):
+        names: list[str]
+        values: list[float] = field(as_array=True)
+
+    series = Series(names=["a", "b"], values=[1.5, 2.5])
+    assert series.values == array("d", [1.5, 2.5])
+    assert Series(names=[], values=series.values).values is series.values
+
+    with pytest.raises(ValidationError, match="at item 2"):
+        Series(names=["a", "b", 3, "d"], values=[])  # type: ignore
+    with pytest.raises(ValidationError, match="at item 1"):
+        Series(names=[], values=[1.5, "x"])  # type: ignore
+    with pytest.raises(ValidationError):
+        Series(names=[], values=array("q", [1]))  # type: ignore
+
+    with pytest.raises(TypeError):
+        ListV(StrV(), as_array=True)
+
+
+def test_native_dicts():
+    class Bag(Exact):
+        attrs: dict[str, str | int | float | bool]
+        notes: dict[str, Optional[str]] = field(default_factory=dict)
+
+    attrs = {f"k{i}": i if i % 2 else str(i) for i in range(100)}
+    bag = Bag(attrs=attrs, notes={"a": None})
+    assert bag.attrs is attrs
+    assert list(bag.attrs) == list(attrs)
+
+    with pytest.raises(ValidationError, match="'k3'"):
+        Bag(attrs={"k1": 1, "k2": 2.5, "k3": [1]})  # type: ignore
+    with pytest.raises(ValidationError, match="1"):
+        Bag(attrs={1: "x"})  # type: ignore
+
+
+def test_structured_errors():
+    class Item(Exact):
+        name: str = field(regex="^[a-z]+$")
+        tags: list[str]
+
+    class Order(Exact):
+        items: list[Item]
+        notes: dict[str, int]
+
+    data = {
+        "items": [{"name": "ok", "tags": []}, {"name": "BAD", "tags": ["a", 1]}],
+        "notes": {"a": "x"},
+    }
+    with pytest.raises(ValidationError) as info:
+        Order.exact_from_dict(data)
+    assert type(info.value.args[0]) is str and "'name'" in info.value.args[0]
+    assert [(i.code, i.path) for i in info.value.issues] == [("regex", ("items", 1, "name"))]
+
+    with pytest.raises(ValidationError) as info:
+        Order.exact_from_dict(data, collect_all=True)
+    issues = info.value.issues
+    assert [(i.code, i.path) for i in issues] == [
+        ("regex", ("items", 1, "name")),
+        ("type", ("items", 1, "tags", 1)),
+        ("type", ("notes", "a")),
+    ]
+    assert (issues[1].expected, issues[1].value) == (str, 1)
+    assert "at field 'notes'" in str(info.value)
+    assert data["items"][1] == {"name": "BAD", "tags": ["a", 1]}
+
+
+def test_json_to_py():
+    from exacting.exacting import json_to_py
+
+    data = json_to_py('[{"name": "a", "big": 9223372036854775808}, {"name": "b"}]')
+    assert data == [{"name": "a", "big": 2**63}, {"name": "b"}]
+    assert next(iter(data[0])) is next(iter(data[1]))
+
+    with pytest.raises(RuntimeError):
+        json_to_py('{"a": 1} trailing')
+
+
+def test_from_json_buffers(tmp_path):
+    class Reading(Exact):
+        sensor: str
+        values: list[float]
+
+    raw = b'{"sensor": "a", "values": [1.5, 2.5]}'
+    for data in (raw, bytearray(raw), memoryview(raw), raw.decode()):
+        assert Reading.exact_from_json(data) == Reading(sensor="a", values=[1.5, 2.5])
+
+    path = tmp_path / "reading.json"
+    path.write_bytes(raw)
+    assert Reading.exact_from_json_file(path).sensor == "a"
+
+    path.write_bytes(b'{"sensor": 1, "values": ["x"]}')
+    with pytest.raises(ValidationError) as info:
+        Reading.exact_from_json_file(str(path), collect_all=True)
+    assert [i.path for i in info.value.issues] == [("sensor",), ("values", 0)]
+
+
+def test_json_backends():
+    class Config(Exact):
+        name: str
+        tags: list[str]
+
+    raw = '{"name": "a", "tags": ["x", "y"]}'
+    for backend in ("serde", "simd", "jsonc", "json5"):
+        assert Config.exact_from_json(raw, backend=backend).tags == ["x", "y"]
+
+    jsonc = """{
+        // the name
+        "name": "a // not a comment", /* tags: */
+        "tags": ["x", "y",],
+    }"""
+    assert Config.exact_from_json(jsonc, strict=False).name == "a // not a comment"
+    assert Config.exact_from_json(jsonc, backend="jsonc").tags == ["x", "y"]
+    with pytest.raises(RuntimeError):
+        Config.exact_from_json(jsonc, backend="serde")
+    with pytest.raises(ValueError):
+        Config.exact_from_json(raw, backend="nope")
+
+    for backend in (None, "jsonc"):
+        with pytest.raises(RuntimeError):
+            Config.exact_from_json('{"name": "a", "tags": []} /* open', strict=False, backend=backend)
+
+
+def test_regex_engines():
+    from exacting.exacting import Regex, RegexSet
+    from exacting.validators import RegexV
+
+    assert Regex("^[a-z]+$").engine == "linear"
+    assert Regex(r"^(\w)\1$").engine == "fancy"
+
+    patterns = ["^[a-z]+", r"(\w)\1", "[0-9]$"]
+    regexes = RegexSet(patterns)
+    assert regexes.validate("abcc1")
+    assert regexes.find_mismatch("abc1") == 1
+    assert regexes.find_mismatch("abcc") == 2
+
+    class Code(Exact):
+        code: str = field(validators=[RegexV(p) for p in patterns])
+
+    assert Code(code="aa1").code == "aa1"
+    assert Code.exact_from_json('{"code": "abcc1"}').code == "abcc1"
+    with pytest.raises(ValidationError):
+        Code(code="ab1")
+    with pytest.raises(ValidationError):
+        Code.exact_from_dict({"code": "aa"})
+
+
+def test_regex_lists():
+    from typing import Annotated
+
+    from exacting.exacting import Regex
+    from exacting.validators import RegexV
+
+    regex = Regex("^[a-z]+$")
+    assert regex.validate_many(["a", "b"]) == []
+    assert regex.validate_many(["a", "B", 1]) == [1]
+    assert regex.validate_many(["a", "B", 1], all=True) == [1, 2]
+    # lone surrogates can't be matched, so they fail instead of raising
+    assert regex.validate_many(["a", "\ud800", "b"], all=True) == [1]
+
+    Slug = Annotated[str, RegexV("^[a-z-]+$")]
+
+    class Post(Exact):
+        slug: Slug
+        tags: list[Slug]
+
+    assert Post(slug="a-b", tags=["x", "y-z"]).tags == ["x", "y-z"]
+    assert Post.exact_from_json('{"slug": "a", "tags": ["b"]}').tags == ["b"]
+    with pytest.raises(ValidationError):
+        Post(slug="Nope", tags=[])
+
+    with pytest.raises(ValidationError) as info:
+        Post.exact_from_dict({"slug": "a", "tags": ["b", "C", 1]}, collect_all=True)
+    assert [i.path for i in info.value.issues] == [("tags", 1), ("tags", 2)]
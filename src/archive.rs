@@ -0,0 +1,322 @@
+use std::{ fs::File, io::{ BufWriter, Write }, path::PathBuf, sync::Arc };
+
+use memmap2::Mmap;
+use pyo3::{ exceptions, prelude::*, types::{ PyList, PyString } };
+use rkyv::rancor;
+
+use crate::{ dump::{ self, ArchivedData }, schema::{ Document, Kind, PySchema } };
+
+/// Bumped whenever the file layout changes.
+const VERSION: u8 = 1;
+
+/// `b"exmap"`, two reserved bytes, then the version.
+const HEADER_LEN: usize = 8;
+const MAGIC: &[u8; 5] = b"exmap";
+
+/// Records (and the index) start at multiples of this, so they can be
+/// read in place from the map.
+const ALIGN: usize = 16;
+
+/// Record count and index offset, at the very end of the file.
+const FOOTER_LEN: usize = 16;
+
+pub(crate) fn io_error(message: &str, e: std::io::Error) -> PyErr {
+    exceptions::PyOSError::new_err(format!("{}: {}", message, e))
+}
+
+fn padding(offset: usize) -> usize {
+    (ALIGN - (offset % ALIGN)) % ALIGN
+}
+
+/// Writes records into an archive file.
+///
+/// Layout: header, records (each an rkyv archive of `Data`, aligned), an
+/// index of `(offset, len)` pairs, then the footer.
+#[pyfunction]
+pub(crate) fn write_archive(path: PathBuf, items: &Bound<'_, PyAny>) -> PyResult<usize> {
+    let file = File::create(&path).map_err(|e| io_error("Failed to create archive", e))?;
+    let mut writer = BufWriter::new(file);
+
+    let mut header = [0u8; HEADER_LEN];
+    header[..MAGIC.len()].copy_from_slice(MAGIC);
+    header[HEADER_LEN - 1] = VERSION;
+
+    let mut offset = 0;
+    let mut write = |bytes: &[u8], offset: &mut usize| -> PyResult<()> {
+        writer.write_all(bytes).map_err(|e| io_error("Failed to write archive", e))?;
+        *offset += bytes.len();
+        Ok(())
+    };
+
+    write(&header, &mut offset)?;
+
+    let mut index: Vec<(u64, u64)> = vec![];
+    let mut archive = vec![];
+    for item in items.try_iter()? {
+        archive.clear();
+        dump::archive_into(&item?, &mut archive)?;
+
+        write(&[0u8; ALIGN][..padding(offset)], &mut offset)?;
+        index.push((offset as u64, archive.len() as u64));
+        write(&archive, &mut offset)?;
+    }
+
+    write(&[0u8; ALIGN][..padding(offset)], &mut offset)?;
+    let index_offset = offset as u64;
+    for (start, len) in index.iter() {
+        write(&start.to_le_bytes(), &mut offset)?;
+        write(&len.to_le_bytes(), &mut offset)?;
+    }
+
+    write(&(index.len() as u64).to_le_bytes(), &mut offset)?;
+    write(&index_offset.to_le_bytes(), &mut offset)?;
+
+    writer.flush().map_err(|e| io_error("Failed to write archive", e))?;
+    Ok(index.len())
+}
+
+/// A memory-mapped archive file of records.
+#[pyclass(name = "ArchiveFile", frozen)]
+pub(crate) struct PyArchiveFile {
+    map: Arc<Mmap>,
+    /// Offset of each record's root node in the map.
+    roots: Vec<usize>,
+    schema: Py<PySchema>,
+}
+
+fn read_u64(map: &[u8], at: usize) -> usize {
+    let mut bytes = [0u8; 8];
+    bytes.copy_from_slice(&map[at..at + 8]);
+    u64::from_le_bytes(bytes) as usize
+}
+
+fn bad_file() -> PyErr {
+    exceptions::PyValueError::new_err(
+        format!("Unsupported or corrupted archive file (expected version {})", VERSION)
+    )
+}
+
+fn node<'a>(map: &'a Mmap, offset: usize) -> &'a ArchivedData {
+    // SAFETY: offsets only ever come from nodes of checked (or trusted)
+    // records, and the map outlives every view through the `Arc`
+    unsafe { &*(map.as_ptr().add(offset) as *const ArchivedData) }
+}
+
+fn offset_of(map: &Mmap, data: &ArchivedData) -> usize {
+    (data as *const ArchivedData as usize) - (map.as_ptr() as usize)
+}
+
+impl PyArchiveFile {
+    fn record(&self, idx: isize) -> PyResult<usize> {
+        let len = self.roots.len() as isize;
+        let idx = if idx < 0 { idx + len } else { idx };
+        if idx < 0 || idx >= len {
+            return Err(exceptions::PyIndexError::new_err("archive record index out of range"));
+        }
+        Ok(self.roots[idx as usize])
+    }
+}
+
+#[pymethods]
+impl PyArchiveFile {
+    /// Opens and maps an archive file. Unless `trusted`, every record's
+    /// structure is checked right away.
+    #[new]
+    #[pyo3(signature = (path, schema, trusted = false))]
+    pub(crate) fn py_new(
+        py: Python,
+        path: PathBuf,
+        schema: Py<PySchema>,
+        trusted: bool
+    ) -> PyResult<Self> {
+        let file = File::open(&path).map_err(|e| io_error("Failed to open archive", e))?;
+        // SAFETY: the file must not be modified while it's mapped (documented)
+        let map = unsafe { Mmap::map(&file) }.map_err(|e| io_error("Failed to map archive", e))?;
+
+        if
+            map.len() < HEADER_LEN + FOOTER_LEN ||
+            &map[..MAGIC.len()] != MAGIC ||
+            map[HEADER_LEN - 1] != VERSION
+        {
+            return Err(bad_file());
+        }
+
+        let count = read_u64(&map, map.len() - FOOTER_LEN);
+        let index_offset = read_u64(&map, map.len() - 8);
+        let Some(index_end) = count.checked_mul(16).and_then(|n| n.checked_add(index_offset)) else {
+            return Err(bad_file());
+        };
+        if index_end > map.len() - FOOTER_LEN {
+            return Err(bad_file());
+        }
+
+        let mut index = Vec::with_capacity(count);
+        for i in 0..count {
+            let at = index_offset + i * 16;
+            let (start, len) = (read_u64(&map, at), read_u64(&map, at + 8));
+            if start % ALIGN != 0 || start.checked_add(len).map_or(true, |end| end > index_offset) {
+                return Err(bad_file());
+            }
+            index.push((start, len));
+        }
+
+        let roots = py.allow_threads(|| -> PyResult<Vec<usize>> {
+            let mut roots = Vec::with_capacity(index.len());
+            for (start, len) in index.iter() {
+                let bytes = &map[*start..*start + *len];
+                let root = if trusted {
+                    // SAFETY: the caller says so
+                    unsafe { rkyv::access_unchecked::<ArchivedData>(bytes) }
+                } else {
+                    match rkyv::access::<ArchivedData, rancor::Error>(bytes) {
+                        Ok(root) => root,
+                        Err(e) => {
+                            return Err(
+                                exceptions::PyRuntimeError::new_err(
+                                    format!("Failed to read archive record:\n{}", e)
+                                )
+                            );
+                        }
+                    }
+                };
+                roots.push(offset_of(&map, root));
+            }
+            Ok(roots)
+        })?;
+
+        Ok(Self { map: Arc::new(map), roots, schema })
+    }
+
+    fn __len__(&self) -> usize {
+        self.roots.len()
+    }
+
+    fn __getitem__(&self, idx: isize) -> PyResult<PyArchiveView> {
+        Ok(PyArchiveView { map: self.map.clone(), offset: self.record(idx)? })
+    }
+
+    fn __iter__(slf: Bound<'_, Self>) -> PyArchiveIter {
+        PyArchiveIter { archive: slf.unbind(), next: 0 }
+    }
+
+    /// Checks every record against the schema, without building anything.
+    /// Returns the index and errors of the first bad record, if any.
+    pub(crate) fn validate(&self, py: Python) -> PyResult<Option<(usize, Vec<String>)>> {
+        let schema = self.schema.get();
+        for (idx, root) in self.roots.iter().enumerate() {
+            if let Some(errors) = schema.check(py, node(&self.map, *root))? {
+                return Ok(Some((idx, errors)));
+            }
+        }
+        Ok(None)
+    }
+}
+
+#[pyclass(name = "ArchiveIter")]
+pub(crate) struct PyArchiveIter {
+    archive: Py<PyArchiveFile>,
+    next: usize,
+}
+
+#[pymethods]
+impl PyArchiveIter {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self) -> Option<PyArchiveView> {
+        let archive = self.archive.get();
+        let offset = *archive.roots.get(self.next)?;
+        self.next += 1;
+        Some(PyArchiveView { map: archive.map.clone(), offset })
+    }
+}
+
+/// A read-only view into an archived dict (e.g., a model) or list. Nothing
+/// is copied out of the map until it's accessed.
+#[pyclass(name = "ArchiveView", frozen)]
+pub(crate) struct PyArchiveView {
+    map: Arc<Mmap>,
+    offset: usize,
+}
+
+impl PyArchiveView {
+    fn data(&self) -> &ArchivedData {
+        node(&self.map, self.offset)
+    }
+
+    /// Views for dicts and lists, Python objects for everything else.
+    fn wrap(&self, py: Python, data: &ArchivedData) -> PyResult<Py<PyAny>> {
+        match data.kind() {
+            Kind::Dict | Kind::List => {
+                let view = PyArchiveView {
+                    map: self.map.clone(),
+                    offset: offset_of(&self.map, data),
+                };
+                Ok(Py::new(py, view)?.into_any())
+            }
+            _ => data.to_py(py),
+        }
+    }
+}
+
+#[pymethods]
+impl PyArchiveView {
+    fn __getattr__(&self, py: Python, name: &str) -> PyResult<Py<PyAny>> {
+        match self.data().field(name) {
+            Some(data) => self.wrap(py, data),
+            None => Err(exceptions::PyAttributeError::new_err(name.to_string())),
+        }
+    }
+
+    fn __getitem__(&self, py: Python, key: &Bound<'_, PyAny>) -> PyResult<Py<PyAny>> {
+        let data = self.data();
+        match data.kind() {
+            Kind::List => {
+                let items = data.items();
+                let idx = key.extract::<isize>()?;
+                let idx = if idx < 0 { idx + (items.len() as isize) } else { idx };
+                if idx < 0 || (idx as usize) >= items.len() {
+                    return Err(exceptions::PyIndexError::new_err("list index out of range"));
+                }
+                self.wrap(py, &items[idx as usize])
+            }
+            _ => {
+                let name = key.downcast::<PyString>()?.to_str()?;
+                match data.field(name) {
+                    Some(data) => self.wrap(py, data),
+                    None => Err(exceptions::PyKeyError::new_err(name.to_string())),
+                }
+            }
+        }
+    }
+
+    fn __len__(&self) -> usize {
+        let data = self.data();
+        match data.kind() {
+            Kind::List => data.items().len(),
+            _ => data.entries().count(),
+        }
+    }
+
+    /// Keys of a dict view.
+    fn keys(&self, py: Python) -> PyResult<Py<PyList>> {
+        let list = PyList::empty(py);
+        for (k, _) in self.data().entries() {
+            list.append(k.to_py(py)?)?;
+        }
+        Ok(list.unbind())
+    }
+
+    /// Copies everything out into plain Python data.
+    fn to_py(&self, py: Python) -> PyResult<Py<PyAny>> {
+        self.data().to_py(py)
+    }
+
+    fn __repr__(&self) -> &'static str {
+        match self.data().kind() {
+            Kind::List => "ArchiveView([...])",
+            _ => "ArchiveView({...})",
+        }
+    }
+}
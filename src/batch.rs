@@ -0,0 +1,129 @@
+use std::{ collections::HashMap, sync::{ Arc, Mutex, OnceLock } };
+
+use pyo3::{ buffer::PyBuffer, exceptions, prelude::*, types::{ PyBytes, PyString } };
+use rayon::ThreadPool;
+
+/// Raw input borrowed from a Python `str` or `bytes`, readable without the GIL.
+pub(crate) enum Raw<'a> {
+    Str(&'a str),
+    Bytes(&'a [u8]),
+}
+
+impl<'a> Raw<'a> {
+    pub(crate) fn as_bytes(&self) -> &'a [u8] {
+        match self {
+            Self::Str(s) => s.as_bytes(),
+            Self::Bytes(b) => b,
+        }
+    }
+}
+
+/// A single document to read JSON from: a `str`, `bytes`, or any other
+/// contiguous buffer of bytes (`bytearray`, `memoryview`...). Never copied.
+pub(crate) enum Input<'py> {
+    Str(Bound<'py, PyString>),
+    Bytes(Bound<'py, PyBytes>),
+    Buffer(PyBuffer<u8>),
+}
+
+impl<'py> Input<'py> {
+    pub(crate) fn new(obj: &Bound<'py, PyAny>) -> PyResult<Self> {
+        if let Ok(s) = obj.downcast::<PyString>() {
+            return Ok(Self::Str(s.clone()));
+        }
+        if let Ok(b) = obj.downcast::<PyBytes>() {
+            return Ok(Self::Bytes(b.clone()));
+        }
+
+        let buffer = PyBuffer::<u8>::get(obj).map_err(|_| {
+            exceptions::PyTypeError::new_err(
+                format!(
+                    "Expected str, bytes or a buffer of bytes, got {}",
+                    obj.get_type().name().map(|n| n.to_string()).unwrap_or_default()
+                )
+            )
+        })?;
+        if !buffer.is_c_contiguous() {
+            return Err(exceptions::PyTypeError::new_err("Expected a contiguous buffer"));
+        }
+        Ok(Self::Buffer(buffer))
+    }
+
+    /// Whether the data can't change, so it can be read without the GIL.
+    pub(crate) fn is_immutable(&self) -> bool {
+        !matches!(self, Self::Buffer(_))
+    }
+
+    pub(crate) fn raw(&self) -> PyResult<Raw<'_>> {
+        Ok(match self {
+            Self::Str(s) => Raw::Str(s.to_str()?),
+            Self::Bytes(b) => Raw::Bytes(b.as_bytes()),
+            // SAFETY: contiguous, and kept alive (and unresizable) by the
+            // exported buffer, which lives as long as `self`
+            Self::Buffer(buffer) =>
+                Raw::Bytes(unsafe {
+                    std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes())
+                }),
+        })
+    }
+}
+
+pub(crate) fn raw_items<'a>(items: &'a [Bound<'_, PyAny>]) -> PyResult<Vec<Raw<'a>>> {
+    let mut raws = Vec::with_capacity(items.len());
+    for item in items.iter() {
+        if let Ok(s) = item.downcast::<PyString>() {
+            raws.push(Raw::Str(s.to_str()?));
+        } else if let Ok(b) = item.downcast::<PyBytes>() {
+            raws.push(Raw::Bytes(b.as_bytes()));
+        } else {
+            return Err(
+                exceptions::PyTypeError::new_err(
+                    format!("Expected str or bytes, got {}", item.get_type().name()?)
+                )
+            );
+        }
+    }
+    Ok(raws)
+}
+
+/// How many differently sized pools are kept around at most.
+const MAX_POOLS: usize = 16;
+
+/// Pools built for `workers=`, by thread count, reused across calls.
+static POOLS: OnceLock<Mutex<HashMap<usize, Arc<ThreadPool>>>> = OnceLock::new();
+
+/// Gets the pool with `n` threads, building it the first time.
+fn get_pool(n: usize) -> PyResult<Arc<ThreadPool>> {
+    let pools = POOLS.get_or_init(Default::default);
+    let mut pools = pools.lock().unwrap();
+    if let Some(pool) = pools.get(&n) {
+        return Ok(pool.clone());
+    }
+
+    let pool = match rayon::ThreadPoolBuilder::new().num_threads(n).build() {
+        Ok(pool) => Arc::new(pool),
+        Err(e) => {
+            return Err(
+                exceptions::PyRuntimeError::new_err(
+                    format!("Failed to build thread pool:\n{:#?}", e)
+                )
+            );
+        }
+    };
+    if pools.len() < MAX_POOLS {
+        pools.insert(n, pool.clone());
+    }
+    Ok(pool)
+}
+
+/// Runs `f` on a pool with `workers` threads, or on the global pool.
+pub(crate) fn run_in_pool<T, F>(workers: Option<usize>, f: F) -> PyResult<T>
+    where T: Send, F: FnOnce() -> T + Send
+{
+    match workers {
+        None => Ok(f()),
+        // the global pool has that many threads anyway
+        Some(n) if n == rayon::current_num_threads() => Ok(f()),
+        Some(n) => Ok(get_pool(n)?.install(f)),
+    }
+}
@@ -0,0 +1,251 @@
+use std::{ collections::HashMap, fmt };
+
+use pyo3::{
+    prelude::*,
+    types::{ PyBool, PyDict, PyFloat, PyInt, PyList, PyString },
+    IntoPyObjectExt,
+};
+use serde::de::{ self, DeserializeSeed, Deserializer, MapAccess, SeqAccess, Visitor };
+
+use crate::{ batch::Raw, json::{ strip_jsonc, Backend } };
+
+/// Keys (and values, if asked) longer than this aren't cached.
+const MAX_CACHED_LEN: usize = 64;
+
+/// How many different strings are cached at most, per document.
+const MAX_CACHED: usize = 1024;
+
+/// Strings already made for the document being decoded, so repeated ones
+/// (mostly dict keys) share a single Python object.
+pub(crate) struct StrCache {
+    strings: HashMap<Box<str>, Py<PyString>>,
+    values: bool,
+}
+
+impl StrCache {
+    pub(crate) fn new(values: bool) -> Self {
+        Self { strings: HashMap::new(), values }
+    }
+
+    /// Gets `s` as a Python string; keys are also interned, since they're
+    /// mostly looked up by name later on.
+    fn get(&mut self, py: Python, s: &str, key: bool) -> Py<PyString> {
+        if s.len() > MAX_CACHED_LEN || (!key && !self.values) {
+            return PyString::new(py, s).unbind();
+        }
+
+        if let Some(cached) = self.strings.get(s) {
+            return cached.clone_ref(py);
+        }
+
+        let string = if key { PyString::intern(py, s) } else { PyString::new(py, s) };
+        if self.strings.len() < MAX_CACHED {
+            self.strings.insert(s.into(), string.clone().unbind());
+        }
+        string.unbind()
+    }
+}
+
+/// Decodes a value straight into Python objects, with no tree in between.
+pub(crate) struct PySeed<'a, 'py> {
+    pub(crate) py: Python<'py>,
+    pub(crate) cache: &'a mut StrCache,
+}
+
+/// Decodes a dict key.
+struct KeySeed<'a, 'py> {
+    py: Python<'py>,
+    cache: &'a mut StrCache,
+}
+
+fn py_err<E: de::Error>(err: PyErr) -> E {
+    E::custom(err)
+}
+
+impl<'de> DeserializeSeed<'de> for PySeed<'_, '_> {
+    type Value = Py<PyAny>;
+
+    fn deserialize<D: Deserializer<'de>>(self, deserializer: D) -> Result<Self::Value, D::Error> {
+        deserializer.deserialize_any(self)
+    }
+}
+
+impl<'de> Visitor<'de> for PySeed<'_, '_> {
+    type Value = Py<PyAny>;
+
+    fn expecting(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        f.write_str("any JSON value")
+    }
+
+    fn visit_unit<E: de::Error>(self) -> Result<Self::Value, E> {
+        Ok(self.py.None())
+    }
+
+    fn visit_none<E: de::Error>(self) -> Result<Self::Value, E> {
+        Ok(self.py.None())
+    }
+
+    fn visit_some<D: Deserializer<'de>>(self, deserializer: D) -> Result<Self::Value, D::Error> {
+        deserializer.deserialize_any(self)
+    }
+
+    fn visit_bool<E: de::Error>(self, v: bool) -> Result<Self::Value, E> {
+        Ok(PyBool::new(self.py, v).to_owned().into_any().unbind())
+    }
+
+    fn visit_i64<E: de::Error>(self, v: i64) -> Result<Self::Value, E> {
+        Ok(PyInt::new(self.py, v).into_any().unbind())
+    }
+
+    fn visit_u64<E: de::Error>(self, v: u64) -> Result<Self::Value, E> {
+        Ok(PyInt::new(self.py, v).into_any().unbind())
+    }
+
+    fn visit_i128<E: de::Error>(self, v: i128) -> Result<Self::Value, E> {
+        v.into_py_any(self.py).map_err(py_err)
+    }
+
+    fn visit_u128<E: de::Error>(self, v: u128) -> Result<Self::Value, E> {
+        v.into_py_any(self.py).map_err(py_err)
+    }
+
+    fn visit_f64<E: de::Error>(self, v: f64) -> Result<Self::Value, E> {
+        Ok(PyFloat::new(self.py, v).into_any().unbind())
+    }
+
+    fn visit_str<E: de::Error>(self, v: &str) -> Result<Self::Value, E> {
+        Ok(self.cache.get(self.py, v, false).into_any())
+    }
+
+    fn visit_seq<A: SeqAccess<'de>>(self, mut seq: A) -> Result<Self::Value, A::Error> {
+        let list = PyList::empty(self.py);
+        while
+            let Some(item) = seq.next_element_seed(PySeed {
+                py: self.py,
+                cache: &mut *self.cache,
+            })?
+        {
+            list.append(item).map_err(py_err)?;
+        }
+        Ok(list.into_any().unbind())
+    }
+
+    fn visit_map<A: MapAccess<'de>>(self, mut map: A) -> Result<Self::Value, A::Error> {
+        let dict = PyDict::new(self.py);
+        while
+            let Some(key) = map.next_key_seed(KeySeed {
+                py: self.py,
+                cache: &mut *self.cache,
+            })?
+        {
+            let value = map.next_value_seed(PySeed { py: self.py, cache: &mut *self.cache })?;
+            dict.set_item(key, value).map_err(py_err)?;
+        }
+        Ok(dict.into_any().unbind())
+    }
+}
+
+impl<'de> DeserializeSeed<'de> for KeySeed<'_, '_> {
+    type Value = Py<PyString>;
+
+    fn deserialize<D: Deserializer<'de>>(self, deserializer: D) -> Result<Self::Value, D::Error> {
+        deserializer.deserialize_str(self)
+    }
+}
+
+impl<'de> Visitor<'de> for KeySeed<'_, '_> {
+    type Value = Py<PyString>;
+
+    fn expecting(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        f.write_str("a string key")
+    }
+
+    fn visit_str<E: de::Error>(self, v: &str) -> Result<Self::Value, E> {
+        Ok(self.cache.get(self.py, v, true))
+    }
+}
+
+fn decode_with<'de, D: Deserializer<'de>>(
+    py: Python,
+    cache: &mut StrCache,
+    deserializer: D
+) -> Result<Py<PyAny>, D::Error> {
+    PySeed { py, cache }.deserialize(deserializer)
+}
+
+/// Decodes strict JSON with `serde_json`; errors are labelled as from `backend`.
+fn decode_serde(
+    py: Python,
+    cache: &mut StrCache,
+    raw: &Raw,
+    backend: Backend
+) -> PyResult<Py<PyAny>> {
+    let load_error = |e: serde_json::Error| backend.load_error(&e);
+    match raw {
+        Raw::Str(s) => {
+            let mut de = serde_json::Deserializer::from_str(s);
+            let value = decode_with(py, cache, &mut de).map_err(load_error)?;
+            de.end().map_err(load_error)?;
+            Ok(value)
+        }
+        Raw::Bytes(b) => {
+            let mut de = serde_json::Deserializer::from_slice(b);
+            let value = decode_with(py, cache, &mut de).map_err(load_error)?;
+            de.end().map_err(load_error)?;
+            Ok(value)
+        }
+    }
+}
+
+/// Decodes JSON into Python objects, parsed by the `backend`.
+pub(crate) fn decode(
+    py: Python,
+    raw: &Raw,
+    backend: Backend,
+    cache_values: bool
+) -> PyResult<Py<PyAny>> {
+    let mut cache = StrCache::new(cache_values);
+    let load_error = |e: &dyn fmt::Debug| backend.load_error(e);
+
+    match backend {
+        Backend::Serde => decode_serde(py, &mut cache, raw, backend),
+        #[cfg(feature = "simd")]
+        Backend::Simd => {
+            // parses in place, so it needs a copy it may write to
+            let mut buf = raw.as_bytes().to_vec();
+            let mut de = simd_json::Deserializer::from_slice(&mut buf).map_err(|e| load_error(&e))?;
+            decode_with(py, &mut cache, &mut de).map_err(|e| load_error(&e))
+        }
+        #[cfg(not(feature = "simd"))]
+        Backend::Simd => unreachable!("checked in Backend::new()"),
+        Backend::Jsonc => {
+            let stripped = strip_jsonc(raw.as_bytes()).map_err(|e| load_error(&e))?;
+            decode_serde(py, &mut cache, &Raw::Bytes(&stripped.json), backend)
+        }
+        Backend::Json5 => decode_json5(py, &mut cache, raw, backend),
+        Backend::Loose => {
+            let stripped = strip_jsonc(raw.as_bytes()).map_err(|e| load_error(&e))?;
+            if stripped.json5 {
+                decode_json5(py, &mut cache, raw, backend)
+            } else {
+                decode_serde(py, &mut cache, &Raw::Bytes(&stripped.json), backend)
+            }
+        }
+    }
+}
+
+/// Decodes JSON5 with `serde_json5`; errors are labelled as from `backend`.
+fn decode_json5(
+    py: Python,
+    cache: &mut StrCache,
+    raw: &Raw,
+    backend: Backend
+) -> PyResult<Py<PyAny>> {
+    let load_error = |e: &dyn fmt::Debug| backend.load_error(e);
+    let json = match raw {
+        Raw::Str(s) => *s,
+        Raw::Bytes(b) => std::str::from_utf8(b).map_err(|e| load_error(&e))?,
+    };
+    let mut de = serde_json5::Deserializer::from_str(json).map_err(|e| load_error(&e))?;
+    decode_with(py, cache, &mut de).map_err(|e| load_error(&e))
+}
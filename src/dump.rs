@@ -1,10 +1,53 @@
-use std::collections::HashMap;
+use std::{ fmt, ptr };
 
-use rkyv::{ rancor, Archive, Serialize, Deserialize };
-use pyo3::{ exceptions, prelude::*, types::{ PyBytes, PyDict, PyList, PyNone } };
+use rkyv::{
+    munge::munge,
+    rancor::{ self, Source, Trace },
+    ser::{ Allocator, Positional, Writer },
+    string::{ ArchivedString, StringResolver },
+    util::AlignedVec,
+    vec::{ ArchivedVec, VecResolver },
+    Archive,
+    Deserialize,
+    Place,
+    Serialize,
+};
+use pyo3::{
+    exceptions,
+    ffi,
+    prelude::*,
+    types::{ PyBool, PyBytes, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple },
+};
 
+use crate::{ primitives::{ array_to_list, dataclass_fields }, schema::{ Document, Kind } };
+
+/// Bumped whenever the archived layout changes.
+pub(crate) const VERSION: u8 = 1;
+
+/// `b"exact"`, two reserved bytes, then the version. Keeps the archive
+/// that follows 8-byte aligned.
+pub(crate) const HEADER_LEN: usize = 8;
+const MAGIC: &[u8; 5] = b"exact";
+
+/// A model (or any supported data), archived in one go.
+///
+/// Never built: it only defines the archived layout, which `PyData` writes
+/// straight from Python objects.
+#[allow(dead_code)]
 #[derive(Archive, Serialize, Deserialize, PartialEq)]
-pub(crate) enum Model {
+#[rkyv(
+    serialize_bounds(
+        __S: rkyv::ser::Writer + rkyv::ser::Allocator,
+        __S::Error: rkyv::rancor::Source
+    )
+)]
+#[rkyv(deserialize_bounds(__D::Error: rkyv::rancor::Source))]
+#[rkyv(
+    bytecheck(
+        bounds(__C: rkyv::validation::ArchiveContext, __C::Error: rkyv::rancor::Source)
+    )
+)]
+pub(crate) enum Data {
     Str(String),
     Int(i64),
     Float(f64),
@@ -12,106 +55,510 @@ pub(crate) enum Model {
     Bytes(Vec<u8>),
     None,
 
-    List(Vec<Vec<u8>>),
-    Dict(HashMap<Vec<u8>, Vec<u8>>),
+    List(#[rkyv(omit_bounds)] Vec<Data>),
+    Dict(#[rkyv(omit_bounds)] Vec<(Data, Data)>),
 }
 
-impl Model {
-    fn from_bytes(py: Python, bytes: &[u8]) -> PyResult<AnyPy> {
-        let Ok(model) = rkyv::from_bytes::<Model, rancor::Error>(bytes) else {
-            return Err(
-                exceptions::PyRuntimeError::new_err("Failed to convert to model from bytes")
-            );
-        };
+/// Tags of `ArchivedData` (a `#[repr(u8)]` enum), in declaration order.
+mod tag {
+    pub(super) const STR: u8 = 0;
+    pub(super) const INT: u8 = 1;
+    pub(super) const FLOAT: u8 = 2;
+    pub(super) const BOOL: u8 = 3;
+    pub(super) const BYTES: u8 = 4;
+    pub(super) const NONE: u8 = 5;
+    pub(super) const LIST: u8 = 6;
+    pub(super) const DICT: u8 = 7;
+}
 
-        match model {
-            Self::Bool(b) => Ok(AnyPy::Bool(b)),
-            Self::Bytes(b) => Ok(AnyPy::Bytes(PyBytes::new(py, &b).unbind())),
-            Self::Dict(mut d) => {
-                let dict = PyDict::new(py);
+/// Layout of an `ArchivedData` variant with a value.
+#[repr(C)]
+struct Variant<T> {
+    tag: u8,
+    value: T,
+}
 
-                for (k, v) in d.drain() {
-                    dict.set_item(Model::from_bytes(py, &k)?, Model::from_bytes(py, &v)?)?;
-                }
+/// Layout of `ArchivedData::None`.
+#[repr(C)]
+struct Unit {
+    tag: u8,
+}
 
-                Ok(AnyPy::Dict(dict.unbind()))
-            }
-            Self::Float(float) => Ok(AnyPy::Float(float)),
-            Self::Int(int) => Ok(AnyPy::Int(int)),
-            Self::List(mut vec) => {
-                let list = PyList::empty(py);
-                for item in vec.drain(..) {
-                    list.append(Model::from_bytes(py, &item)?)?;
-                }
+/// A `PyErr` carried through rkyv, so it comes out as it went in.
+pub(crate) struct DumpError(PyErr);
 
-                Ok(AnyPy::List(list.unbind()))
-            }
-            Self::None => Ok(AnyPy::None(PyNone::get(py).extract::<Py<PyNone>>()?)),
-            Self::Str(string) => Ok(AnyPy::Str(string)),
-        }
+impl fmt::Debug for DumpError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        fmt::Debug::fmt(&self.0, f)
     }
 }
 
-#[derive(FromPyObject, IntoPyObject)]
-pub(crate) enum AnyPy {
-    List(Py<PyList>),
-    Dict(Py<PyDict>),
-    Str(String),
-    Bool(bool),
-    #[allow(dead_code)] None(Py<PyNone>),
+impl fmt::Display for DumpError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        fmt::Display::fmt(&self.0, f)
+    }
+}
+
+impl std::error::Error for DumpError {}
+
+impl Trace for DumpError {
+    fn trace<R>(self, _trace: R) -> Self where R: fmt::Debug + fmt::Display + Send + Sync + 'static {
+        self
+    }
+}
+
+impl Source for DumpError {
+    fn new<T: std::error::Error + Send + Sync + 'static>(source: T) -> Self {
+        Self(exceptions::PyRuntimeError::new_err(format!("Failed to convert to bytes:\n{}", source)))
+    }
+}
+
+impl From<PyErr> for DumpError {
+    fn from(e: PyErr) -> Self {
+        Self(e)
+    }
+}
+
+/// Python data (including dataclass instances), archived as `Data` straight
+/// from the objects. Containers are only read while they're serialized, so
+/// no `Data` tree (or copy of any string) is ever made.
+enum PyData<'a, 'py> {
+    Str(&'a str),
     Int(i64),
     Float(f64),
-    Bytes(Py<PyBytes>),
+    Bool(bool),
+    Bytes(&'a [u8]),
+    None,
+    /// Lists, tuples, and `field(as_array=True)` arrays (as lists).
+    List(Bound<'py, PyAny>),
+    Dict(&'a Bound<'py, PyDict>),
+    /// A dataclass instance, with its field names.
+    Dataclass(&'a Bound<'py, PyAny>, Vec<Bound<'py, PyString>>),
 }
 
-impl AnyPy {
-    fn into_model(self, py: Python) -> PyResult<Model> {
+impl<'a, 'py> PyData<'a, 'py> {
+    fn new(obj: &'a Bound<'py, PyAny>) -> PyResult<Self> {
+        if obj.is_none() {
+            return Ok(Self::None);
+        }
+        if let Ok(b) = obj.downcast::<PyBool>() {
+            return Ok(Self::Bool(b.is_true()));
+        }
+        if obj.is_instance_of::<PyInt>() {
+            return Ok(Self::Int(obj.extract()?));
+        }
+        if let Ok(float) = obj.downcast::<PyFloat>() {
+            return Ok(Self::Float(float.value()));
+        }
+        if let Ok(s) = obj.downcast::<PyString>() {
+            return Ok(Self::Str(s.to_str()?));
+        }
+        if let Ok(b) = obj.downcast::<PyBytes>() {
+            return Ok(Self::Bytes(b.as_bytes()));
+        }
+        if obj.is_instance_of::<PyList>() || obj.is_instance_of::<PyTuple>() {
+            return Ok(Self::List(obj.clone()));
+        }
+        if let Ok(dict) = obj.downcast::<PyDict>() {
+            return Ok(Self::Dict(dict));
+        }
+
+        // `field(as_array=True)`
+        if let Some(list) = array_to_list(obj)? {
+            return Ok(Self::List(list.into_any()));
+        }
+
+        // dataclasses: fields, in order
+        if let Some(fields) = dataclass_fields(obj)? {
+            return Ok(Self::Dataclass(obj, fields));
+        }
+
+        Err(
+            exceptions::PyTypeError::new_err(
+                format!("Cannot convert type {} to bytes", obj.get_type().name()?)
+            )
+        )
+    }
+}
+
+/// Everything `PyData::resolve()` needs, besides the value itself.
+enum PyDataResolver {
+    Str(StringResolver),
+    Bytes(VecResolver),
+    Scalar,
+    /// Length, and where the items are.
+    List(usize, VecResolver),
+    /// Length, and where the entries are.
+    Dict(usize, VecResolver),
+}
+
+impl Archive for PyData<'_, '_> {
+    type Archived = ArchivedData;
+    type Resolver = PyDataResolver;
+
+    fn resolve(&self, resolver: Self::Resolver, out: Place<Self::Archived>) {
+        // SAFETY (all casts): each variant of `ArchivedData` is laid out as a
+        // `#[repr(C)]` struct of its tag and fields
+        match (self, resolver) {
+            (Self::Str(s), PyDataResolver::Str(resolver)) => {
+                let out = unsafe { out.cast_unchecked::<Variant<ArchivedString>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::STR);
+                ArchivedString::resolve_from_str(s, resolver, value);
+            }
+            (Self::Bytes(b), PyDataResolver::Bytes(resolver)) => {
+                let out = unsafe { out.cast_unchecked::<Variant<ArchivedVec<u8>>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::BYTES);
+                ArchivedVec::resolve_from_len(b.len(), resolver, value);
+            }
+            (Self::Int(int), _) => {
+                let out = unsafe { out.cast_unchecked::<Variant<rkyv::Archived<i64>>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::INT);
+                int.resolve((), value);
+            }
+            (Self::Float(float), _) => {
+                let out = unsafe { out.cast_unchecked::<Variant<rkyv::Archived<f64>>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::FLOAT);
+                float.resolve((), value);
+            }
+            (Self::Bool(b), _) => {
+                let out = unsafe { out.cast_unchecked::<Variant<bool>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::BOOL);
+                b.resolve((), value);
+            }
+            (_, PyDataResolver::List(len, resolver)) => {
+                let out = unsafe { out.cast_unchecked::<Variant<ArchivedVec<ArchivedData>>>() };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::LIST);
+                ArchivedVec::resolve_from_len(len, resolver, value);
+            }
+            (_, PyDataResolver::Dict(len, resolver)) => {
+                let out = unsafe {
+                    out.cast_unchecked::<
+                        Variant<ArchivedVec<rkyv::tuple::ArchivedTuple2<ArchivedData, ArchivedData>>>
+                    >()
+                };
+                munge!(let Variant { tag, value } = out);
+                tag.write(tag::DICT);
+                ArchivedVec::resolve_from_len(len, resolver, value);
+            }
+            _ => {
+                let out = unsafe { out.cast_unchecked::<Unit>() };
+                munge!(let Unit { tag } = out);
+                tag.write(tag::NONE);
+            }
+        }
+    }
+}
+
+impl<S> Serialize<S> for PyData<'_, '_>
+    where S: rancor::Fallible<Error = DumpError> + Writer + Allocator + ?Sized
+{
+    fn serialize(&self, serializer: &mut S) -> Result<Self::Resolver, DumpError> {
         match self {
-            Self::Bool(b) => Ok(Model::Bool(b)),
-            Self::Dict(d) => {
-                let mut hm = HashMap::new();
-                for (key, value) in d.bind(py).iter() {
-                    let k = key.extract::<AnyPy>()?;
-                    let v = value.extract::<AnyPy>()?;
-                    hm.insert(k.into_bytes(py)?, v.into_bytes(py)?);
+            Self::Str(s) => {
+                Ok(PyDataResolver::Str(ArchivedString::serialize_from_str(s, serializer)?))
+            }
+            Self::Bytes(b) => {
+                Ok(PyDataResolver::Bytes(ArchivedVec::serialize_from_slice(b, serializer)?))
+            }
+            Self::Int(_) | Self::Float(_) | Self::Bool(_) | Self::None => {
+                Ok(PyDataResolver::Scalar)
+            }
+            Self::List(seq) => {
+                // held, so the items outlive their `PyData`
+                let items: Vec<Bound<'_, PyAny>> = match seq.downcast::<PyList>() {
+                    Ok(list) => list.iter().collect(),
+                    Err(_) => seq.downcast::<PyTuple>().map_err(PyErr::from)?.iter().collect(),
+                };
+                let mut data = Vec::with_capacity(items.len());
+                for item in items.iter() {
+                    data.push(PyData::new(item)?);
                 }
-
-                Ok(Model::Dict(hm))
+                let resolver = ArchivedVec::serialize_from_slice(&data, serializer)?;
+                Ok(PyDataResolver::List(data.len(), resolver))
             }
-            Self::Bytes(bytes) => {
-                let b = bytes.bind(py).extract::<Vec<u8>>()?;
-                Ok(Model::Bytes(b))
+            Self::Dict(dict) => {
+                let items: Vec<(Bound<'_, PyAny>, Bound<'_, PyAny>)> = dict.iter().collect();
+                let mut data = Vec::with_capacity(items.len());
+                for (k, v) in items.iter() {
+                    data.push((PyData::new(k)?, PyData::new(v)?));
+                }
+                let resolver = ArchivedVec::serialize_from_slice(&data, serializer)?;
+                Ok(PyDataResolver::Dict(data.len(), resolver))
             }
-            Self::Float(float) => { Ok(Model::Float(float)) }
-            Self::Int(int) => { Ok(Model::Int(int)) }
-            Self::List(list) => {
-                let mut v = Vec::new();
-                for item in list.bind(py) {
-                    v.push(item.extract::<AnyPy>()?.into_bytes(py)?);
+            Self::Dataclass(obj, fields) => {
+                let mut values = Vec::with_capacity(fields.len());
+                for name in fields.iter() {
+                    values.push(obj.getattr(name)?);
                 }
-
-                Ok(Model::List(v))
+                let mut data = Vec::with_capacity(fields.len());
+                for (name, value) in fields.iter().zip(values.iter()) {
+                    data.push((PyData::Str(name.to_str()?), PyData::new(value)?));
+                }
+                let resolver = ArchivedVec::serialize_from_slice(&data, serializer)?;
+                Ok(PyDataResolver::Dict(data.len(), resolver))
             }
-            Self::None(_) => { Ok(Model::None) }
-            Self::Str(string) => { Ok(Model::Str(string)) }
         }
     }
+}
+
+/// Archives `obj` through `writer`.
+fn archive_with<W: Writer<DumpError>>(obj: &Bound<'_, PyAny>, writer: W) -> PyResult<W> {
+    rkyv::api::high::to_bytes_in::<_, DumpError>(&PyData::new(obj)?, writer).map_err(|e| e.0)
+}
+
+/// Appends to a buffer, with positions counted from where the archive starts.
+struct TailWriter<'a> {
+    buf: &'a mut Vec<u8>,
+    start: usize,
+}
+
+impl Positional for TailWriter<'_> {
+    fn pos(&self) -> usize {
+        self.buf.len() - self.start
+    }
+}
+
+impl<E> Writer<E> for TailWriter<'_> {
+    fn write(&mut self, bytes: &[u8]) -> Result<(), E> {
+        self.buf.extend_from_slice(bytes);
+        Ok(())
+    }
+}
+
+/// Archives `obj` (without the header) at the end of `buf`, and returns how
+/// long the archive is.
+pub(crate) fn archive_into(obj: &Bound<'_, PyAny>, buf: &mut Vec<u8>) -> PyResult<usize> {
+    let start = buf.len();
+    archive_with(obj, TailWriter { buf: &mut *buf, start })?;
+    Ok(buf.len() - start)
+}
+
+/// Writes the header, then the archive, straight into a `bytes` object,
+/// growing it as needed (it isn't shared until it's done).
+struct BytesWriter<'py> {
+    py: Python<'py>,
+    /// Owned; null only after a failed resize.
+    bytes: *mut ffi::PyObject,
+    /// Bytes written so far, header included.
+    len: usize,
+    cap: usize,
+}
+
+impl<'py> BytesWriter<'py> {
+    fn new(py: Python<'py>, cap: usize) -> PyResult<Self> {
+        let bytes = PyBytes::new_with(py, cap, |buf| {
+            write_header(buf);
+            Ok(())
+        })?;
+        Ok(Self { py, bytes: bytes.into_ptr(), len: HEADER_LEN, cap })
+    }
+
+    fn resize(&mut self, len: usize) -> PyResult<()> {
+        // SAFETY: the object is owned here and not shared (refcount 1)
+        if unsafe { ffi::_PyBytes_Resize(&mut self.bytes, len as ffi::Py_ssize_t) } != 0 {
+            return Err(PyErr::fetch(self.py));
+        }
+        self.cap = len;
+        Ok(())
+    }
+
+    fn finish(mut self) -> PyResult<Bound<'py, PyBytes>> {
+        let len = self.len;
+        self.resize(len)?;
+        let bytes = std::mem::replace(&mut self.bytes, ptr::null_mut());
+        // SAFETY: an owned `bytes` object
+        Ok(unsafe { Bound::from_owned_ptr(self.py, bytes).downcast_into_unchecked() })
+    }
+}
+
+impl Positional for BytesWriter<'_> {
+    fn pos(&self) -> usize {
+        self.len - HEADER_LEN
+    }
+}
+
+impl<E: Source> Writer<E> for BytesWriter<'_> {
+    fn write(&mut self, bytes: &[u8]) -> Result<(), E> {
+        let end = self.len + bytes.len();
+        if end > self.cap {
+            self.resize(end.max(self.cap * 2)).map_err(E::new)?;
+        }
+        // SAFETY: in bounds after the resize
+        unsafe {
+            let buf = ffi::PyBytes_AsString(self.bytes) as *mut u8;
+            ptr::copy_nonoverlapping(bytes.as_ptr(), buf.add(self.len), bytes.len());
+        }
+        self.len = end;
+        Ok(())
+    }
+}
+
+impl Drop for BytesWriter<'_> {
+    fn drop(&mut self) {
+        if !self.bytes.is_null() {
+            // SAFETY: still owned, and the GIL is held
+            unsafe { ffi::Py_DECREF(self.bytes) };
+        }
+    }
+}
+
+/// A validated archive, borrowed when the input is aligned (copied otherwise).
+pub(crate) struct Archive<'a> {
+    owned: Option<AlignedVec>,
+    bytes: &'a [u8],
+}
+
+impl<'a> Archive<'a> {
+    pub(crate) fn new(bytes: &'a [u8]) -> PyResult<Self> {
+        if
+            bytes.len() < HEADER_LEN ||
+            &bytes[..MAGIC.len()] != MAGIC ||
+            bytes[HEADER_LEN - 1] != VERSION
+        {
+            return Err(
+                exceptions::PyValueError::new_err(
+                    format!("Unsupported bytes format (expected version {})", VERSION)
+                )
+            );
+        }
 
-    fn into_bytes(self, py: Python) -> PyResult<Vec<u8>> {
-        let Ok(d) = rkyv::to_bytes::<rancor::Error>(&self.into_model(py)?) else {
-            return Err(exceptions::PyRuntimeError::new_err("Failed to convert to bytes"));
+        let payload = &bytes[HEADER_LEN..];
+        let archive = if (payload.as_ptr() as usize) % std::mem::align_of::<ArchivedData>() == 0 {
+            Self { owned: None, bytes: payload }
+        } else {
+            let mut owned = AlignedVec::with_capacity(payload.len());
+            owned.extend_from_slice(payload);
+            Self { owned: Some(owned), bytes: payload }
         };
 
-        Ok(d.into())
+        if let Err(e) = rkyv::access::<ArchivedData, rancor::Error>(archive.slice()) {
+            return Err(
+                exceptions::PyRuntimeError::new_err(
+                    format!("Failed to convert to model from bytes:\n{}", e)
+                )
+            );
+        }
+
+        Ok(archive)
+    }
+
+    fn slice(&self) -> &[u8] {
+        match &self.owned {
+            Some(owned) => owned.as_slice(),
+            None => self.bytes,
+        }
     }
+
+    pub(crate) fn get(&self) -> &ArchivedData {
+        // SAFETY: validated in `new()`
+        unsafe { rkyv::access_unchecked::<ArchivedData>(self.slice()) }
+    }
+}
+
+impl Document for ArchivedData {
+    type Key = ArchivedData;
+
+    fn kind(&self) -> Kind {
+        match self {
+            Self::Str(_) => Kind::Str,
+            Self::Int(_) => Kind::Int,
+            Self::Float(_) => Kind::Float,
+            Self::Bool(_) => Kind::Bool,
+            Self::Bytes(_) => Kind::Bytes,
+            Self::None => Kind::Null,
+            Self::List(_) => Kind::List,
+            Self::Dict(_) => Kind::Dict,
+        }
+    }
+
+    fn as_bool(&self) -> Option<bool> {
+        if let Self::Bool(b) = self { Some(*b) } else { None }
+    }
+
+    fn as_i64(&self) -> Option<i64> {
+        if let Self::Int(int) = self { Some(int.to_native()) } else { None }
+    }
+
+    fn as_f64(&self) -> Option<f64> {
+        match self {
+            Self::Int(int) => Some(int.to_native() as f64),
+            Self::Float(float) => Some(float.to_native()),
+            _ => None,
+        }
+    }
+
+    fn as_str(&self) -> Option<&str> {
+        if let Self::Str(string) = self { Some(string.as_str()) } else { None }
+    }
+
+    fn items(&self) -> &[Self] {
+        if let Self::List(items) = self { items.as_slice() } else { &[] }
+    }
+
+    fn entries<'a>(
+        &'a self
+    ) -> Box<dyn Iterator<Item = (&'a ArchivedData, &'a ArchivedData)> + 'a> {
+        match self {
+            Self::Dict(entries) => Box::new(entries.iter().map(|entry| (&entry.0, &entry.1))),
+            _ => Box::new(std::iter::empty()),
+        }
+    }
+
+    fn field(&self, name: &str) -> Option<&Self> {
+        let Self::Dict(entries) = self else {
+            return None;
+        };
+        entries
+            .iter()
+            .find(|entry| entry.0.as_str() == Some(name))
+            .map(|entry| &entry.1)
+    }
+
+    fn to_py(&self, py: Python) -> PyResult<Py<PyAny>> {
+        match self {
+            Self::Str(string) => Ok(PyString::new(py, string.as_str()).unbind().into()),
+            Self::Int(int) => Ok(PyInt::new(py, int.to_native()).unbind().into()),
+            Self::Float(float) => Ok(PyFloat::new(py, float.to_native()).unbind().into()),
+            Self::Bool(b) => Ok(PyBool::new(py, *b).to_owned().into_any().unbind()),
+            Self::Bytes(b) => Ok(PyBytes::new(py, b.as_slice()).unbind().into()),
+            Self::None => Ok(py.None()),
+            Self::List(items) => {
+                let list = PyList::empty(py);
+                for item in items.iter() {
+                    list.append(item.to_py(py)?)?;
+                }
+                Ok(list.unbind().into())
+            }
+            Self::Dict(entries) => {
+                let dict = PyDict::new(py);
+                for entry in entries.iter() {
+                    dict.set_item(entry.0.to_py(py)?, entry.1.to_py(py)?)?;
+                }
+                Ok(dict.unbind().into())
+            }
+        }
+    }
+}
+
+pub(crate) fn write_header(buf: &mut [u8]) {
+    buf[..MAGIC.len()].copy_from_slice(MAGIC);
+    buf[MAGIC.len()..HEADER_LEN - 1].fill(0);
+    buf[HEADER_LEN - 1] = VERSION;
 }
 
 #[pyfunction]
-pub(crate) fn py_to_bytes(py: Python, data: AnyPy) -> PyResult<Py<PyBytes>> {
-    Ok(PyBytes::new(py, &data.into_bytes(py)?).unbind())
+pub(crate) fn py_to_bytes(py: Python, data: &Bound<'_, PyAny>) -> PyResult<Py<PyBytes>> {
+    let writer = archive_with(data, BytesWriter::new(py, 256)?)?;
+    Ok(writer.finish()?.unbind())
 }
 
 #[pyfunction]
-pub(crate) fn bytes_to_py(py: Python, bytes: &[u8]) -> PyResult<AnyPy> {
-    Model::from_bytes(py, bytes)
+pub(crate) fn bytes_to_py(py: Python, bytes: &[u8]) -> PyResult<Py<PyAny>> {
+    Archive::new(bytes)?.get().to_py(py)
 }
@@ -1,46 +1,299 @@
+use std::borrow::Cow;
+
 use pyo3::{
     exceptions,
     prelude::*,
     types::{ PyBool, PyDict, PyFloat, PyInt, PyList, PyNone, PyString },
 };
 
-use ijson::{ IValue, ValueType };
+use ijson::{ IString, IValue, ValueType };
 
-#[pyfunction]
-pub(crate) fn json_to_py(py: Python, json: &str) -> PyResult<Py<PyAny>> {
-    let value = match serde_json::from_str::<IValue>(json) {
-        Ok(d) => d,
-        Err(e) => {
-            return Err(
-                exceptions::PyRuntimeError::new_err(format!("Failed to load JSON:\n{:#?}", e))
-            );
+use crate::{ batch::{ Input, Raw }, decode::decode, schema::{ Document, Kind } };
+
+/// How JSON documents get parsed.
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+pub(crate) enum Backend {
+    /// `serde_json`, for strict JSON.
+    Serde,
+    /// `simd-json`, for strict JSON.
+    Simd,
+    /// Comments and trailing commas blanked out in a pre-pass, then `serde_json`.
+    Jsonc,
+    /// `serde_json5`: comments, trailing commas, unquoted keys, single
+    /// quotes and the rest of JSON5.
+    Json5,
+    /// `Jsonc`, or `Json5` if the document uses anything only JSON5 allows
+    /// (found in the same pre-pass). Used for `strict=False`.
+    Loose,
+}
+
+impl Backend {
+    /// `backend` by name, if given; otherwise, depending on `strict`.
+    pub(crate) fn new(strict: bool, backend: Option<&str>) -> PyResult<Self> {
+        Ok(match backend {
+            None => if strict { Self::Serde } else { Self::Loose },
+            Some("serde") => Self::Serde,
+            Some("simd") => {
+                if !cfg!(feature = "simd") {
+                    return Err(
+                        exceptions::PyValueError::new_err(
+                            "The 'simd' backend isn't available in this build"
+                        )
+                    );
+                }
+                Self::Simd
+            }
+            Some("jsonc") => Self::Jsonc,
+            Some("json5") => Self::Json5,
+            Some(name) => {
+                return Err(
+                    exceptions::PyValueError::new_err(
+                        format!(
+                            "Unknown JSON backend {:?}, expected 'serde', 'simd', 'jsonc' or 'json5'",
+                            name
+                        )
+                    )
+                );
+            }
+        })
+    }
+
+    pub(crate) fn load_error(self, e: &dyn std::fmt::Debug) -> PyErr {
+        let what = match self {
+            Self::Serde | Self::Simd => "JSON",
+            Self::Jsonc | Self::Json5 | Self::Loose => "JSONC",
+        };
+        exceptions::PyRuntimeError::new_err(format!("Failed to load {}:\n{:#?}", what, e))
+    }
+}
+
+/// Skips whitespace and comments from `idx` on, giving the index of the next
+/// meaningful byte (or the end). Fails with where an unterminated block
+/// comment starts.
+fn skip_blank(input: &[u8], mut idx: usize) -> Result<usize, usize> {
+    while idx < input.len() {
+        match input[idx] {
+            b' ' | b'\t' | b'\n' | b'\r' => {
+                idx += 1;
+            }
+            b'/' if input.get(idx + 1) == Some(&b'/') => {
+                while idx < input.len() && input[idx] != b'\n' {
+                    idx += 1;
+                }
+            }
+            b'/' if input.get(idx + 1) == Some(&b'*') => {
+                match find(&input[idx + 2..], b"*/") {
+                    Some(end) => {
+                        idx += end + 4;
+                    }
+                    None => {
+                        return Err(idx);
+                    }
+                }
+            }
+            _ => {
+                return Ok(idx);
+            }
+        }
+    }
+    Ok(idx)
+}
+
+fn find(haystack: &[u8], needle: &[u8]) -> Option<usize> {
+    haystack.windows(needle.len()).position(|window| window == needle)
+}
+
+/// Whether `token` (a run of letters, digits and `_$.+-` outside strings)
+/// is only valid in JSON5, like unquoted keys, `Infinity` or hex numbers.
+fn is_json5_token(token: &[u8]) -> bool {
+    match token {
+        b"true" | b"false" | b"null" => false,
+        [b'-', rest @ ..] => rest.first().map_or(true, |b| !b.is_ascii_digit()) || is_json5_number(rest),
+        [first, ..] if first.is_ascii_digit() => is_json5_number(token),
+        _ => true,
+    }
+}
+
+fn is_json5_number(number: &[u8]) -> bool {
+    number.iter().any(|b| matches!(b, b'x' | b'X')) || number.last() == Some(&b'.')
+}
+
+/// JSONC made readable by a strict parser (see `strip_jsonc()`).
+pub(crate) struct Stripped<'a> {
+    pub(crate) json: Cow<'a, [u8]>,
+    /// Whether there's anything only JSON5 allows, which no strict parser
+    /// will read.
+    pub(crate) json5: bool,
+}
+
+/// Blanks out comments and trailing commas with spaces, so a strict parser
+/// can read JSONC. Everything else stays where it was, so error positions
+/// still match the input. Only copies if there's something to blank out.
+pub(crate) fn strip_jsonc(input: &[u8]) -> Result<Stripped<'_>, String> {
+    let mut out: Option<Vec<u8>> = None;
+    let mut json5 = false;
+    let mut blank = |start: usize, end: usize| {
+        let out = out.get_or_insert_with(|| input.to_vec());
+        for byte in out[start..end].iter_mut() {
+            // keep line breaks, for error positions
+            if *byte != b'\n' {
+                *byte = b' ';
+            }
         }
     };
-    ivalue_to_py(py, value)
+    let unterminated = |start: usize| {
+        let line = input[..start].iter().filter(|b| **b == b'\n').count() + 1;
+        let column = start - input[..start].iter().rposition(|b| *b == b'\n').map_or(0, |i| i + 1) + 1;
+        format!("Unterminated block comment at line {} column {}", line, column)
+    };
+
+    let mut idx = 0;
+    while idx < input.len() {
+        match input[idx] {
+            b'"' => {
+                // skip the string, escapes included
+                idx += 1;
+                while idx < input.len() && input[idx] != b'"' {
+                    idx += if input[idx] == b'\\' { 2 } else { 1 };
+                }
+                idx += 1;
+            }
+            b'\'' => {
+                // a single-quoted string; JSON5 only, so it's all up to that parser
+                json5 = true;
+                idx += 1;
+                while idx < input.len() && input[idx] != b'\'' {
+                    idx += if input[idx] == b'\\' { 2 } else { 1 };
+                }
+                idx += 1;
+            }
+            b'/' => {
+                let end = skip_blank(input, idx).map_err(unterminated)?;
+                if end == idx {
+                    // a lone slash; the parser will complain
+                    idx += 1;
+                } else {
+                    blank(idx, end);
+                    idx = end;
+                }
+            }
+            b',' => {
+                let next = skip_blank(input, idx + 1).map_err(unterminated)?;
+                if matches!(input.get(next), Some(b'}') | Some(b']')) {
+                    blank(idx, idx + 1);
+                }
+                idx += 1;
+            }
+            b if b.is_ascii_alphanumeric() || matches!(b, b'_' | b'$' | b'.' | b'+' | b'-') => {
+                let start = idx;
+                while
+                    idx < input.len() &&
+                    (input[idx].is_ascii_alphanumeric() ||
+                        matches!(input[idx], b'_' | b'$' | b'.' | b'+' | b'-'))
+                {
+                    idx += 1;
+                }
+                json5 |= is_json5_token(&input[start..idx]);
+            }
+            0x80.. => {
+                // non-ASCII identifiers, also JSON5 only
+                json5 = true;
+                idx += 1;
+            }
+            _ => {
+                idx += 1;
+            }
+        }
+    }
+
+    Ok(Stripped {
+        json: match out {
+            Some(out) => Cow::Owned(out),
+            None => Cow::Borrowed(input),
+        },
+        json5,
+    })
 }
 
-#[pyfunction]
-pub(crate) fn jsonc_to_py(py: Python, json: &str) -> PyResult<Py<PyAny>> {
-    let value = match serde_json5::from_str::<IValue>(json) {
-        Ok(d) => d,
-        Err(e) => {
-            return Err(
-                exceptions::PyRuntimeError::new_err(format!("Failed to load JSONC:\n{:#?}", e))
-            );
+fn parse_serde(raw: &Raw, backend: Backend) -> PyResult<IValue> {
+    (
+        match raw {
+            Raw::Str(s) => serde_json::from_str::<IValue>(s),
+            Raw::Bytes(b) => serde_json::from_slice::<IValue>(b),
         }
+    ).map_err(|e| backend.load_error(&e))
+}
+
+fn parse_json5(raw: &Raw, backend: Backend) -> PyResult<IValue> {
+    let json = match raw {
+        Raw::Str(s) => *s,
+        Raw::Bytes(b) => std::str::from_utf8(b).map_err(|e| backend.load_error(&e))?,
     };
-    ivalue_to_py(py, value)
+    serde_json5::from_str::<IValue>(json).map_err(|e| backend.load_error(&e))
 }
 
-fn ivalue_to_py(py: Python, value: IValue) -> PyResult<Py<PyAny>> {
+pub(crate) fn parse_raw(raw: &Raw, backend: Backend) -> PyResult<IValue> {
+    match backend {
+        Backend::Serde => parse_serde(raw, backend),
+        #[cfg(feature = "simd")]
+        Backend::Simd => {
+            // parses in place, so it needs a copy it may write to
+            let mut buf = raw.as_bytes().to_vec();
+            simd_json::serde::from_slice::<IValue>(&mut buf).map_err(|e| backend.load_error(&e))
+        }
+        #[cfg(not(feature = "simd"))]
+        Backend::Simd => unreachable!("checked in Backend::new()"),
+        Backend::Jsonc => {
+            let stripped = strip_jsonc(raw.as_bytes()).map_err(|e| backend.load_error(&e))?;
+            parse_serde(&Raw::Bytes(&stripped.json), backend)
+        }
+        Backend::Json5 => parse_json5(raw, backend),
+        Backend::Loose => {
+            let stripped = strip_jsonc(raw.as_bytes()).map_err(|e| backend.load_error(&e))?;
+            if stripped.json5 {
+                parse_json5(raw, backend)
+            } else {
+                parse_serde(&Raw::Bytes(&stripped.json), backend)
+            }
+        }
+    }
+}
+
+#[pyfunction]
+#[pyo3(signature = (json, cache_values = false, backend = None))]
+pub(crate) fn json_to_py(
+    py: Python,
+    json: &Bound<'_, PyAny>,
+    cache_values: bool,
+    backend: Option<&str>
+) -> PyResult<Py<PyAny>> {
+    let backend = Backend::new(true, backend)?;
+    let input = Input::new(json)?;
+    decode(py, &input.raw()?, backend, cache_values)
+}
+
+#[pyfunction]
+#[pyo3(signature = (json, cache_values = false, backend = None))]
+pub(crate) fn jsonc_to_py(
+    py: Python,
+    json: &Bound<'_, PyAny>,
+    cache_values: bool,
+    backend: Option<&str>
+) -> PyResult<Py<PyAny>> {
+    let backend = Backend::new(false, backend)?;
+    let input = Input::new(json)?;
+    decode(py, &input.raw()?, backend, cache_values)
+}
+
+pub(crate) fn ivalue_to_py(py: Python, value: &IValue) -> PyResult<Py<PyAny>> {
     match value.type_() {
         ValueType::Array => {
             let list = PyList::empty(py);
-            let Ok(array) = value.into_array() else {
+            let Some(array) = value.as_array() else {
                 return Err(exceptions::PyRuntimeError::new_err("Failed to convert into array"));
             };
 
-            for item in array {
+            for item in array.iter() {
                 let value = ivalue_to_py(py, item)?;
                 list.append(value)?;
             }
@@ -56,33 +309,138 @@ fn ivalue_to_py(py: Python, value: IValue) -> PyResult<Py<PyAny>> {
             Ok(unsafe { Py::from_borrowed_ptr_or_opt(py, none.as_ptr()).unwrap() })
         }
         ValueType::Number => {
-            let Ok(number) = value.into_number() else {
+            let Some(number) = value.as_number() else {
                 return Err(exceptions::PyRuntimeError::new_err("Failed to convert into number"));
             };
 
             if number.has_decimal_point() {
-                Ok(PyFloat::new(py, number.to_f64().unwrap()).unbind().into())
+                Ok(PyFloat::new(py, number.to_f64_lossy()).unbind().into())
+            } else if let Some(n) = number.to_i64() {
+                Ok(PyInt::new(py, n).unbind().into())
+            } else if let Some(n) = number.to_u64() {
+                Ok(PyInt::new(py, n).unbind().into())
             } else {
-                Ok(PyInt::new(py, number.to_i64().unwrap()).unbind().into())
+                // wider than 64 bits; Python parses the digits into a big int
+                let digits = format!("{}", number.to_f64_lossy());
+                Ok(py.get_type::<PyInt>().call1((digits,))?.unbind())
             }
         }
         ValueType::Object => {
-            let Ok(object) = value.into_object() else {
+            let Some(object) = value.as_object() else {
                 return Err(exceptions::PyRuntimeError::new_err("Failed to convert into object"));
             };
 
             let dict = PyDict::new(py);
-            for (key, value) in object {
+            for (key, value) in object.iter() {
                 dict.set_item(key.as_str(), ivalue_to_py(py, value)?)?;
             }
 
             Ok(dict.unbind().into())
         }
         ValueType::String => {
-            let Ok(s) = value.into_string() else {
+            let Some(s) = value.as_string() else {
                 return Err(exceptions::PyRuntimeError::new_err("Failed to convert into string"));
             };
             Ok(PyString::new(py, s.as_str()).unbind().into())
         }
     }
 }
+
+impl Document for IValue {
+    type Key = IString;
+
+    fn kind(&self) -> Kind {
+        match self.type_() {
+            ValueType::Null => Kind::Null,
+            ValueType::Bool => Kind::Bool,
+            ValueType::Number => {
+                if self.as_number().map(|n| n.has_decimal_point()).unwrap_or(false) {
+                    Kind::Float
+                } else {
+                    Kind::Int
+                }
+            }
+            ValueType::String => Kind::Str,
+            ValueType::Array => Kind::List,
+            ValueType::Object => Kind::Dict,
+        }
+    }
+
+    fn as_bool(&self) -> Option<bool> {
+        self.to_bool()
+    }
+
+    fn as_i64(&self) -> Option<i64> {
+        self.as_number().and_then(|n| n.to_i64())
+    }
+
+    fn as_f64(&self) -> Option<f64> {
+        self.as_number().and_then(|n| n.to_f64())
+    }
+
+    fn as_str(&self) -> Option<&str> {
+        self.as_string().map(|s| s.as_str())
+    }
+
+    fn items(&self) -> &[Self] {
+        match self.as_array() {
+            Some(array) => array.as_slice(),
+            None => &[],
+        }
+    }
+
+    fn entries<'a>(&'a self) -> Box<dyn Iterator<Item = (&'a IString, &'a IValue)> + 'a> {
+        match self.as_object() {
+            Some(object) => Box::new(object.iter()),
+            None => Box::new(std::iter::empty()),
+        }
+    }
+
+    fn field(&self, name: &str) -> Option<&Self> {
+        self.as_object().and_then(|object| object.get(name))
+    }
+
+    fn to_py(&self, py: Python) -> PyResult<Py<PyAny>> {
+        ivalue_to_py(py, self)
+    }
+}
+
+impl Document for IString {
+    type Key = IString;
+
+    fn kind(&self) -> Kind {
+        Kind::Str
+    }
+
+    fn as_bool(&self) -> Option<bool> {
+        None
+    }
+
+    fn as_i64(&self) -> Option<i64> {
+        None
+    }
+
+    fn as_f64(&self) -> Option<f64> {
+        None
+    }
+
+    fn as_str(&self) -> Option<&str> {
+        Some(IString::as_str(self))
+    }
+
+    fn items(&self) -> &[Self] {
+        &[]
+    }
+
+    fn entries<'a>(&'a self) -> Box<dyn Iterator<Item = (&'a IString, &'a IString)> + 'a> {
+        Box::new(std::iter::empty())
+    }
+
+    fn field(&self, _name: &str) -> Option<&Self> {
+        None
+    }
+
+    fn to_py(&self, py: Python) -> PyResult<Py<PyAny>> {
+        Ok(PyString::new(py, IString::as_str(self)).unbind().into())
+    }
+}
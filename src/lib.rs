@@ -1,8 +1,15 @@
 use pyo3::prelude::*;
 
+mod archive;
+mod batch;
+mod decode;
 mod json;
+mod primitives;
 mod regex;
 mod dump;
+mod schema;
+mod ser;
+mod stream;
 
 #[pymodule]
 fn exacting(m: &Bound<'_, PyModule>) -> PyResult<()> {
@@ -10,7 +17,16 @@ fn exacting(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(json::jsonc_to_py, m)?)?;
     m.add_function(wrap_pyfunction!(dump::py_to_bytes, m)?)?;
     m.add_function(wrap_pyfunction!(dump::bytes_to_py, m)?)?;
+    m.add_function(wrap_pyfunction!(archive::write_archive, m)?)?;
+    m.add_function(wrap_pyfunction!(primitives::find_invalid_item, m)?)?;
+    m.add_function(wrap_pyfunction!(primitives::find_invalid_entry, m)?)?;
 
     m.add_class::<regex::PyRegex>()?;
+    m.add_class::<regex::PyRegexSet>()?;
+    m.add_class::<schema::PySchema>()?;
+    m.add_class::<stream::PyJsonStream>()?;
+    m.add_class::<archive::PyArchiveFile>()?;
+    m.add_class::<archive::PyArchiveIter>()?;
+    m.add_class::<archive::PyArchiveView>()?;
     Ok(())
 }
@@ -0,0 +1,143 @@
+use pyo3::{
+    exceptions,
+    ffi,
+    intern,
+    prelude::*,
+    sync::GILOnceCell,
+    types::{ PyDict, PyList, PyString, PyType },
+};
+
+static ARRAY: GILOnceCell<Py<PyType>> = GILOnceCell::new();
+static FIELD: GILOnceCell<Py<PyAny>> = GILOnceCell::new();
+
+const INT: u8 = 1 << 0;
+const FLOAT: u8 = 1 << 1;
+const BOOL: u8 = 1 << 2;
+const STR: u8 = 1 << 3;
+const BYTES: u8 = 1 << 4;
+const NONE: u8 = 1 << 5;
+
+/// A set of built-in types whose values are checked with a type check each,
+/// like `"str"` or `"int|float|none"`.
+#[derive(Clone, Copy)]
+pub(crate) struct Kinds(u8);
+
+impl Kinds {
+    pub(crate) fn from_spec(spec: &str) -> PyResult<Self> {
+        let mut bits = 0;
+        for name in spec.split('|') {
+            bits |= match name {
+                "int" => INT,
+                "float" => FLOAT,
+                "bool" => BOOL,
+                "str" => STR,
+                "bytes" => BYTES,
+                "none" => NONE,
+                _ => {
+                    return Err(
+                        exceptions::PyValueError::new_err(format!("Unknown primitive: {:?}", name))
+                    );
+                }
+            };
+        }
+        Ok(Self(bits))
+    }
+
+    /// Same as `isinstance(obj, (<types>))` (so `bool` counts as `int`).
+    ///
+    /// # Safety
+    /// `obj` must point to a live object, and the GIL must be held.
+    #[inline]
+    unsafe fn matches(self, obj: *mut ffi::PyObject) -> bool {
+        let bits = self.0;
+        // the most common kinds first
+        (bits & STR != 0 && ffi::PyUnicode_Check(obj) != 0) ||
+            (bits & INT != 0 && ffi::PyLong_Check(obj) != 0) ||
+            (bits & FLOAT != 0 && ffi::PyFloat_Check(obj) != 0) ||
+            (bits & BOOL != 0 && ffi::PyBool_Check(obj) != 0) ||
+            (bits & NONE != 0 && obj == ffi::Py_None()) ||
+            (bits & BYTES != 0 && ffi::PyBytes_Check(obj) != 0)
+    }
+}
+
+// type checks never run Python code, so the containers below can't change
+// while they're walked
+
+/// Index of the first item of `list` that isn't of the `kinds`, or `None` if
+/// they all are.
+#[pyfunction]
+pub(crate) fn find_invalid_item(list: &Bound<'_, PyList>, kinds: &str) -> PyResult<Option<usize>> {
+    let kinds = Kinds::from_spec(kinds)?;
+    let ptr = list.as_ptr();
+
+    let len = unsafe { ffi::PyList_GET_SIZE(ptr) };
+    for idx in 0..len {
+        let item = unsafe { ffi::PyList_GET_ITEM(ptr, idx) };
+        if !unsafe { kinds.matches(item) } {
+            return Ok(Some(idx as usize));
+        }
+    }
+
+    Ok(None)
+}
+
+/// Index (in iteration order) of the first entry of `dict` with a key that
+/// isn't of the `key_kinds` or a value that isn't of the `value_kinds`, or
+/// `None` if they all are.
+#[pyfunction]
+pub(crate) fn find_invalid_entry(
+    dict: &Bound<'_, PyDict>,
+    key_kinds: &str,
+    value_kinds: &str
+) -> PyResult<Option<usize>> {
+    let key_kinds = Kinds::from_spec(key_kinds)?;
+    let value_kinds = Kinds::from_spec(value_kinds)?;
+    let ptr = dict.as_ptr();
+
+    let mut pos: ffi::Py_ssize_t = 0;
+    let mut key: *mut ffi::PyObject = std::ptr::null_mut();
+    let mut value: *mut ffi::PyObject = std::ptr::null_mut();
+    let mut idx = 0;
+    // borrowed references, no refcounting at all
+    while unsafe { ffi::PyDict_Next(ptr, &mut pos, &mut key, &mut value) } != 0 {
+        if !unsafe { key_kinds.matches(key) && value_kinds.matches(value) } {
+            return Ok(Some(idx));
+        }
+        idx += 1;
+    }
+
+    Ok(None)
+}
+
+/// The items of `obj` as a list, if it's an `array.array`.
+pub(crate) fn array_to_list<'py>(obj: &Bound<'py, PyAny>) -> PyResult<Option<Bound<'py, PyAny>>> {
+    let py = obj.py();
+    if !obj.get_type().is(ARRAY.import(py, "array", "array")?) {
+        return Ok(None);
+    }
+    Ok(Some(obj.call_method0(intern!(py, "tolist"))?))
+}
+
+/// Names of the fields of a dataclass instance, in order, leaving out
+/// `ClassVar` and `InitVar` pseudo-fields (like `dataclasses.fields()`);
+/// `None` if `obj` isn't a dataclass instance.
+pub(crate) fn dataclass_fields<'py>(
+    obj: &Bound<'py, PyAny>
+) -> PyResult<Option<Vec<Bound<'py, PyString>>>> {
+    let py = obj.py();
+    if obj.is_instance_of::<PyType>() {
+        return Ok(None);
+    }
+    let Ok(fields) = obj.getattr(intern!(py, "__dataclass_fields__")) else {
+        return Ok(None);
+    };
+
+    let regular = FIELD.import(py, "dataclasses", "_FIELD")?;
+    let mut names = vec![];
+    for (name, field) in fields.downcast::<PyDict>()?.iter() {
+        if field.getattr(intern!(py, "_field_type"))?.is(regular) {
+            names.push(name.downcast_into::<PyString>()?);
+        }
+    }
+    Ok(Some(names))
+}
@@ -1,27 +1,248 @@
-use fancy_regex::Regex;
+use std::{ collections::HashMap, sync::{ Arc, Mutex, OnceLock } };
 
-use pyo3::{ exceptions, prelude::* };
+use pyo3::{ exceptions, prelude::*, types::{ PyList, PyString } };
+use rayon::prelude::*;
 
-#[pyclass(name = "Regex")]
+/// How many different patterns are cached at most, for the whole process.
+const MAX_CACHED: usize = 4096;
+
+/// Lists shorter than this are matched without releasing the GIL, which
+/// would cost more than it saves.
+const RELEASE_GIL_MIN: usize = 64;
+
+/// Lists at least this long are matched in parallel.
+const PARALLEL_MIN: usize = 4096;
+
+/// Compiled patterns, shared by every `Regex` made from the same pattern.
+static PATTERNS: OnceLock<Mutex<HashMap<Box<str>, Arc<Engine>>>> = OnceLock::new();
+
+/// A compiled pattern.
+pub(crate) enum Engine {
+    /// The `regex` crate: linear time, for anything without lookaround or
+    /// backreferences.
+    Linear(::regex::Regex),
+    /// `fancy_regex`, which backtracks; only for patterns that need it.
+    Fancy(fancy_regex::Regex),
+}
+
+impl Engine {
+    /// Gets the compiled `pattern`, from the cache if it's been compiled before.
+    pub(crate) fn get(pattern: &str) -> PyResult<Arc<Engine>> {
+        let patterns = PATTERNS.get_or_init(Default::default);
+        if let Some(engine) = patterns.lock().unwrap().get(pattern) {
+            return Ok(engine.clone());
+        }
+
+        // compiled without the lock, at worst twice
+        let engine = Arc::new(Self::compile(pattern)?);
+        let mut patterns = patterns.lock().unwrap();
+        if patterns.len() < MAX_CACHED {
+            patterns.insert(pattern.into(), engine.clone());
+        }
+        Ok(engine)
+    }
+
+    fn compile(pattern: &str) -> PyResult<Self> {
+        if let Ok(re) = ::regex::Regex::new(pattern) {
+            return Ok(Self::Linear(re));
+        }
+
+        let Ok(re) = fancy_regex::Regex::new(pattern) else {
+            return Err(exceptions::PyRuntimeError::new_err("Failed to parse & compile regex"));
+        };
+        Ok(Self::Fancy(re))
+    }
+
+    pub(crate) fn is_match(&self, input: &str) -> PyResult<bool> {
+        match self {
+            Self::Linear(re) => Ok(re.is_match(input)),
+            Self::Fancy(re) => {
+                let Ok(res) = re.is_match(input) else {
+                    return Err(exceptions::PyRuntimeError::new_err("Failed to match regex"));
+                };
+                Ok(res)
+            }
+        }
+    }
+
+    fn name(&self) -> &'static str {
+        match self {
+            Self::Linear(_) => "linear",
+            Self::Fancy(_) => "fancy",
+        }
+    }
+}
+
+/// Indices of the items of `list` that `is_match` fails for (non-`str` items,
+/// and ones that can't be encoded as UTF-8, fail too): only the first one,
+/// unless `all`.
+fn match_many<F>(py: Python, list: &Bound<'_, PyList>, all: bool, is_match: F) -> PyResult<Vec<usize>>
+    where F: Fn(&str) -> PyResult<bool> + Sync
+{
+    // held, so the strings stay alive even if the list changes while the GIL
+    // is released
+    let items: Vec<Bound<'_, PyAny>> = list.iter().collect();
+    let mut inputs: Vec<Option<&str>> = Vec::with_capacity(items.len());
+    for item in items.iter() {
+        // strings that can't be encoded (lone surrogates) fail, like they
+        // do one at a time
+        inputs.push(match item.downcast::<PyString>() {
+            Ok(s) => s.to_str().ok(),
+            Err(_) => None,
+        });
+    }
+
+    let fails = |idx: usize| -> Option<PyResult<usize>> {
+        match inputs[idx].map(&is_match) {
+            Some(Ok(true)) => None,
+            Some(Err(e)) => Some(Err(e)),
+            _ => Some(Ok(idx)),
+        }
+    };
+    let len = inputs.len();
+
+    if len < RELEASE_GIL_MIN {
+        return if all {
+            (0..len).filter_map(fails).collect()
+        } else {
+            (0..len).find_map(fails).transpose().map(|idx| idx.into_iter().collect())
+        };
+    }
+
+    py.allow_threads(|| {
+        if len < PARALLEL_MIN {
+            if all {
+                (0..len).filter_map(fails).collect()
+            } else {
+                (0..len).find_map(fails).transpose().map(|idx| idx.into_iter().collect())
+            }
+        } else if all {
+            (0..len).into_par_iter().filter_map(fails).collect()
+        } else {
+            (0..len)
+                .into_par_iter()
+                .find_map_first(fails)
+                .transpose()
+                .map(|idx| idx.into_iter().collect())
+        }
+    })
+}
+
+#[pyclass(name = "Regex", frozen)]
 pub(crate) struct PyRegex {
-    regex: Regex,
+    engine: Arc<Engine>,
 }
 
 #[pymethods]
 impl PyRegex {
     #[new]
     pub(crate) fn py_new(m: &str) -> PyResult<Self> {
-        let Ok(re) = Regex::new(m) else {
-            return Err(exceptions::PyRuntimeError::new_err("Failed to parse & compile regex"));
+        Ok(Self { engine: Engine::get(m)? })
+    }
+
+    pub(crate) fn validate(&self, input: &str) -> PyResult<bool> {
+        self.engine.is_match(input)
+    }
+
+    /// Indices of the items of `inputs` that don't match (see `match_many()`).
+    #[pyo3(signature = (inputs, all = false))]
+    pub(crate) fn validate_many(
+        &self,
+        py: Python,
+        inputs: &Bound<'_, PyList>,
+        all: bool
+    ) -> PyResult<Vec<usize>> {
+        match_many(py, inputs, all, |s| self.engine.is_match(s))
+    }
+
+    #[getter]
+    fn engine(&self) -> &'static str {
+        self.engine.name()
+    }
+}
+
+/// Several patterns that must all match, checked together.
+#[pyclass(name = "RegexSet", frozen)]
+pub(crate) struct PyRegexSet {
+    /// The linear patterns, matched in a single pass (if there are two or
+    /// more), with the index each had.
+    set: Option<(::regex::RegexSet, Vec<usize>)>,
+    /// Patterns matched one by one, with the index each had.
+    others: Vec<(usize, Arc<Engine>)>,
+}
+
+impl PyRegexSet {
+    /// Index of the first pattern that `input` doesn't match, or `None` if
+    /// it matches them all.
+    pub(crate) fn find_mismatch(&self, input: &str) -> PyResult<Option<usize>> {
+        let mut first = None;
+        if let Some((set, indices)) = &self.set {
+            let matches = set.matches(input);
+            first = indices
+                .iter()
+                .zip(0..)
+                .find(|(_, slot)| !matches.matched(*slot))
+                .map(|(idx, _)| *idx);
+        }
+
+        for (idx, engine) in self.others.iter() {
+            if first.is_some_and(|first| first < *idx) {
+                break;
+            }
+            if !engine.is_match(input)? {
+                return Ok(Some(*idx));
+            }
+        }
+        Ok(first)
+    }
+}
+
+#[pymethods]
+impl PyRegexSet {
+    #[new]
+    pub(crate) fn py_new(patterns: Vec<String>) -> PyResult<Self> {
+        let mut linear = vec![];
+        let mut others = vec![];
+        for (idx, pattern) in patterns.iter().enumerate() {
+            let engine = Engine::get(pattern)?;
+            if let Engine::Linear(_) = *engine {
+                linear.push(idx);
+            }
+            others.push((idx, engine));
+        }
+
+        let set = if linear.len() >= 2 {
+            let Ok(set) = ::regex::RegexSet::new(linear.iter().map(|idx| &patterns[*idx])) else {
+                return Err(exceptions::PyRuntimeError::new_err("Failed to parse & compile regex"));
+            };
+            others.retain(|(idx, _)| !linear.contains(idx));
+            Some((set, linear))
+        } else {
+            None
         };
 
-        Ok(Self { regex: re })
+        Ok(Self { set, others })
     }
 
+    /// Checks if `input` matches every pattern.
     pub(crate) fn validate(&self, input: &str) -> PyResult<bool> {
-        let Ok(res) = self.regex.is_match(input) else {
-            return Err(exceptions::PyRuntimeError::new_err("Failed to match regex"));
-        };
-        Ok(res)
+        Ok(self.find_mismatch(input)?.is_none())
+    }
+
+    /// Indices of the items of `inputs` that don't match every pattern (see
+    /// `match_many()`).
+    #[pyo3(signature = (inputs, all = false))]
+    pub(crate) fn validate_many(
+        &self,
+        py: Python,
+        inputs: &Bound<'_, PyList>,
+        all: bool
+    ) -> PyResult<Vec<usize>> {
+        match_many(py, inputs, all, |s| Ok(self.find_mismatch(s)?.is_none()))
+    }
+
+    #[pyo3(name = "find_mismatch")]
+    fn py_find_mismatch(&self, input: &str) -> PyResult<Option<usize>> {
+        self.find_mismatch(input)
     }
 }
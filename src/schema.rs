@@ -0,0 +1,1213 @@
+use std::{ fs::File, path::PathBuf, sync::{ atomic::{ AtomicUsize, Ordering }, Arc } };
+
+use memmap2::Mmap;
+use pyo3::{
+    exceptions,
+    intern,
+    prelude::*,
+    types::{ PyBytes, PyCFunction, PyDict, PyList, PyString, PyType, PyWeakrefReference },
+};
+use rayon::prelude::*;
+
+use crate::{ archive::io_error, batch, dump, json, regex::PyRegexSet, ser, stream };
+
+/// The kind of a document value, as seen from Python.
+#[derive(Clone, Copy, PartialEq)]
+pub(crate) enum Kind {
+    Null,
+    Bool,
+    Int,
+    Float,
+    Str,
+    Bytes,
+    List,
+    Dict,
+}
+
+impl Kind {
+    /// Equivalent to `repr(type(value))` in Python.
+    fn type_repr(&self) -> &'static str {
+        match self {
+            Self::Null => "<class 'NoneType'>",
+            Self::Bool => "<class 'bool'>",
+            Self::Int => "<class 'int'>",
+            Self::Float => "<class 'float'>",
+            Self::Str => "<class 'str'>",
+            Self::Bytes => "<class 'bytes'>",
+            Self::List => "<class 'list'>",
+            Self::Dict => "<class 'dict'>",
+        }
+    }
+
+    const ALL: [Kind; 8] = [
+        Self::Null,
+        Self::Bool,
+        Self::Int,
+        Self::Float,
+        Self::Str,
+        Self::Bytes,
+        Self::List,
+        Self::Dict,
+    ];
+
+    /// Equivalent to `isinstance(value, typ)` in Python, where `self` is `typ`.
+    fn accepts(&self, other: Kind) -> bool {
+        // bool is a subclass of int
+        *self == other || (*self == Self::Int && other == Self::Bool)
+    }
+}
+
+/// A parsed (but not yet materialized) document, e.g., JSON.
+pub(crate) trait Document {
+    type Key: Document;
+
+    fn kind(&self) -> Kind;
+    fn as_bool(&self) -> Option<bool>;
+    fn as_i64(&self) -> Option<i64>;
+    fn as_f64(&self) -> Option<f64>;
+    fn as_str(&self) -> Option<&str>;
+    fn items(&self) -> &[Self] where Self: Sized;
+    fn entries<'a>(&'a self) -> Box<dyn Iterator<Item = (&'a Self::Key, &'a Self)> + 'a>;
+    fn field(&self, name: &str) -> Option<&Self>;
+    fn to_py(&self, py: Python) -> PyResult<Py<PyAny>>;
+}
+
+/// Why a check failed.
+pub(crate) enum Failure {
+    /// Validation errors, in the same layout as `Result.errors`.
+    Invalid(Vec<String>),
+    /// An exception, raised as-is.
+    Error(PyErr),
+    /// Python is needed to go any further, but we're not holding the GIL.
+    Deferred,
+}
+
+impl From<PyErr> for Failure {
+    fn from(value: PyErr) -> Self {
+        Self::Error(value)
+    }
+}
+
+impl Failure {
+    fn invalid(error: String) -> Self {
+        Self::Invalid(vec![error])
+    }
+
+    fn expected(typ: Kind, got: Kind) -> Self {
+        Self::invalid(format!("Expected type {}, got {}", typ.type_repr(), got.type_repr()))
+    }
+
+    /// Equivalent to `Result.trace()`.
+    fn trace(self, upper: String) -> Self {
+        match self {
+            Self::Invalid(errors) => {
+                let mut traced = Vec::with_capacity(errors.len() + 3);
+                traced.push(upper);
+                traced.push("indent".to_string());
+                traced.extend(errors);
+                traced.push("unindent".to_string());
+                Self::Invalid(traced)
+            }
+            err => err,
+        }
+    }
+}
+
+/// Steps recorded while checking, replayed while building.
+pub(crate) enum Step {
+    /// Which variant of a union matched (`false` for A, `true` for B).
+    Variant(bool),
+    /// Which variant of a flat union matched.
+    Choice(usize),
+    /// A value that has already been materialized by Python.
+    Value(Py<PyAny>),
+}
+
+pub(crate) enum LiteralValue {
+    None,
+    Bool(bool),
+    Int(i64),
+    Float(f64),
+    Str(String),
+}
+
+impl LiteralValue {
+    /// Whether a value of `kind` could be equal to `self`.
+    fn may_equal(&self, kind: Kind) -> bool {
+        match self {
+            Self::None => kind == Kind::Null,
+            Self::Str(_) => kind == Kind::Str,
+            Self::Bool(_) | Self::Int(_) | Self::Float(_) => {
+                matches!(kind, Kind::Bool | Kind::Int | Kind::Float)
+            }
+        }
+    }
+
+    /// Equivalent to `value == self` in Python.
+    fn eq<D: Document>(&self, value: &D) -> bool {
+        let kind = value.kind();
+        match self {
+            Self::None => kind == Kind::Null,
+            Self::Str(s) => value.as_str() == Some(s.as_str()),
+            Self::Bool(b) => eq_number(value, *b as i64 as f64, Some(*b as i64)),
+            Self::Int(i) => eq_number(value, *i as f64, Some(*i)),
+            Self::Float(f) => eq_number(value, *f, None),
+        }
+    }
+}
+
+fn eq_number<D: Document>(value: &D, f: f64, i: Option<i64>) -> bool {
+    match value.kind() {
+        Kind::Bool => {
+            let b = value.as_bool().unwrap_or(false) as i64;
+            match i {
+                Some(i) => i == b,
+                None => f == (b as f64),
+            }
+        }
+        Kind::Int =>
+            match (i, value.as_i64()) {
+                (Some(i), Some(v)) => i == v,
+                _ => value.as_f64() == Some(f),
+            }
+        Kind::Float => value.as_f64() == Some(f),
+        _ => false,
+    }
+}
+
+pub(crate) enum Default {
+    Required,
+    Value(Py<PyAny>),
+    Factory(Py<PyAny>),
+}
+
+pub(crate) struct FieldNode {
+    pub(crate) name: Py<PyString>,
+    key: String,
+    /// `"key":`, escaped, ready to be written out as JSON.
+    pub(crate) json_key: Vec<u8>,
+    /// `During validation of dataclass ... at field ..., got:`
+    header: String,
+    pub(crate) node: Node,
+    /// The Python validator, used for default values.
+    validator: Py<PyAny>,
+    default: Default,
+    /// Set when every extra validator is a regex, so they can be checked
+    /// natively: the patterns, and the error message of each.
+    regexes: Option<(Py<PyRegexSet>, Vec<String>)>,
+    extras: Vec<Py<PyAny>>,
+}
+
+impl FieldNode {
+    fn needs_python(&self) -> bool {
+        !matches!(self.node, Node::Skip) && self.regexes.is_none() && !self.extras.is_empty()
+    }
+}
+
+pub(crate) struct DataclassNode {
+    repr: String,
+    /// Address of the model class, looked up once; zeroed when the class is
+    /// collected. Not a strong reference, since the class holds on to the
+    /// schema through its validator.
+    cls: Arc<AtomicUsize>,
+    /// Weakref to the class, whose callback does the zeroing.
+    _guard: Option<Py<PyWeakrefReference>>,
+    pub(crate) fields: Vec<FieldNode>,
+    /// Set as `__exact_valid__` on built instances (for `Exact` models).
+    marker: Option<Py<PyAny>>,
+}
+
+/// Discriminator of a flat union; variants are referred to by index.
+pub(crate) struct Tags {
+    key: String,
+    values: Vec<(LiteralValue, Vec<usize>)>,
+    /// Variants to try when the tag is unknown.
+    untagged: Vec<usize>,
+    /// Variants to try when the tag is missing, unless that's an error, too.
+    missing: Option<Vec<usize>>,
+    /// `Failed to validate ...: expected field ... to be one of ...`
+    message: String,
+}
+
+/// Mirrors a validator tree (see `exacting.schema`).
+pub(crate) enum Node {
+    Any,
+    /// Not validated at all (nested dataclass fields).
+    Skip,
+    None,
+    Type(Kind),
+    List {
+        repr: String,
+        item: Box<Node>,
+    },
+    Dict {
+        repr: String,
+        key: Box<Node>,
+        value: Box<Node>,
+    },
+    Union {
+        repr: String,
+        a: Box<Node>,
+        b: Box<Node>,
+    },
+    Literal {
+        repr: String,
+        values: Vec<LiteralValue>,
+    },
+    OneOf {
+        repr: String,
+        /// Each variant, with its `repr()`.
+        variants: Vec<(String, Node)>,
+        /// Variants that may accept each `Kind`, in order.
+        dispatch: Vec<Vec<usize>>,
+        tags: Option<Tags>,
+    },
+    Dataclass(Box<DataclassNode>),
+    /// Anything else, e.g., custom validators; handled by Python.
+    Opaque(Py<PyAny>),
+}
+
+fn spec_item<'py, T: FromPyObject<'py>>(spec: &Bound<'py, PyAny>, idx: usize) -> PyResult<T> {
+    spec.get_item(idx)?.extract::<T>()
+}
+
+impl Node {
+    pub(crate) fn from_spec(spec: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let tag = spec_item::<String>(spec, 0)?;
+        let node = match tag.as_str() {
+            "any" => Self::Any,
+            "skip" => Self::Skip,
+            "none" => Self::None,
+            "int" => Self::Type(Kind::Int),
+            "float" => Self::Type(Kind::Float),
+            "bool" => Self::Type(Kind::Bool),
+            "str" => Self::Type(Kind::Str),
+            "bytes" => Self::Type(Kind::Bytes),
+            "loose_list" => Self::Type(Kind::List),
+            "loose_dict" => Self::Type(Kind::Dict),
+            "list" =>
+                Self::List {
+                    repr: spec_item(spec, 1)?,
+                    item: Box::new(Self::from_spec(&spec.get_item(2)?)?),
+                },
+            "dict" =>
+                Self::Dict {
+                    repr: spec_item(spec, 1)?,
+                    key: Box::new(Self::from_spec(&spec.get_item(2)?)?),
+                    value: Box::new(Self::from_spec(&spec.get_item(3)?)?),
+                },
+            "union" =>
+                Self::Union {
+                    repr: spec_item(spec, 1)?,
+                    a: Box::new(Self::from_spec(&spec.get_item(2)?)?),
+                    b: Box::new(Self::from_spec(&spec.get_item(3)?)?),
+                },
+            "one_of" => {
+                let mut variants = vec![];
+                for item in spec.get_item(2)?.try_iter()? {
+                    let item = item?;
+                    variants.push((spec_item(&item, 0)?, Self::from_spec(&item.get_item(1)?)?));
+                }
+
+                let dispatch = Kind::ALL.iter()
+                    .map(|kind| {
+                        (0..variants.len()).filter(|idx| variants[*idx].1.may_accept(*kind)).collect()
+                    })
+                    .collect();
+
+                let tags = spec.get_item(3)?;
+                let tags = if tags.is_none() { None } else { Some(tags_from_spec(&tags)?) };
+
+                Self::OneOf { repr: spec_item(spec, 1)?, variants, dispatch, tags }
+            }
+            "literal" => {
+                let mut values = vec![];
+                for item in spec.get_item(2)?.try_iter()? {
+                    values.push(literal_from_py(&item?)?);
+                }
+                Self::Literal { repr: spec_item(spec, 1)?, values }
+            }
+            "dataclass" => {
+                let mut fields = vec![];
+                for item in spec.get_item(3)?.try_iter()? {
+                    fields.push(field_from_spec(&item?)?);
+                }
+                let (cls, _guard) = watch_class(&spec.get_item(2)?.call0()?)?;
+                Self::Dataclass(
+                    Box::new(DataclassNode {
+                        repr: spec_item(spec, 1)?,
+                        cls,
+                        _guard,
+                        fields,
+                        marker: spec_item(spec, 4)?,
+                    })
+                )
+            }
+            "opaque" => Self::Opaque(spec_item(spec, 1)?),
+            _ => {
+                return Err(
+                    exceptions::PyValueError::new_err(format!("Unknown schema node: {:?}", tag))
+                );
+            }
+        };
+
+        Ok(node)
+    }
+
+    /// Whether this node could possibly accept a value of `kind`. Keep this
+    /// in line with `may_accept()` on the Python side.
+    fn may_accept(&self, kind: Kind) -> bool {
+        match self {
+            Self::Any | Self::Skip | Self::Opaque(_) => true,
+            Self::None => kind == Kind::Null,
+            Self::Type(typ) => typ.accepts(kind),
+            Self::List { .. } => kind == Kind::List,
+            Self::Dict { .. } | Self::Dataclass(_) => kind == Kind::Dict,
+            Self::Union { a, b, .. } => a.may_accept(kind) || b.may_accept(kind),
+            Self::OneOf { variants, .. } => variants.iter().any(|(_, node)| node.may_accept(kind)),
+            Self::Literal { values, .. } => values.iter().any(|item| item.may_equal(kind)),
+        }
+    }
+
+    /// Checks `value` against this node without materializing anything,
+    /// unless Python has to be involved.
+    ///
+    /// Without `py`, this gives up with `Failure::Deferred` wherever Python
+    /// would be needed.
+    pub(crate) fn check<D: Document>(
+        &self,
+        py: Option<Python>,
+        value: &D,
+        trail: &mut Vec<Step>
+    ) -> Result<(), Failure> {
+        match self {
+            Self::Any | Self::Skip => Ok(()),
+            Self::None => {
+                if value.kind() != Kind::Null {
+                    return Err(Failure::invalid("Expected None".to_string()));
+                }
+                Ok(())
+            }
+            Self::Type(kind) => {
+                if !kind.accepts(value.kind()) {
+                    return Err(Failure::expected(*kind, value.kind()));
+                }
+                Ok(())
+            }
+            Self::List { repr, item } => {
+                if value.kind() != Kind::List {
+                    return Err(Failure::expected(Kind::List, value.kind()));
+                }
+
+                for (idx, element) in value.items().iter().enumerate() {
+                    item.check(py, element, trail).map_err(|f|
+                        f.trace(
+                            format!(
+                                "During validation of {} at item {}, a validation error occurred:",
+                                repr,
+                                idx
+                            )
+                        )
+                    )?;
+                }
+                Ok(())
+            }
+            Self::Dict { repr, key, value: value_node } => {
+                if value.kind() != Kind::Dict {
+                    return Err(Failure::expected(Kind::Dict, value.kind()));
+                }
+
+                for (k, v) in value.entries() {
+                    if let Err(f) = key.check(py, k, trail) {
+                        let Some(py) = py else {
+                            return Err(Failure::Deferred);
+                        };
+                        return Err(
+                            f.trace(
+                                format!(
+                                    "During validation of {}, the literal key value {} failed to validate:",
+                                    repr,
+                                    py_repr(py, k)?
+                                )
+                            )
+                        );
+                    }
+
+                    if let Err(f) = value_node.check(py, v, trail) {
+                        let Some(py) = py else {
+                            return Err(Failure::Deferred);
+                        };
+                        return Err(
+                            f.trace(
+                                format!(
+                                    "During validation of {}, the *value* paired to key {} failed to validate:",
+                                    repr,
+                                    py_repr(py, k)?
+                                )
+                            )
+                        );
+                    }
+                }
+                Ok(())
+            }
+            Self::Union { repr, a, b } => {
+                let mark = trail.len();
+
+                trail.push(Step::Variant(false));
+                let a_errors = match a.check(py, value, trail) {
+                    Ok(()) => {
+                        return Ok(());
+                    }
+                    Err(Failure::Invalid(errors)) => errors,
+                    Err(err) => {
+                        return Err(err);
+                    }
+                };
+                trail.truncate(mark);
+
+                trail.push(Step::Variant(true));
+                let b_errors = match b.check(py, value, trail) {
+                    Ok(()) => {
+                        return Ok(());
+                    }
+                    Err(Failure::Invalid(errors)) => errors,
+                    Err(err) => {
+                        return Err(err);
+                    }
+                };
+                trail.truncate(mark);
+
+                // equivalent to `Result.trace_below()`
+                Err(
+                    Failure::Invalid(a_errors.into_iter().chain(b_errors).collect()).trace(
+                        format!("Failed to validate {}, tried variant A and B, got errors:", repr)
+                    )
+                )
+            }
+            Self::OneOf { repr, variants, dispatch, tags } => {
+                let kind = value.kind();
+                let mut errors = vec![];
+                let candidates = match tags {
+                    Some(tags) if kind == Kind::Dict => {
+                        let found = match value.field(&tags.key) {
+                            Some(tag) => {
+                                tags.values
+                                    .iter()
+                                    .find(|(item, _)| item.eq(tag))
+                                    .map(|(_, candidates)| candidates)
+                            }
+                            None => tags.missing.as_ref(),
+                        };
+                        match found {
+                            Some(candidates) => candidates,
+                            None => {
+                                errors.push(tags.message.clone());
+                                &tags.untagged
+                            }
+                        }
+                    }
+                    _ => &dispatch[kind as usize],
+                };
+
+                if candidates.is_empty() {
+                    if errors.is_empty() {
+                        errors.push(
+                            format!(
+                                "Failed to validate {}: no variant accepts {}",
+                                repr,
+                                kind.type_repr()
+                            )
+                        );
+                    }
+                    return Err(Failure::Invalid(errors));
+                }
+
+                let mark = trail.len();
+                for idx in candidates.iter() {
+                    trail.push(Step::Choice(*idx));
+                    match variants[*idx].1.check(py, value, trail) {
+                        Ok(()) => {
+                            return Ok(());
+                        }
+                        Err(Failure::Invalid(e)) => errors.extend(e),
+                        Err(err) => {
+                            return Err(err);
+                        }
+                    }
+                    trail.truncate(mark);
+                }
+
+                let tried = candidates
+                    .iter()
+                    .map(|idx| variants[*idx].0.as_str())
+                    .collect::<Vec<_>>()
+                    .join(", ");
+
+                // equivalent to `Result.trace_below()`
+                Err(
+                    Failure::Invalid(errors).trace(
+                        format!("Failed to validate {}, tried {}, got errors:", repr, tried)
+                    )
+                )
+            }
+            Self::Literal { repr, values } => {
+                if values.iter().any(|item| item.eq(value)) {
+                    return Ok(());
+                }
+                Err(Failure::invalid(format!("Failed to validate on {}: no eq match", repr)))
+            }
+            Self::Dataclass(dc) => dc.check(py, value, trail),
+            Self::Opaque(validator) => {
+                let Some(py) = py else {
+                    return Err(Failure::Deferred);
+                };
+                let data = validate_py(py, validator, value.to_py(py)?, true)?;
+                trail.push(Step::Value(data));
+                Ok(())
+            }
+        }
+    }
+
+    /// Materializes a checked `value`, replaying the steps from `check()`.
+    pub(crate) fn build<D: Document>(
+        &self,
+        py: Python,
+        value: &D,
+        trail: &[Step],
+        cursor: &mut usize
+    ) -> PyResult<Py<PyAny>> {
+        match self {
+            Self::Any | Self::Skip | Self::None | Self::Type(_) | Self::Literal { .. } => {
+                value.to_py(py)
+            }
+            Self::List { item, .. } => {
+                let list = PyList::empty(py);
+                for element in value.items() {
+                    list.append(item.build(py, element, trail, cursor)?)?;
+                }
+                Ok(list.unbind().into())
+            }
+            Self::Dict { key, value: value_node, .. } => {
+                let dict = PyDict::new(py);
+                for (k, v) in value.entries() {
+                    dict.set_item(
+                        key.build(py, k, trail, cursor)?,
+                        value_node.build(py, v, trail, cursor)?
+                    )?;
+                }
+                Ok(dict.unbind().into())
+            }
+            Self::Union { a, b, .. } => {
+                let Step::Variant(is_b) = &trail[*cursor] else {
+                    return Err(exceptions::PyRuntimeError::new_err("(internal) Bad union trail"));
+                };
+                *cursor += 1;
+
+                if *is_b {
+                    b.build(py, value, trail, cursor)
+                } else {
+                    a.build(py, value, trail, cursor)
+                }
+            }
+            Self::OneOf { variants, .. } => {
+                let Step::Choice(idx) = &trail[*cursor] else {
+                    return Err(exceptions::PyRuntimeError::new_err("(internal) Bad union trail"));
+                };
+                *cursor += 1;
+
+                variants[*idx].1.build(py, value, trail, cursor)
+            }
+            Self::Dataclass(dc) => dc.build(py, value, trail, cursor),
+            Self::Opaque(_) => take_value(py, trail, cursor),
+        }
+    }
+}
+
+/// The address of `cls`, and a weakref that zeroes it once `cls` is gone (so
+/// that whatever gets allocated there next isn't mistaken for it).
+fn watch_class(
+    cls: &Bound<'_, PyAny>
+) -> PyResult<(Arc<AtomicUsize>, Option<Py<PyWeakrefReference>>)> {
+    let Ok(cls) = cls.downcast::<PyType>() else {
+        // weakref already dead
+        return Ok((Arc::new(AtomicUsize::new(0)), None));
+    };
+
+    let addr = Arc::new(AtomicUsize::new(cls.as_ptr() as usize));
+    let cleared = addr.clone();
+    let callback = PyCFunction::new_closure(cls.py(), None, None, move |_, _| {
+        cleared.store(0, Ordering::Release);
+    })?;
+    let guard = PyWeakrefReference::new_with(cls, callback)?;
+    Ok((addr, Some(guard.unbind())))
+}
+
+impl DataclassNode {
+    /// The model class, unless it's been collected.
+    pub(crate) fn class<'py>(&self, py: Python<'py>) -> Option<Bound<'py, PyType>> {
+        let addr = self.cls.load(Ordering::Acquire);
+        if addr == 0 {
+            return None;
+        }
+        // SAFETY: the address is zeroed (with the GIL held) before the class
+        // is freed, and the GIL is held now
+        let cls = unsafe { Bound::from_borrowed_ptr(py, addr as *mut pyo3::ffi::PyObject) };
+        Some(unsafe { cls.downcast_into_unchecked() })
+    }
+
+    /// Whether `value` is an instance of exactly the model class (no
+    /// subclasses), without touching the weakref.
+    pub(crate) fn is_instance(&self, value: &Bound<'_, PyAny>) -> bool {
+        value.get_type().as_ptr() as usize == self.cls.load(Ordering::Acquire)
+    }
+
+    fn check<D: Document>(
+        &self,
+        py: Option<Python>,
+        value: &D,
+        trail: &mut Vec<Step>
+    ) -> Result<(), Failure> {
+        if let Some(py) = py {
+            if self.class(py).is_none() {
+                return Err(
+                    Failure::invalid("(internal) Weakref missing for dataclass".to_string())
+                );
+            }
+        }
+
+        if value.kind() != Kind::Dict {
+            return Err(
+                Failure::expected(Kind::Dict, value.kind()).trace(
+                    format!("Expected a dict on dataclass ({}) from_dict:", self.repr)
+                )
+            );
+        }
+
+        for field in self.fields.iter() {
+            let Some(field_value) = value.field(&field.key) else {
+                let Some(py) = py else {
+                    return Err(Failure::Deferred);
+                };
+                let data = match &field.default {
+                    Default::Required => {
+                        return Err(
+                            Failure::Error(exceptions::PyKeyError::new_err(field.key.clone()))
+                        );
+                    }
+                    Default::Value(data) => data.clone_ref(py),
+                    Default::Factory(factory) => factory.call0(py)?,
+                };
+
+                let data = field.validate_py(py, data)?;
+                trail.push(Step::Value(data));
+                continue;
+            };
+
+            if let Node::Skip = field.node {
+                continue;
+            }
+
+            let mark = trail.len();
+            field.node
+                .check(py, field_value, trail)
+                .map_err(|f| f.trace(field.header.clone()))?;
+
+            if let Some((regexes, messages)) = &field.regexes {
+                let Some(s) = field_value.as_str() else {
+                    return Err(
+                        Failure::expected(Kind::Str, field_value.kind()).trace(
+                            field.header.clone()
+                        )
+                    );
+                };
+
+                if let Some(idx) = regexes.get().find_mismatch(s)? {
+                    return Err(
+                        Failure::invalid(messages[idx].clone()).trace(field.header.clone())
+                    );
+                }
+            } else if field.needs_python() {
+                let Some(py) = py else {
+                    return Err(Failure::Deferred);
+                };
+                let data = field.node.build(py, field_value, &trail[mark..], &mut 0)?;
+                trail.truncate(mark);
+
+                let data = field.validate_extras(py, data)?;
+                trail.push(Step::Value(data));
+            }
+        }
+
+        Ok(())
+    }
+
+    fn build<D: Document>(
+        &self,
+        py: Python,
+        value: &D,
+        trail: &[Step],
+        cursor: &mut usize
+    ) -> PyResult<Py<PyAny>> {
+        let Some(cls) = self.class(py) else {
+            return Err(
+                exceptions::PyRuntimeError::new_err("(internal) Weakref missing for dataclass")
+            );
+        };
+        let item = cls.call_method1(intern!(py, "__new__"), (&cls,))?;
+
+        for field in self.fields.iter() {
+            let data = match value.field(&field.key) {
+                Some(field_value) if !field.needs_python() => {
+                    field.node.build(py, field_value, trail, cursor)?
+                }
+                _ => take_value(py, trail, cursor)?,
+            };
+            set_attr(&item, field.name.bind(py), data.bind(py))?;
+        }
+
+        if let Some(marker) = &self.marker {
+            set_attr(&item, intern!(py, "__exact_valid__"), marker.bind(py))?;
+        }
+
+        Ok(item.unbind())
+    }
+}
+
+impl FieldNode {
+    /// Validates a Python value (e.g., a default) the way `DataclassV` does.
+    fn validate_py(&self, py: Python, data: Py<PyAny>) -> Result<Py<PyAny>, Failure> {
+        if let Node::Skip = self.node {
+            return Ok(data);
+        }
+
+        let data = validate_py(py, &self.validator, data, true).map_err(|f|
+            f.trace(self.header.clone())
+        )?;
+        self.validate_extras(py, data)
+    }
+
+    fn validate_extras(&self, py: Python, mut data: Py<PyAny>) -> Result<Py<PyAny>, Failure> {
+        for extra in self.extras.iter() {
+            data = validate_py(py, extra, data, false).map_err(|f|
+                f.trace(self.header.clone())
+            )?;
+        }
+        Ok(data)
+    }
+}
+
+/// `object.__setattr__()`: skips the class's own `__setattr__()`, which
+/// frozen models use to refuse changes.
+fn set_attr(
+    obj: &Bound<'_, PyAny>,
+    name: &Bound<'_, PyString>,
+    value: &Bound<'_, PyAny>
+) -> PyResult<()> {
+    // SAFETY: all three are valid, owned references for the call
+    let res = unsafe {
+        pyo3::ffi::PyObject_GenericSetAttr(obj.as_ptr(), name.as_ptr(), value.as_ptr())
+    };
+    if res == -1 {
+        return Err(PyErr::fetch(obj.py()));
+    }
+    Ok(())
+}
+
+fn field_from_spec(spec: &Bound<'_, PyAny>) -> PyResult<FieldNode> {
+    let py = spec.py();
+    let key = spec_item::<String>(spec, 0)?;
+    let default_kind = spec_item::<String>(spec, 4)?;
+    let default = match default_kind.as_str() {
+        "value" => Default::Value(spec_item(spec, 5)?),
+        "factory" => Default::Factory(spec_item(spec, 5)?),
+        _ => Default::Required,
+    };
+
+    let regexes = if spec.get_item(6)?.is_none() {
+        None
+    } else {
+        let item = spec.get_item(6)?;
+        Some((spec_item::<Py<PyRegexSet>>(&item, 0)?, spec_item::<Vec<String>>(&item, 1)?))
+    };
+
+    let mut json_key = serde_json::to_vec(&key).map_err(|e| {
+        exceptions::PyValueError::new_err(e.to_string())
+    })?;
+    json_key.push(b':');
+
+    Ok(FieldNode {
+        name: PyString::intern(py, &key).unbind(),
+        key,
+        json_key,
+        header: spec_item(spec, 1)?,
+        node: Node::from_spec(&spec.get_item(2)?)?,
+        validator: spec_item(spec, 3)?,
+        default,
+        regexes,
+        extras: spec_item(spec, 7)?,
+    })
+}
+
+fn tags_from_spec(spec: &Bound<'_, PyAny>) -> PyResult<Tags> {
+    let mut values = vec![];
+    for item in spec.get_item(1)?.try_iter()? {
+        let item = item?;
+        values.push((literal_from_py(&item.get_item(0)?)?, spec_item(&item, 1)?));
+    }
+
+    Ok(Tags {
+        key: spec_item(spec, 0)?,
+        values,
+        untagged: spec_item(spec, 2)?,
+        missing: spec_item(spec, 3)?,
+        message: spec_item(spec, 4)?,
+    })
+}
+
+fn literal_from_py(value: &Bound<'_, PyAny>) -> PyResult<LiteralValue> {
+    if value.is_none() {
+        return Ok(LiteralValue::None);
+    }
+    if let Ok(b) = value.downcast::<pyo3::types::PyBool>() {
+        return Ok(LiteralValue::Bool(b.is_true()));
+    }
+    if value.is_instance_of::<pyo3::types::PyInt>() {
+        return Ok(LiteralValue::Int(value.extract()?));
+    }
+    if value.is_instance_of::<pyo3::types::PyFloat>() {
+        return Ok(LiteralValue::Float(value.extract()?));
+    }
+    if value.is_instance_of::<PyString>() {
+        return Ok(LiteralValue::Str(value.extract()?));
+    }
+
+    Err(exceptions::PyValueError::new_err("Unsupported literal value"))
+}
+
+fn py_repr<D: Document>(py: Python, value: &D) -> PyResult<String> {
+    Ok(value.to_py(py)?.bind(py).repr()?.to_string())
+}
+
+fn take_value(py: Python, trail: &[Step], cursor: &mut usize) -> PyResult<Py<PyAny>> {
+    let Step::Value(data) = &trail[*cursor] else {
+        return Err(exceptions::PyRuntimeError::new_err("(internal) Bad value trail"));
+    };
+    *cursor += 1;
+    Ok(data.clone_ref(py))
+}
+
+/// Calls a Python validator and unwraps its `Result`.
+fn validate_py(
+    py: Python,
+    validator: &Py<PyAny>,
+    data: Py<PyAny>,
+    from_dict: bool
+) -> Result<Py<PyAny>, Failure> {
+    let validator = validator.bind(py);
+    let res = if from_dict {
+        let kwargs = PyDict::new(py);
+        kwargs.set_item(intern!(py, "from_dict"), true)?;
+        validator.call_method(intern!(py, "validate"), (data,), Some(&kwargs))?
+    } else {
+        validator.call_method1(intern!(py, "validate"), (data,))?
+    };
+
+    if res.call_method0(intern!(py, "is_ok"))?.is_truthy()? {
+        return Ok(res.call_method0(intern!(py, "unwrap"))?.unbind());
+    }
+
+    // errors may be kept as data (`Issue`, `Trace`); render them here
+    let mut errors = vec![];
+    for error in res.call_method0(intern!(py, "unwrap_err"))?.try_iter()? {
+        errors.push(error?.str()?.to_str()?.to_string());
+    }
+    Err(Failure::Invalid(errors))
+}
+
+/// A validator tree mirrored on the Rust side, which checks parsed documents
+/// before any Python object gets created.
+#[pyclass(name = "Schema", frozen)]
+pub(crate) struct PySchema {
+    root: Node,
+}
+
+impl PySchema {
+    /// Checks, then builds. Returns `(data, None)` or `(None, errors)`.
+    pub(crate) fn load<D: Document>(
+        &self,
+        py: Python,
+        doc: &D
+    ) -> PyResult<(Py<PyAny>, Option<Vec<String>>)> {
+        let mut trail = vec![];
+        match self.root.check(Some(py), doc, &mut trail) {
+            Ok(()) => {
+                let data = self.root.build(py, doc, &trail, &mut 0)?;
+                Ok((data, None))
+            }
+            Err(Failure::Invalid(errors)) => Ok((py.None(), Some(errors))),
+            Err(Failure::Error(err)) => Err(err),
+            Err(Failure::Deferred) => unreachable!("deferred while holding the GIL"),
+        }
+    }
+
+    /// Checks only. Returns the errors, if any.
+    pub(crate) fn check<D: Document>(&self, py: Python, doc: &D) -> PyResult<Option<Vec<String>>> {
+        match self.root.check(Some(py), doc, &mut vec![]) {
+            Ok(()) => Ok(None),
+            Err(Failure::Invalid(errors)) => Ok(Some(errors)),
+            Err(Failure::Error(err)) => Err(err),
+            Err(Failure::Deferred) => unreachable!("deferred while holding the GIL"),
+        }
+    }
+
+    /// Checks without the GIL. Returns the trail if `doc` passed without
+    /// needing Python, so it can be built right away.
+    fn precheck<D: Document>(&self, doc: &D) -> Option<Vec<Step>> {
+        let mut trail = vec![];
+        match self.root.check(None, doc, &mut trail) {
+            Ok(()) => Some(trail),
+            Err(_) => None,
+        }
+    }
+
+    /// Parses and prechecks every item on a thread pool with the GIL
+    /// released, then builds them in order on this thread.
+    ///
+    /// Per-item failures (including exceptions) are collected as errors.
+    /// `parse` gives something that `doc` can get a document from, so that
+    /// documents may borrow from it.
+    fn load_many<P, D, F, G>(
+        &self,
+        py: Python,
+        count: usize,
+        parse: F,
+        doc: G,
+        workers: Option<usize>
+    ) -> PyResult<Vec<(Py<PyAny>, Option<Vec<String>>)>>
+        where
+            P: Send,
+            D: Document,
+            F: Fn(usize) -> PyResult<P> + Sync,
+            G: Fn(&P) -> &D + Sync
+    {
+        let prepared = py.allow_threads(|| {
+            batch::run_in_pool(workers, || {
+                (0..count)
+                    .into_par_iter()
+                    .map(|idx| {
+                        let parsed = parse(idx)?;
+                        let trail = self.precheck(doc(&parsed));
+                        Ok((parsed, trail))
+                    })
+                    .collect::<Vec<PyResult<(P, Option<Vec<Step>>)>>>()
+            })
+        })?;
+
+        let mut loaded = Vec::with_capacity(count);
+        for item in prepared {
+            let res = match item {
+                Ok((parsed, Some(trail))) => {
+                    self.root.build(py, doc(&parsed), &trail, &mut 0).map(|data| (data, None))
+                }
+                Ok((parsed, None)) => self.load(py, doc(&parsed)),
+                Err(err) => Err(err),
+            };
+
+            loaded.push(match res {
+                Ok(data) => data,
+                Err(err) => (py.None(), Some(vec![err.to_string()])),
+            });
+        }
+
+        Ok(loaded)
+    }
+}
+
+#[pymethods]
+impl PySchema {
+    #[new]
+    pub(crate) fn py_new(spec: &Bound<'_, PyAny>) -> PyResult<Self> {
+        Ok(Self { root: Node::from_spec(spec)? })
+    }
+
+    /// Writes `value` as compact JSON, walking it along the schema.
+    #[pyo3(signature = (value, as_bytes = false))]
+    pub(crate) fn dump_json(
+        &self,
+        py: Python,
+        value: &Bound<'_, PyAny>,
+        as_bytes: bool
+    ) -> PyResult<Py<PyAny>> {
+        let mut writer = ser::JsonWriter::new();
+        writer.write(&self.root, value)?;
+
+        if as_bytes {
+            return Ok(PyBytes::new(py, &writer.buf).into_any().unbind());
+        }
+        // SAFETY: only ever written from valid UTF-8
+        let json = unsafe { std::str::from_utf8_unchecked(&writer.buf) };
+        Ok(PyString::new(py, json).into_any().unbind())
+    }
+
+    /// Writes every item as a line of JSON, or as length-prefixed bytes
+    /// (see `py_to_bytes`), flushing to `target` in chunks.
+    ///
+    /// Returns how many items were written.
+    #[pyo3(signature = (items, target, chunk_size = 65536, format = "json"))]
+    pub(crate) fn dump_many(
+        &self,
+        py: Python,
+        items: &Bound<'_, PyAny>,
+        target: &Bound<'_, PyAny>,
+        chunk_size: usize,
+        format: &str
+    ) -> PyResult<usize> {
+        let binary = match format {
+            "json" => false,
+            "bytes" => true,
+            _ => {
+                return Err(
+                    exceptions::PyValueError::new_err(
+                        format!("Unknown format {:?}, expected \"json\" or \"bytes\"", format)
+                    )
+                );
+            }
+        };
+
+        let mut sink = stream::Sink::new(target)?;
+        if binary && sink.is_text() {
+            return Err(exceptions::PyTypeError::new_err("Cannot write bytes to a text file"));
+        }
+
+        // reused for every item
+        let mut writer = ser::JsonWriter::new();
+
+        let mut count = 0;
+        for item in items.try_iter()? {
+            let item = item?;
+            if binary {
+                // length prefix, filled in once the archive is written
+                let buf = &mut writer.buf;
+                let prefix = buf.len();
+                buf.resize(prefix + 8 + dump::HEADER_LEN, 0);
+                dump::write_header(&mut buf[prefix + 8..]);
+                let len = dump::HEADER_LEN + dump::archive_into(&item, buf)?;
+                buf[prefix..prefix + 8].copy_from_slice(&(len as u64).to_le_bytes());
+            } else {
+                writer.write(&self.root, &item)?;
+                writer.buf.push(b'\n');
+            }
+            count += 1;
+
+            if writer.buf.len() >= chunk_size {
+                sink.write(py, &writer.buf)?;
+                writer.buf.clear();
+            }
+        }
+
+        if !writer.buf.is_empty() {
+            sink.write(py, &writer.buf)?;
+        }
+        Ok(count)
+    }
+
+    #[pyo3(signature = (json, strict, backend = None))]
+    pub(crate) fn load_json(
+        &self,
+        py: Python,
+        json: &Bound<'_, PyAny>,
+        strict: bool,
+        backend: Option<&str>
+    ) -> PyResult<(Py<PyAny>, Option<Vec<String>>)> {
+        let backend = json::Backend::new(strict, backend)?;
+        let input = batch::Input::new(json)?;
+        let raw = input.raw()?;
+        let doc = if input.is_immutable() {
+            py.allow_threads(|| json::parse_raw(&raw, backend))?
+        } else {
+            // others may write to a mutable buffer while we don't hold the GIL
+            json::parse_raw(&raw, backend)?
+        };
+        self.load(py, &doc)
+    }
+
+    /// Like `load_json()`, but maps the file at `path` and parses it in place.
+    #[pyo3(signature = (path, strict = true, backend = None))]
+    pub(crate) fn load_json_file(
+        &self,
+        py: Python,
+        path: PathBuf,
+        strict: bool,
+        backend: Option<&str>
+    ) -> PyResult<(Py<PyAny>, Option<Vec<String>>)> {
+        let backend = json::Backend::new(strict, backend)?;
+        let file = File::open(&path).map_err(|e| io_error("Failed to open file", e))?;
+        // SAFETY: the file must not be modified while it's mapped (documented)
+        let map = unsafe { Mmap::map(&file) }.map_err(|e| io_error("Failed to map file", e))?;
+        let doc = py.allow_threads(|| json::parse_raw(&batch::Raw::Bytes(&map), backend))?;
+        self.load(py, &doc)
+    }
+
+    pub(crate) fn load_bytes(
+        &self,
+        py: Python,
+        bytes: &[u8]
+    ) -> PyResult<(Py<PyAny>, Option<Vec<String>>)> {
+        let archive = dump::Archive::new(bytes)?;
+        self.load(py, archive.get())
+    }
+
+    #[pyo3(signature = (source, chunk_size = 65536, format = None))]
+    pub(crate) fn iter_json(
+        slf: &Bound<'_, Self>,
+        source: &Bound<'_, PyAny>,
+        chunk_size: usize,
+        format: Option<&str>
+    ) -> PyResult<stream::PyJsonStream> {
+        Ok(
+            stream::PyJsonStream::new(
+                slf.clone().unbind(),
+                stream::Source::new(source)?,
+                stream::Format::new(format)?,
+                chunk_size.max(1)
+            )
+        )
+    }
+
+    #[pyo3(signature = (items, strict, workers = None, backend = None))]
+    pub(crate) fn load_json_many(
+        &self,
+        py: Python,
+        items: Vec<Bound<'_, PyAny>>,
+        strict: bool,
+        workers: Option<usize>,
+        backend: Option<&str>
+    ) -> PyResult<Vec<(Py<PyAny>, Option<Vec<String>>)>> {
+        let backend = json::Backend::new(strict, backend)?;
+        let raws = batch::raw_items(&items)?;
+        self.load_many(
+            py,
+            raws.len(),
+            |idx| json::parse_raw(&raws[idx], backend),
+            |doc| doc,
+            workers
+        )
+    }
+
+    #[pyo3(signature = (items, workers = None))]
+    pub(crate) fn load_bytes_many(
+        &self,
+        py: Python,
+        items: Vec<Bound<'_, PyAny>>,
+        workers: Option<usize>
+    ) -> PyResult<Vec<(Py<PyAny>, Option<Vec<String>>)>> {
+        let raws = batch::raw_items(&items)?;
+        self.load_many(
+            py,
+            raws.len(),
+            |idx| dump::Archive::new(raws[idx].as_bytes()),
+            |archive| archive.get(),
+            workers
+        )
+    }
+}
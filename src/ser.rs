@@ -0,0 +1,234 @@
+use std::io::Write;
+
+use pyo3::{
+    exceptions,
+    prelude::*,
+    types::{ PyBool, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple },
+};
+
+use crate::{ primitives::{ array_to_list, dataclass_fields }, schema::Node };
+
+/// Deeper than this is most likely a reference cycle.
+const MAX_DEPTH: usize = 512;
+
+/// Writes Python data as compact JSON into a single growable buffer.
+///
+/// Follows `json.dumps()` (after `asdict()`) wherever the output is
+/// concerned: tuples are arrays, dict keys may be str, int, float, bool or
+/// None, and non-finite floats are written as `NaN` and `Infinity`.
+pub(crate) struct JsonWriter {
+    pub(crate) buf: Vec<u8>,
+}
+
+fn not_serializable(obj: &Bound<'_, PyAny>) -> PyResult<PyErr> {
+    Ok(
+        exceptions::PyTypeError::new_err(
+            format!("Object of type {} is not JSON serializable", obj.get_type().name()?)
+        )
+    )
+}
+
+impl JsonWriter {
+    pub(crate) fn new() -> Self {
+        Self { buf: Vec::with_capacity(256) }
+    }
+
+    /// Writes `value` following the layout known from `node` where it
+    /// matches, and by looking at the Python types otherwise.
+    pub(crate) fn write(&mut self, node: &Node, value: &Bound<'_, PyAny>) -> PyResult<()> {
+        self.write_node(node, value, 0)
+    }
+
+    fn write_str(&mut self, s: &str) {
+        // writing to a Vec never fails
+        let _ = serde_json::to_writer(&mut self.buf, s);
+    }
+
+    fn write_float(&mut self, f: f64) {
+        if f.is_nan() {
+            self.buf.extend_from_slice(b"NaN");
+        } else if f.is_infinite() {
+            self.buf.extend_from_slice(if f > 0.0 { b"Infinity" } else { b"-Infinity" });
+        } else {
+            let _ = serde_json::to_writer(&mut self.buf, &f);
+        }
+    }
+
+    fn write_int(&mut self, obj: &Bound<'_, PyAny>) -> PyResult<()> {
+        match obj.extract::<i64>() {
+            Ok(i) => {
+                let _ = write!(self.buf, "{}", i);
+            }
+            // big ints
+            Err(_) => self.buf.extend_from_slice(obj.str()?.to_str()?.as_bytes()),
+        }
+        Ok(())
+    }
+
+    fn write_key(&mut self, key: &Bound<'_, PyAny>) -> PyResult<()> {
+        if let Ok(s) = key.downcast::<PyString>() {
+            self.write_str(s.to_str()?);
+            return Ok(());
+        }
+
+        self.buf.push(b'"');
+        if key.is_none() {
+            self.buf.extend_from_slice(b"null");
+        } else if let Ok(b) = key.downcast::<PyBool>() {
+            self.buf.extend_from_slice(if b.is_true() { b"true" } else { b"false" });
+        } else if key.is_instance_of::<PyInt>() {
+            self.write_int(key)?;
+        } else if let Ok(f) = key.downcast::<PyFloat>() {
+            self.write_float(f.value());
+        } else {
+            return Err(
+                exceptions::PyTypeError::new_err(
+                    format!(
+                        "keys must be str, int, float, bool or None, not {}",
+                        key.get_type().name()?
+                    )
+                )
+            );
+        }
+        self.buf.push(b'"');
+        Ok(())
+    }
+
+    fn write_node(&mut self, node: &Node, value: &Bound<'_, PyAny>, depth: usize) -> PyResult<()> {
+        if depth > MAX_DEPTH {
+            return Err(exceptions::PyValueError::new_err("Circular reference detected"));
+        }
+
+        match node {
+            Node::Dataclass(dc) => {
+                let py = value.py();
+                if !dc.is_instance(value) {
+                    return self.write_py(value, depth);
+                }
+
+                self.buf.push(b'{');
+                for (idx, field) in dc.fields.iter().enumerate() {
+                    if idx > 0 {
+                        self.buf.push(b',');
+                    }
+                    self.buf.extend_from_slice(&field.json_key);
+                    let item = value.getattr(field.name.bind(py))?;
+                    self.write_node(&field.node, &item, depth + 1)?;
+                }
+                self.buf.push(b'}');
+                Ok(())
+            }
+            Node::List { item, .. } if value.is_exact_instance_of::<PyList>() => {
+                let list = value.downcast::<PyList>()?;
+                self.buf.push(b'[');
+                for (idx, element) in list.iter().enumerate() {
+                    if idx > 0 {
+                        self.buf.push(b',');
+                    }
+                    self.write_node(item, &element, depth + 1)?;
+                }
+                self.buf.push(b']');
+                Ok(())
+            }
+            Node::Dict { value: item, .. } if value.is_exact_instance_of::<PyDict>() => {
+                let dict = value.downcast::<PyDict>()?;
+                self.buf.push(b'{');
+                for (idx, (k, v)) in dict.iter().enumerate() {
+                    if idx > 0 {
+                        self.buf.push(b',');
+                    }
+                    self.write_key(&k)?;
+                    self.buf.push(b':');
+                    self.write_node(item, &v, depth + 1)?;
+                }
+                self.buf.push(b'}');
+                Ok(())
+            }
+            _ => self.write_py(value, depth),
+        }
+    }
+
+    /// Writes any supported Python data, looking at its type.
+    fn write_py(&mut self, obj: &Bound<'_, PyAny>, depth: usize) -> PyResult<()> {
+        if depth > MAX_DEPTH {
+            return Err(exceptions::PyValueError::new_err("Circular reference detected"));
+        }
+
+        if obj.is_none() {
+            self.buf.extend_from_slice(b"null");
+            return Ok(());
+        }
+        if let Ok(s) = obj.downcast::<PyString>() {
+            self.write_str(s.to_str()?);
+            return Ok(());
+        }
+        if let Ok(b) = obj.downcast::<PyBool>() {
+            self.buf.extend_from_slice(if b.is_true() { b"true" } else { b"false" });
+            return Ok(());
+        }
+        if obj.is_instance_of::<PyInt>() {
+            return self.write_int(obj);
+        }
+        if let Ok(f) = obj.downcast::<PyFloat>() {
+            self.write_float(f.value());
+            return Ok(());
+        }
+        if let Ok(list) = obj.downcast::<PyList>() {
+            self.buf.push(b'[');
+            for (idx, item) in list.iter().enumerate() {
+                if idx > 0 {
+                    self.buf.push(b',');
+                }
+                self.write_py(&item, depth + 1)?;
+            }
+            self.buf.push(b']');
+            return Ok(());
+        }
+        if let Ok(tuple) = obj.downcast::<PyTuple>() {
+            self.buf.push(b'[');
+            for (idx, item) in tuple.iter().enumerate() {
+                if idx > 0 {
+                    self.buf.push(b',');
+                }
+                self.write_py(&item, depth + 1)?;
+            }
+            self.buf.push(b']');
+            return Ok(());
+        }
+        if let Ok(dict) = obj.downcast::<PyDict>() {
+            self.buf.push(b'{');
+            for (idx, (k, v)) in dict.iter().enumerate() {
+                if idx > 0 {
+                    self.buf.push(b',');
+                }
+                self.write_key(&k)?;
+                self.buf.push(b':');
+                self.write_py(&v, depth + 1)?;
+            }
+            self.buf.push(b'}');
+            return Ok(());
+        }
+
+        // `field(as_array=True)`
+        if let Some(list) = array_to_list(obj)? {
+            return self.write_py(&list, depth);
+        }
+
+        // dataclass instances (not classes): fields, in order
+        if let Some(fields) = dataclass_fields(obj)? {
+            self.buf.push(b'{');
+            for (idx, name) in fields.iter().enumerate() {
+                if idx > 0 {
+                    self.buf.push(b',');
+                }
+                self.write_str(name.to_str()?);
+                self.buf.push(b':');
+                self.write_py(&obj.getattr(name)?, depth + 1)?;
+            }
+            self.buf.push(b'}');
+            return Ok(());
+        }
+
+        Err(not_serializable(obj)?)
+    }
+}
@@ -0,0 +1,431 @@
+use std::{ fs::File, io::{ Read, Write }, mem::ManuallyDrop, path::PathBuf };
+
+use ijson::IValue;
+use pyo3::{ exceptions, intern, prelude::*, types::{ PyBytes, PyString } };
+
+use crate::schema::PySchema;
+
+pub(crate) enum Source {
+    File(File),
+    /// Anything with a `read(n)` method, returning `bytes` or `str`.
+    Reader(Py<PyAny>),
+}
+
+impl Source {
+    pub(crate) fn new(source: &Bound<'_, PyAny>) -> PyResult<Self> {
+        if source.hasattr(intern!(source.py(), "read"))? {
+            return Ok(Self::Reader(source.clone().unbind()));
+        }
+
+        let path = source.extract::<PathBuf>()?;
+        match File::open(&path) {
+            Ok(file) => Ok(Self::File(file)),
+            Err(e) => Err(exceptions::PyOSError::new_err(format!("Failed to open {:?}: {}", path, e))),
+        }
+    }
+
+    /// Reads up to `size` bytes into `buf`. Returns the number of bytes read.
+    fn read(&mut self, py: Python, buf: &mut Vec<u8>, size: usize) -> PyResult<usize> {
+        match self {
+            Self::File(file) => {
+                let start = buf.len();
+                buf.resize(start + size, 0);
+                let res = py.allow_threads(|| file.read(&mut buf[start..]));
+                match res {
+                    Ok(n) => {
+                        buf.truncate(start + n);
+                        Ok(n)
+                    }
+                    Err(e) => {
+                        buf.truncate(start);
+                        Err(exceptions::PyOSError::new_err(format!("Failed to read: {}", e)))
+                    }
+                }
+            }
+            Self::Reader(reader) => {
+                let chunk = reader.bind(py).call_method1(intern!(py, "read"), (size,))?;
+                if let Ok(b) = chunk.downcast::<PyBytes>() {
+                    buf.extend_from_slice(b.as_bytes());
+                    Ok(b.as_bytes().len())
+                } else if let Ok(s) = chunk.downcast::<PyString>() {
+                    let s = s.to_str()?;
+                    buf.extend_from_slice(s.as_bytes());
+                    Ok(s.len())
+                } else {
+                    Err(exceptions::PyTypeError::new_err("read() should return bytes or str"))
+                }
+            }
+        }
+    }
+}
+
+pub(crate) enum Sink {
+    File(File),
+    /// The file descriptor of a binary file object, written to directly.
+    /// Never closed here; the object keeps it open.
+    Fd(ManuallyDrop<File>, Py<PyAny>),
+    /// Anything with a `write(b)` method (or a socket's `sendall(b)`).
+    Writer(Py<PyAny>, Py<PyString>),
+    /// Text files, which take `str`.
+    Text(Py<PyAny>),
+}
+
+fn write_error(e: std::io::Error) -> PyErr {
+    exceptions::PyOSError::new_err(format!("Failed to write: {}", e))
+}
+
+impl Sink {
+    pub(crate) fn new(target: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let py = target.py();
+        let io = py.import(intern!(py, "io"))?;
+
+        if target.is_instance(&io.getattr(intern!(py, "TextIOBase"))?)? {
+            return Ok(Self::Text(target.clone().unbind()));
+        }
+
+        #[cfg(unix)]
+        if target.is_instance(&io.getattr(intern!(py, "IOBase"))?)? {
+            use std::os::fd::FromRawFd;
+
+            let fd = target
+                .call_method0(intern!(py, "fileno"))
+                .and_then(|fd| fd.extract::<i32>());
+            if let Ok(fd) = fd {
+                // whatever Python buffered has to go first
+                target.call_method0(intern!(py, "flush"))?;
+                // SAFETY: `target` is kept alive (and its descriptor open)
+                // alongside, and the descriptor is never closed here
+                let file = ManuallyDrop::new(unsafe { File::from_raw_fd(fd) });
+                return Ok(Self::Fd(file, target.clone().unbind()));
+            }
+        }
+
+        for method in [intern!(py, "sendall"), intern!(py, "write")] {
+            if target.hasattr(method)? {
+                return Ok(Self::Writer(target.clone().unbind(), method.clone().unbind()));
+            }
+        }
+
+        let path = target.extract::<PathBuf>()?;
+        match File::create(&path) {
+            Ok(file) => Ok(Self::File(file)),
+            Err(e) => Err(exceptions::PyOSError::new_err(format!("Failed to create {:?}: {}", path, e))),
+        }
+    }
+
+    pub(crate) fn is_text(&self) -> bool {
+        matches!(self, Self::Text(_))
+    }
+
+    /// Writes all of `buf`. Files are written to with the GIL released.
+    pub(crate) fn write(&mut self, py: Python, buf: &[u8]) -> PyResult<()> {
+        match self {
+            Self::File(file) => py.allow_threads(|| file.write_all(buf)).map_err(write_error),
+            Self::Fd(file, _) => {
+                let file: &mut File = file;
+                py.allow_threads(|| file.write_all(buf)).map_err(write_error)
+            }
+            Self::Writer(target, method) => {
+                target.bind(py).call_method1(method.bind(py), (PyBytes::new(py, buf),))?;
+                Ok(())
+            }
+            Self::Text(target) => {
+                let text = std::str::from_utf8(buf).map_err(|e| {
+                    exceptions::PyValueError::new_err(e.to_string())
+                })?;
+                target.bind(py).call_method1(intern!(py, "write"), (text,))?;
+                Ok(())
+            }
+        }
+    }
+}
+
+/// What a stream holds.
+#[derive(Clone, Copy, PartialEq)]
+pub(crate) enum Format {
+    /// A top-level array if it starts with `[`, newline-delimited otherwise.
+    Auto,
+    /// Newline-delimited values (which may be arrays themselves).
+    Lines,
+    /// Items of a top-level array.
+    Array,
+}
+
+impl Format {
+    pub(crate) fn new(format: Option<&str>) -> PyResult<Self> {
+        match format {
+            None => Ok(Self::Auto),
+            Some("ndjson") => Ok(Self::Lines),
+            Some("array") => Ok(Self::Array),
+            Some(other) => {
+                Err(
+                    exceptions::PyValueError::new_err(
+                        format!("Unknown format {:?}, expected \"ndjson\" or \"array\"", other)
+                    )
+                )
+            }
+        }
+    }
+}
+
+#[derive(PartialEq)]
+enum Mode {
+    /// Haven't seen anything yet.
+    Unknown,
+    /// Newline-delimited (or just whitespace-delimited) values.
+    Lines,
+    /// Items of a top-level array.
+    Array,
+    /// Past the end of the top-level array.
+    Done,
+}
+
+/// Where we're at while scanning for the end of a value.
+struct Cursor {
+    start: usize,
+    at: usize,
+    depth: usize,
+    in_string: bool,
+    escape: bool,
+    scalar: bool,
+}
+
+/// Splits a stream into complete top-level JSON values, without parsing
+/// them. The buffer only ever holds the value being scanned plus one chunk.
+pub(crate) struct Splitter {
+    buf: Vec<u8>,
+    pos: usize,
+    format: Format,
+    mode: Mode,
+    cursor: Option<Cursor>,
+    eof: bool,
+}
+
+fn is_ws(b: u8) -> bool {
+    matches!(b, b' ' | b'\n' | b'\r' | b'\t')
+}
+
+fn stream_error(message: &str) -> PyErr {
+    exceptions::PyRuntimeError::new_err(format!("Failed to load JSON stream:\n{}", message))
+}
+
+impl Splitter {
+    pub(crate) fn new(format: Format) -> Self {
+        let mode = if format == Format::Lines { Mode::Lines } else { Mode::Unknown };
+        Self { buf: vec![], pos: 0, format, mode, cursor: None, eof: false }
+    }
+
+    /// Scans what's buffered. Returns the range of the next complete value,
+    /// or `None` if more input is needed (or there's nothing left).
+    fn scan(&mut self) -> PyResult<Option<(usize, usize)>> {
+        if self.cursor.is_none() {
+            while self.pos < self.buf.len() {
+                let b = self.buf[self.pos];
+                if is_ws(b) {
+                    self.pos += 1;
+                    continue;
+                }
+
+                match self.mode {
+                    Mode::Unknown => {
+                        if b == b'[' {
+                            self.mode = Mode::Array;
+                            self.pos += 1;
+                            continue;
+                        }
+                        if self.format == Format::Array {
+                            return Err(stream_error("Expected a top-level array"));
+                        }
+                        self.mode = Mode::Lines;
+                    }
+                    Mode::Array => {
+                        if b == b',' {
+                            self.pos += 1;
+                            continue;
+                        }
+                        if b == b']' {
+                            self.mode = Mode::Done;
+                            self.pos += 1;
+                            continue;
+                        }
+                    }
+                    Mode::Done => {
+                        if self.format == Format::Auto {
+                            return Err(
+                                stream_error(
+                                    "Unexpected data after the top-level array \
+                                     (for newline-delimited arrays, pass format=\"ndjson\")"
+                                )
+                            );
+                        }
+                        return Err(stream_error("Unexpected data after the top-level array"));
+                    }
+                    Mode::Lines => {}
+                }
+
+                self.cursor = Some(Cursor {
+                    start: self.pos,
+                    at: self.pos,
+                    depth: 0,
+                    in_string: false,
+                    escape: false,
+                    scalar: !matches!(b, b'{' | b'[' | b'"'),
+                });
+                break;
+            }
+        }
+
+        let Some(cursor) = self.cursor.as_mut() else {
+            if self.eof && self.mode == Mode::Array {
+                return Err(stream_error("Unexpected end of the top-level array"));
+            }
+            return Ok(None);
+        };
+
+        let mut end = None;
+        while cursor.at < self.buf.len() {
+            let b = self.buf[cursor.at];
+            cursor.at += 1;
+
+            if cursor.scalar {
+                if is_ws(b) || matches!(b, b',' | b']' | b'}') {
+                    end = Some(cursor.at - 1);
+                    break;
+                }
+                continue;
+            }
+
+            if cursor.in_string {
+                if cursor.escape {
+                    cursor.escape = false;
+                } else if b == b'\\' {
+                    cursor.escape = true;
+                } else if b == b'"' {
+                    cursor.in_string = false;
+                    if cursor.depth == 0 {
+                        end = Some(cursor.at);
+                        break;
+                    }
+                }
+                continue;
+            }
+
+            match b {
+                b'"' => {
+                    cursor.in_string = true;
+                }
+                b'{' | b'[' => {
+                    cursor.depth += 1;
+                }
+                b'}' | b']' => {
+                    cursor.depth = cursor.depth.saturating_sub(1);
+                    if cursor.depth == 0 {
+                        end = Some(cursor.at);
+                        break;
+                    }
+                }
+                _ => {}
+            }
+        }
+
+        if end.is_none() && self.eof {
+            if !cursor.scalar {
+                return Err(stream_error("Unexpected end of stream inside a value"));
+            }
+            end = Some(self.buf.len());
+        }
+
+        let Some(end) = end else {
+            return Ok(None);
+        };
+
+        let start = cursor.start;
+        self.cursor = None;
+        self.pos = end;
+        Ok(Some((start, end)))
+    }
+
+    /// Drops everything before the value being scanned.
+    fn compact(&mut self) {
+        let consumed = match &self.cursor {
+            Some(cursor) => cursor.start,
+            None => self.pos,
+        };
+        if consumed == 0 {
+            return;
+        }
+
+        self.buf.drain(..consumed);
+        self.pos -= consumed;
+        if let Some(cursor) = self.cursor.as_mut() {
+            cursor.start -= consumed;
+            cursor.at -= consumed;
+        }
+    }
+
+    /// Gets the next complete value, reading from `source` as needed.
+    pub(crate) fn next_value(
+        &mut self,
+        py: Python,
+        source: &mut Source,
+        chunk_size: usize
+    ) -> PyResult<Option<IValue>> {
+        loop {
+            if let Some((start, end)) = self.scan()? {
+                return match serde_json::from_slice::<IValue>(&self.buf[start..end]) {
+                    Ok(d) => Ok(Some(d)),
+                    Err(e) => {
+                        Err(
+                            exceptions::PyRuntimeError::new_err(
+                                format!("Failed to load JSON:\n{:#?}", e)
+                            )
+                        )
+                    }
+                };
+            }
+
+            if self.eof {
+                return Ok(None);
+            }
+
+            self.compact();
+            if source.read(py, &mut self.buf, chunk_size)? == 0 {
+                self.eof = true;
+            }
+        }
+    }
+}
+
+/// Lazily loads values from a stream of NDJSON or a top-level JSON array.
+#[pyclass(name = "JsonStream")]
+pub(crate) struct PyJsonStream {
+    schema: Py<PySchema>,
+    source: Source,
+    splitter: Splitter,
+    chunk_size: usize,
+}
+
+impl PyJsonStream {
+    pub(crate) fn new(
+        schema: Py<PySchema>,
+        source: Source,
+        format: Format,
+        chunk_size: usize
+    ) -> Self {
+        Self { schema, source, splitter: Splitter::new(format), chunk_size }
+    }
+}
+
+#[pymethods]
+impl PyJsonStream {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python) -> PyResult<Option<(Py<PyAny>, Option<Vec<String>>)>> {
+        let Some(doc) = self.splitter.next_value(py, &mut self.source, self.chunk_size)? else {
+            return Ok(None);
+        };
+        Ok(Some(self.schema.get().load(py, &doc)?))
+    }
+}
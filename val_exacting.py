@@ -1,8 +1,32 @@
 import time
 import random
 import string
-from exacting import Exact, field
+import tracemalloc
+
+from exacting import DictV, Exact, IntV, ListV, StrV, field
 
 
 def gen_str(length: int) -> str:
     return "".join(random.choices(string.ascii_letters, k=length))
+
+
+strings = [gen_str(8) for _ in range(10_000)]
+tables = [{gen_str(5): i for i in range(10)} for _ in range(1_000)]
+
+validators = {
+    "list[str]": (ListV(StrV()), strings),
+    "list[dict[str, int]]": (ListV(DictV(StrV(), IntV())), tables),
+}
+
+for name, (validator, data) in validators.items():
+    start = time.perf_counter()
+    for i in range(100):
+        validator.validate(data)
+    end = time.perf_counter()
+
+    tracemalloc.start()
+    validator.validate(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name}: {(end - start) * 10} ms, peak {peak} bytes")